@@ -1,11 +1,16 @@
 import os
 import json
 import time
+import asyncio
 import logging
 from datetime import datetime
 import pandas as pd
 import numpy as np
 from luno_api_client import LunoAPIClient
+from response_cache import ResponseCache
+from streaming_indicators import SMA, RSI
+from ring_buffer import PriceRingBuffer
+from market_stream import MarketStream
 from dotenv import load_dotenv
 from tabulate import tabulate
 from termcolor import colored
@@ -28,8 +33,10 @@ with open(config_path, 'r') as f:
 if not API_KEY or not API_SECRET:
     raise ValueError("LUNO_API_KEY and LUNO_API_SECRET must be set in config.json")
 
-client = LunoAPIClient(API_KEY, API_SECRET)
+client = LunoAPIClient(API_KEY, API_SECRET, cache=ResponseCache())
 DEFAULT_PAIR = "XBTMYR"
+# Seconds between indicator and position printouts of the streaming bot, which sees many ticks a second
+STREAM_STATUS_INTERVAL = 5
 
 class TradingStrategy:
     def __init__(self, config_path='config.json'):
@@ -73,6 +80,8 @@ class TradingStrategy:
         return min(fund * self.max_position / price, fund)
 
 class TechnicalAnalysis:
+    """Whole-series reference implementations, the bot itself uses streaming_indicators"""
+
     @staticmethod
     def calculate_ma(prices, period):
         return pd.Series(prices).rolling(window=period).mean().iloc[-1]
@@ -121,7 +130,10 @@ class AdvancedTradingBot:
             'buys': {'volume': 0, 'fees': 0, 'total_cost': 0},
             'sells': {'volume': 0, 'fees': 0, 'total_revenue': 0}
         }
-        self.price_history = []  # Add this line to initialize price history
+        # Updated in O(1) per tick, see update_indicators
+        self.ma_short = SMA(20)
+        self.ma_long = SMA(50)
+        self.rsi = RSI(14)
         
         # Load trading settings from config
         with open(config_path, 'r') as f:
@@ -131,6 +143,13 @@ class AdvancedTradingBot:
             self.current_fund = self.initial_fund
             self.max_fund = trading_settings.get('max_fund', 5000.00)
             self.min_trade_amount = trading_settings.get('min_trade_amount', 100.00)
+            price_history_size = trading_settings.get('price_history_size', 1000)
+
+        # Recent ticks, oldest first, without per-tick shifting or allocation
+        self.price_history = PriceRingBuffer(price_history_size)
+        # Seconds between console status printouts, 0 prints on every tick
+        self.status_interval = 0
+        self._last_status = None
 
     def update_fund(self, amount):
         """Update fund amount"""
@@ -180,15 +199,30 @@ class AdvancedTradingBot:
             logging.error(f"Error getting market data: {e}")
             return None
 
-    def analyze_market(self, prices):
-        ma20 = TechnicalAnalysis.calculate_ma(prices, 20)
-        ma50 = TechnicalAnalysis.calculate_ma(prices, 50)
-        rsi = TechnicalAnalysis.calculate_rsi(prices)
+    def update_indicators(self, price):
+        """Feed a new price to the streaming indicators"""
+        self.ma_short.update(price)
+        self.ma_long.update(price)
+        self.rsi.update(price)
+
+    def status_due(self):
+        """Whether the next status printout is due, see status_interval"""
+        now = time.monotonic()
+        if self._last_status is not None and now - self._last_status < self.status_interval:
+            return False
+        self._last_status = now
+        return True
+
+    def analyze_market(self, verbose=True):
+        ma20 = self.ma_short.value
+        ma50 = self.ma_long.value
+        rsi = self.rsi.value
         
-        print(colored(f"Technical Indicators:", "cyan"))
-        print(f"MA20: {ma20:.2f}")
-        print(f"MA50: {ma50:.2f}")
-        print(f"RSI: {rsi:.2f}")
+        if verbose:
+            print(colored(f"Technical Indicators:", "cyan"))
+            print(f"MA20: {ma20:.2f}")
+            print(f"MA50: {ma50:.2f}")
+            print(f"RSI: {rsi:.2f}")
         
         return ma20 > ma50 and 30 < rsi < 70
 
@@ -330,6 +364,42 @@ class AdvancedTradingBot:
             else:
                 print(colored(f"Unrealized Loss: {abs(profit_loss):.2f} MYR ({profit_loss_percent:.2f}%)", "red"))
 
+    def record_price(self, price, timestamp=None):
+        """Add a price to the history and the streaming indicators"""
+        self.price_history.append(price, timestamp or datetime.now())
+        self.update_indicators(price)
+
+    def next_signal(self, price, timestamp=None):
+        """Record a new price, returns the (action, price, amount, reason) it triggers or None"""
+        self.record_price(price, timestamp)
+
+        if self.current_position > 0:
+            should_sell, reason = self.strategy.should_sell(self.entry_price, price)
+            if should_sell:
+                return "SELL", price, self.current_position, reason
+            if self.status_due():
+                self.show_position_status(price)
+
+        elif self.ma_long.ready and self.analyze_market(verbose=self.status_due()):
+            amount = self.strategy.calculate_position_size(self.current_fund, price)
+            if amount > 0:
+                return "BUY", price, amount, None
+        return None
+
+    def execute_signal(self, action, price, amount, reason=None):
+        """Execute a trade returned by next_signal"""
+        self.execute_trade(action, price, amount)
+        if action == "SELL":
+            logging.info(f"Sell triggered by {reason} at price {price}")
+        else:
+            logging.info(f"Buy triggered at price {price}")
+
+    def on_price(self, price, timestamp=None):
+        """Record a new price and act on it, one step of the polling loop"""
+        signal = self.next_signal(price, timestamp)
+        if signal:
+            self.execute_signal(*signal)
+
     def run_trading_bot(self):
         try:
             logging.info("Starting trading bot...")
@@ -338,32 +408,7 @@ class AdvancedTradingBot:
                 if not price:
                     continue
 
-                # Add current price to price history
-                self.price_history.append({
-                    'timestamp': datetime.now(),
-                    'price': price
-                })
-
-                # Maintain only last 50 prices
-                if len(self.price_history) > 50:
-                    self.price_history.pop(0)
-
-                # Extract prices for analysis
-                prices = [p['price'] for p in self.price_history]
-
-                if self.current_position > 0:
-                    should_sell, reason = self.strategy.should_sell(self.entry_price, price)
-                    if should_sell:
-                        self.execute_trade("SELL", price, self.current_position)
-                        logging.info(f"Sell triggered by {reason} at price {price}")
-                    else:
-                        self.show_position_status(price)
-
-                elif len(prices) >= 50 and self.analyze_market(prices):
-                    amount = self.strategy.calculate_position_size(self.current_fund, price)
-                    if amount > 0:
-                        self.execute_trade("BUY", price, amount)
-                        logging.info(f"Buy triggered at price {price}")
+                self.on_price(price)
 
                 time.sleep(10)
 
@@ -374,6 +419,39 @@ class AdvancedTradingBot:
             logging.error(f"Error in trading bot: {e}")
             print(colored(f"Error: {e}", "red"))
 
+    def run_streaming_bot(self, pair=DEFAULT_PAIR):
+        """Like run_trading_bot, but reacts to every trade on the streaming feed instead of polling
+
+        Callbacks run on the stream's event loop, so trades (whose fee lookup is a
+        blocking HTTP call) execute on a worker thread while the feed keeps being read.
+        Until one completes later ticks only update the indicators, no second signal is
+        acted on. Status printouts come every STREAM_STATUS_INTERVAL seconds at most.
+        """
+        stream = MarketStream(pair, API_KEY, API_SECRET)
+        self.status_interval = STREAM_STATUS_INTERVAL
+        pending = None
+
+        def on_trade(trade):
+            nonlocal pending
+            timestamp = datetime.fromtimestamp(trade.timestamp / 1000)
+            if pending is not None and not pending.done():
+                self.record_price(trade.price, timestamp)
+                return
+            signal = self.next_signal(trade.price, timestamp)
+            if signal:
+                pending = asyncio.ensure_future(asyncio.to_thread(self.execute_signal, *signal))
+
+        stream.on('trade', on_trade)
+        try:
+            logging.info("Starting streaming trading bot...")
+            stream.run_forever()
+        except KeyboardInterrupt:
+            logging.info("Trading bot stopped by user")
+            print(colored("\nStopping trading bot...", "yellow"))
+        except Exception as e:
+            logging.error(f"Error in trading bot: {e}")
+            print(colored(f"Error: {e}", "red"))
+
 def menu():
     print(colored("\n====================", "blue", attrs=["bold"]))
     print(colored("Advanced Trading Bot", "blue", attrs=["bold"]))
@@ -385,12 +463,12 @@ def menu():
     print("5. Show Fund Status")
     print("6. Update Fund Amount")
     print("7. Test API Connection")
+    print("8. Start Streaming Trading Bot")
     print("0. Exit")
     return input("Enter your choice: ")
 
 def main():
     bot = AdvancedTradingBot()
-    prices = []
     
     while True:
         choice = menu()
@@ -400,9 +478,9 @@ def main():
                 while True:
                     price = bot.get_market_data()
                     if price:
-                        prices.append(price)
-                        if len(prices) > 50:  # Need at least 50 prices for analysis
-                            if bot.analyze_market(prices):
+                        bot.update_indicators(price)
+                        if bot.ma_long.ready:  # Need at least 50 prices for analysis
+                            if bot.analyze_market():
                                 if bot.current_position == 0:
                                     amount = 0.001  # Example amount
                                     bot.execute_trade("BUY", price, amount)
@@ -429,8 +507,10 @@ def main():
             try:
                 while True:
                     price = bot.get_market_data()
-                    if price and len(prices) > 50:
-                        bot.analyze_market(prices)
+                    if price:
+                        bot.update_indicators(price)
+                        if bot.ma_long.ready:
+                            bot.analyze_market()
                     time.sleep(10)
             except KeyboardInterrupt:
                 print(colored("\nStopping market monitor...", "yellow"))
@@ -454,6 +534,10 @@ def main():
             bot.test_api_connection()
             input(colored("\nPress Enter to continue...", "yellow"))
         
+        elif choice == '8':
+            print(colored("Starting streaming trading bot...", "green"))
+            bot.run_streaming_bot()
+        
         elif choice == '0':
             print(colored("Exiting...", "red"))
             break
@@ -0,0 +1,185 @@
+import asyncio
+import contextvars
+import aiohttp
+from luno_api_client import LunoAPIClient
+from rate_limiter import RateLimiter, parse_retry_after
+from request_coalescing import AsyncSingleFlight
+from response_cache import make_cache_key
+
+class AsyncLunoAPIClient:
+    """asyncio counterpart of LunoAPIClient sharing one connection pool across all calls"""
+    BASE_URL = LunoAPIClient.BASE_URL
+
+    def __init__(self, api_key, api_secret, base_url=None, max_in_flight=10, pool_size=100,
+                 pool_size_per_host=20, timeout=10, rate_limiter=None, max_retries=3,
+                 coalesce=True):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.base_url = base_url or self.BASE_URL
+        self.max_in_flight = max_in_flight
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.timeout = timeout
+        # Pass the same RateLimiter as a LunoAPIClient to make threads and tasks share one budget,
+        # False to send unlimited
+        self.rate_limiter = RateLimiter() if rate_limiter is None else rate_limiter or None
+        self.max_retries = max_retries
+        # Tasks share the client, so each keeps its own last_wait
+        self._last_wait = contextvars.ContextVar('last_wait', default=0.0)
+        # Identical GETs awaited concurrently by several tasks share a single HTTP call
+        self.coalescer = AsyncSingleFlight() if coalesce else None
+        self.session = None
+        self._semaphore = None
+
+    async def _get_session(self):
+        # The session and semaphore are bound to the running event loop, so create them lazily
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.pool_size_per_host)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                auth=aiohttp.BasicAuth(self.api_key, self.api_secret),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self.session
+
+    async def close(self):
+        """Release all pooled connections"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def last_wait(self):
+        """Seconds the calling task's latest request waited on the rate limiter, see LunoAPIClient.last_wait"""
+        return self._last_wait.get()
+
+    async def _request(self, method, endpoint, params=None):
+        self._last_wait.set(0.0)
+        if self.coalescer is None or method != "GET":
+            return await self._request_uncached(method, endpoint, params)
+        key = make_cache_key(method, endpoint, params)
+        return await self.coalescer.do(key, lambda: self._request_uncached(method, endpoint, params))
+
+    async def _request_uncached(self, method, endpoint, params=None):
+        session = await self._get_session()
+        url = f"{self.base_url}{endpoint}"
+        if params:
+            # aiohttp rejects None and bool query values, requests silently drops/stringifies them
+            params = {key: str(value).lower() if isinstance(value, bool) else value
+                      for key, value in params.items() if value is not None}
+        waited = 0.0
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                if self.rate_limiter:
+                    waited += await self.rate_limiter.acquire_async(endpoint)
+                async with session.request(method, url, params=params) as response:
+                    if response.status == 429 and attempt < self.max_retries:
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        if self.rate_limiter:
+                            self.rate_limiter.backoff(endpoint, retry_after)
+                        else:
+                            await asyncio.sleep(retry_after)
+                            waited += retry_after
+                        continue
+                    self._last_wait.set(waited)
+                    if response.status != 200:
+                        text = await response.text()
+                        raise Exception(f"API call failed: {response.status} {text}")
+                    return await response.json(content_type=None)
+
+    async def gather(self, *calls, return_exceptions=False):
+        """Run many endpoint coroutines concurrently, bounded by max_in_flight"""
+        return await asyncio.gather(*calls, return_exceptions=return_exceptions)
+
+    async def get_ticker_for_pairs(self, pairs, return_exceptions=False):
+        """Fetch tickers for many pairs at once, returns {pair: ticker}"""
+        results = await self.gather(*(self.get_ticker(pair) for pair in pairs),
+                                    return_exceptions=return_exceptions)
+        return dict(zip(pairs, results))
+
+    async def get_order_book_for_pairs(self, pairs, return_exceptions=False):
+        """Fetch order books for many pairs at once, returns {pair: order_book}"""
+        results = await self.gather(*(self.get_order_book(pair) for pair in pairs),
+                                    return_exceptions=return_exceptions)
+        return dict(zip(pairs, results))
+
+    async def get_tickers(self):
+        return await self._request("GET", "/api/1/tickers")
+
+    async def get_ticker(self, pair):
+        return await self._request("GET", "/api/1/ticker", params={"pair": pair})
+
+    async def get_order_book(self, pair):
+        return await self._request("GET", "/api/1/orderbook", params={"pair": pair})
+
+    async def list_trades(self, pair, since):
+        return await self._request("GET", "/api/1/trades", params={"pair": pair, "since": since})
+
+    async def get_candles(self, pair, since, duration):
+        return await self._request("GET", "/api/exchange/1/candles", params={"pair": pair, "since": since, "duration": duration})
+
+    async def get_balances(self):
+        return await self._request("GET", "/api/1/balance")
+
+    async def list_transactions(self, account_id):
+        return await self._request("GET", f"/api/1/accounts/{account_id}/transactions", params={"min_row": 1, "max_row": 10})
+
+    async def list_pending_transactions(self, account_id):
+        return await self._request("GET", f"/api/1/accounts/{account_id}/pending")
+
+    async def list_orders(self):
+        return await self._request("GET", "/api/1/listorders")
+
+    async def list_user_trades(self, pair):
+        return await self._request("GET", "/api/1/listtrades", params={"pair": pair})
+
+    async def get_fee_info(self, pair):
+        return await self._request("GET", "/api/1/fee_info", params={"pair": pair})
+
+    async def get_funding_address(self, asset):
+        return await self._request("GET", "/api/1/funding_address", params={"asset": asset})
+
+    async def create_account(self, currency, name):
+        return await self._request("POST", "/api/1/accounts", params={"currency": currency, "name": name})
+
+    async def update_account_name(self, account_id, name):
+        return await self._request("PUT", f"/api/1/accounts/{account_id}/name", params={"name": name})
+
+    async def validate_address(self, address, currency):
+        return await self._request("POST", "/api/1/address/validate", params={"address": address, "currency": currency})
+
+    async def send(self, amount, currency, address, description=None, message=None):
+        params = {
+            "amount": amount,
+            "currency": currency,
+            "address": address,
+            "description": description,
+            "message": message
+        }
+        return await self._request("POST", "/api/1/send", params=params)
+
+    async def list_withdrawals(self):
+        return await self._request("GET", "/api/1/withdrawals")
+
+    async def create_withdrawal(self, type, amount, beneficiary_id=None, fast=False):
+        params = {
+            "type": type,
+            "amount": amount,
+            "beneficiary_id": beneficiary_id,
+            "fast": fast
+        }
+        return await self._request("POST", "/api/1/withdrawals", params=params)
+
+    async def get_withdrawal(self, withdrawal_id):
+        return await self._request("GET", f"/api/1/withdrawals/{withdrawal_id}")
+
+    async def cancel_withdrawal(self, withdrawal_id):
+        return await self._request("DELETE", f"/api/1/withdrawals/{withdrawal_id}")
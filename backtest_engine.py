@@ -0,0 +1,304 @@
+import time
+import numpy as np
+
+# Bars examined per step when scanning for an exit, doubled until an exit is found
+EXIT_SCAN_BLOCK = 64
+
+class ThrottledProgress:
+    """Forward progress(done, total) to a callback at most `rate` times per second
+
+    The final update (done == total) and close() always get through, so the callback
+    sees the end of the run however fast it went.
+    """
+
+    def __init__(self, callback, total=None, rate=4):
+        self.callback = callback
+        self.total = total
+        self.interval = 1 / rate
+        self.last_time = None
+        self.reported = None
+        self.done = 0
+
+    def update(self, done):
+        self.done = done
+        now = time.monotonic()
+        if done == self.total or self.last_time is None or now - self.last_time >= self.interval:
+            self.last_time = now
+            self.reported = done
+            self.callback(done, self.total)
+
+    def close(self):
+        if self.reported != self.done:
+            self.reported = self.done
+            self.callback(self.done, self.total)
+
+def shifted_sma(close, period):
+    """Mean of the `period` closes before each bar, i.e. the MA the strategy sees at bar i
+
+    close is a pandas Series, the rolling mean is computed once for the whole series.
+    """
+    ma = np.full(len(close), np.nan)
+    ma[1:] = close.rolling(period).mean().to_numpy(dtype=np.float64)[:-1]
+    return ma
+
+def low_volume_threshold(volume):
+    """Upper edge of the 'Low' zone pd.qcut(volume, q=3) draws, volumes above it are not Low"""
+    return float(np.quantile(np.asarray(volume, dtype=np.float64), 1 / 3))
+
+def entry_exit_signals(data, ma_short, ma_long, min_periods, low_volume=None):
+    """Vectorized entry and signal-exit masks for the MA/VWAP/volume strategy
+
+    data must already hold the vwap, volume_ma, volume_zone and volume_momentum columns.
+    low_volume replaces the volume_zone tertiles of the whole series with a threshold
+    from other bars (see low_volume_threshold), e.g. a walk-forward train window.
+    Returns (valid, entry, signal_exit) boolean arrays; bars that are not valid are
+    skipped by the strategy entirely.
+    """
+    close = data['close'].to_numpy(dtype=np.float64)
+    vwap = data['vwap'].to_numpy(dtype=np.float64)
+    volume = data['volume'].to_numpy(dtype=np.float64)
+    volume_ratio = volume / data['volume_ma'].to_numpy(dtype=np.float64)
+    if low_volume is None:
+        not_low_zone = ~(data['volume_zone'] == 'Low').to_numpy(dtype=bool)
+    else:
+        not_low_zone = volume > low_volume
+    volume_momentum = data['volume_momentum'].to_numpy(dtype=np.float64)
+
+    valid = ~(np.isnan(ma_short) | np.isnan(ma_long))
+    valid[:min_periods] = False
+    with np.errstate(divide='ignore', invalid='ignore'):
+        near_vwap = np.abs(close - vwap) / vwap < 0.005
+    entry = (valid & (ma_short > ma_long) & near_vwap &
+             (volume_ratio > 1.2) & not_low_zone & (volume_momentum > 1.1))
+    signal_exit = valid & (ma_short < ma_long) & (volume_ratio > 1)
+    return valid, entry, signal_exit
+
+def find_exit(close, atr, valid, signal_exit, entry_index, entry_price, stop_loss, take_profit, end):
+    """Index of the first bar after entry_index that closes the position, or None
+
+    Scans forward in growing blocks so short trades touch only a few bars.
+    """
+    lo = entry_index + 1
+    block = EXIT_SCAN_BLOCK
+    while lo < end:
+        hi = min(lo + block, end)
+        price = close[lo:hi]
+        price_change = (price - entry_price) / entry_price
+        # fmax ignores a NaN ATR the same way max(stop_loss, nan) does
+        stop = np.fmax(stop_loss, 2 * atr[lo:hi] / price)
+        hit = valid[lo:hi] & ((price_change <= -stop) | (price_change >= take_profit) | signal_exit[lo:hi])
+        if hit.any():
+            return lo + int(np.argmax(hit))
+        lo = hi
+        block *= 2
+    return None
+
+def run_state_machine(close, atr, valid, entry, signal_exit, stop_loss, take_profit, buy, sell, start=0, end=None,
+                      progress=None):
+    """Resolve the strategy's entries and exits, calling buy(i) and sell(i) in bar order
+
+    Entries come from the precomputed entry mask and exits from find_exit, so the
+    Python work is proportional to the number of trades rather than the number of
+    bars. buy(i) returns whether a position was actually opened. progress, a
+    ThrottledProgress over end - start bars, is updated after every closed trade and
+    once with the total when the run ends.
+    """
+    end = len(close) if end is None else end
+    entry_indices = np.flatnonzero(entry[:end])
+    i = start
+    while True:
+        k = np.searchsorted(entry_indices, i)
+        if k >= len(entry_indices):
+            break
+        entry_index = int(entry_indices[k])
+        if not buy(entry_index):
+            # A zero sized buy leaves the strategy flat, keep looking for the next entry
+            i = entry_index + 1
+            continue
+        exit_index = find_exit(close, atr, valid, signal_exit, entry_index, close[entry_index],
+                               stop_loss, take_profit, end)
+        if exit_index is None:
+            break
+        sell(exit_index)
+        i = exit_index + 1
+        if progress:
+            progress.update(i - start)
+    if progress and progress.reported != max(end - start, 0):
+        progress.update(max(end - start, 0))
+
+def max_drawdown_pct(profits, initial_capital):
+    """Largest peak to trough fall of the trade-by-trade capital, in percent"""
+    capital = initial_capital
+    peak = capital
+    max_drawdown = 0
+    for profit in profits:
+        capital += profit
+        peak = max(peak, capital)
+        drawdown = (peak - capital) / peak * 100
+        max_drawdown = max(max_drawdown, drawdown)
+    return max_drawdown
+
+def trade_metrics(profits, initial_capital, final_capital):
+    """Metrics dict of EnhancedBackTester.calculate_metrics from a list of trade profits
+
+    A position still open at the end of the data counts as a trade with zero profit.
+    """
+    if not profits:
+        return {
+            'total_trades': 0,
+            'winning_trades': 0,
+            'losing_trades': 0,
+            'win_rate': 0,
+            'total_profit': 0,
+            'average_profit': 0,
+            'largest_win': 0,
+            'largest_loss': 0,
+            'max_drawdown': 0,
+            'profit_factor': 0,
+            'final_capital': initial_capital
+        }
+
+    winning_trades = [p for p in profits if p > 0]
+    losing_trades = [p for p in profits if p < 0]
+    total_wins = sum(winning_trades) if winning_trades else 0
+    total_losses = abs(sum(losing_trades)) if losing_trades else 0
+
+    if total_losses > 0:
+        profit_factor = total_wins / total_losses
+    elif total_wins > 0:
+        profit_factor = float('inf')
+    else:
+        profit_factor = 0
+
+    return {
+        'total_trades': len(profits),
+        'winning_trades': len(winning_trades),
+        'losing_trades': len(losing_trades),
+        'win_rate': len(winning_trades) / len(profits),
+        'total_profit': sum(profits),
+        'average_profit': sum(profits) / len(profits),
+        'largest_win': max(profits),
+        'largest_loss': min(profits),
+        'max_drawdown': max_drawdown_pct(profits, initial_capital),
+        'profit_factor': profit_factor,
+        'final_capital': final_capital
+    }
+
+def find_exits_batch(close, atr, valid, signal_exit, rows, entry_index, entry_price, stop_loss, take_profit, end):
+    """find_exit for many positions at once, returns exit indices with -1 where none is found
+
+    valid and signal_exit are (signal sets, bars) matrices, rows selects each position's set.
+    All positions scan the same growing block sizes, so a block is one 2-D gather.
+    """
+    exits = np.full(len(rows), -1, dtype=np.int64)
+    lo = entry_index + 1
+    pending = np.flatnonzero(lo < end)
+    block = EXIT_SCAN_BLOCK
+    while len(pending):
+        index = lo[pending, None] + np.arange(block)
+        in_range = index < end
+        index = np.minimum(index, end - 1)
+        price = close[index]
+        entry = entry_price[pending, None]
+        price_change = (price - entry) / entry
+        stop = np.fmax(stop_loss[pending, None], 2 * atr[index] / price)
+        set_rows = rows[pending, None]
+        hit = in_range & valid[set_rows, index] & ((price_change <= -stop) |
+                                                   (price_change >= take_profit[pending, None]) |
+                                                   signal_exit[set_rows, index])
+        found = hit.any(axis=1)
+        exits[pending[found]] = index[found, np.argmax(hit[found], axis=1)]
+        lo[pending] += block
+        pending = pending[~found & (lo[pending] < end)]
+        block *= 2
+    return exits
+
+def trade_profit(fill_model, entry_index, entry_price, exit_index, exit_price, amount):
+    """Profit of round trips bought at entry_price and sold at exit_price (arrays)
+
+    Without a fill model the trades fill at the bar prices with no fees. With a
+    FillSimulator both legs are priced by it and its fees are deducted.
+    """
+    if fill_model is None:
+        return (exit_price - entry_price) * amount
+    buy_price, buy_fee = fill_model.fill(entry_index, entry_price, amount, is_buy=True)
+    sell_price, sell_fee = fill_model.fill(exit_index, exit_price, amount, is_buy=False)
+    return (sell_price - buy_price) * amount - buy_fee - sell_fee
+
+def entry_cost(fill_model, entry_index, entry_price, amount):
+    """What buying amount at entry_price costs, buy fee included, see trade_profit"""
+    if fill_model is None:
+        return entry_price * amount
+    buy_price, buy_fee = fill_model.fill(entry_index, entry_price, amount, is_buy=True)
+    return buy_price * amount + buy_fee
+
+def run_batch(close, atr, valid, entry, signal_exit, rows, start, stop_loss, take_profit, initial_capital,
+              position_size=0.95, fill_model=None):
+    """Trade K parameter sets side by side, returns (profits, final capital, trades) per set
+
+    valid, entry and signal_exit are (signal sets, bars) matrices and rows[k] picks the
+    signal set of parameter set k, so sets that differ only in stop loss or take profit
+    share their signals. Positions, capital and cursors are K-length arrays and each round
+    opens and closes the next trade of every set at once; the Python work grows with the
+    number of trades of the busiest set, not with K or the number of bars. The arithmetic
+    matches execute_buy / execute_sell, so results equal run_state_machine's exactly.
+    fill_model (a FillSimulator) prices every round of trades in one call, see trade_profit.
+    Each set's trades are (entry index, exit index or -1, amount, entry cost) tuples, the
+    input of risk_metrics.equity_curve.
+    """
+    n = len(close)
+    rows = np.asarray(rows, dtype=np.int64)
+    cursor = np.asarray(start, dtype=np.int64).copy()
+    stop_loss = np.asarray(stop_loss, dtype=np.float64)
+    take_profit = np.asarray(take_profit, dtype=np.float64)
+    capital = np.full(len(rows), initial_capital, dtype=np.float64)
+    profits = [[] for _ in range(len(rows))]
+    trades = [[] for _ in range(len(rows))]
+    # Entries of every signal set as one sorted array of row * n + bar
+    entry_keys = np.flatnonzero(entry)
+    active = np.arange(len(rows))
+
+    while len(active) and len(entry_keys):
+        pos = np.searchsorted(entry_keys, rows[active] * n + cursor[active])
+        key = entry_keys[np.minimum(pos, len(entry_keys) - 1)]
+        found = (pos < len(entry_keys)) & (key < (rows[active] + 1) * n)
+        active = active[found]
+        entry_index = key[found] - rows[active] * n
+
+        price = close[entry_index]
+        amount = capital[active] * position_size / price
+        # A zero sized buy leaves the set flat, it keeps looking from the next bar
+        opened = amount != 0
+        cursor[active[~opened]] = entry_index[~opened] + 1
+        flat = active[~opened]
+        active, entry_index, price, amount = active[opened], entry_index[opened], price[opened], amount[opened]
+
+        exits = find_exits_batch(close, atr, valid, signal_exit, rows[active], entry_index, price,
+                                 stop_loss[active], take_profit[active], n)
+        closed = exits >= 0
+        costs = entry_cost(fill_model, entry_index, price, amount)
+        for trade in zip(active.tolist(), entry_index.tolist(), exits.tolist(), amount.tolist(), costs.tolist()):
+            trades[trade[0]].append(trade[1:])
+        profit = trade_profit(fill_model, entry_index[closed], price[closed], exits[closed], close[exits[closed]],
+                              amount[closed])
+        capital[active[closed]] += profit
+        for k, p in zip(active[closed].tolist(), profit.tolist()):
+            profits[k].append(p)
+        # A position still open at the end is recorded with zero profit
+        for k in active[~closed].tolist():
+            profits[k].append(0)
+        cursor[active[closed]] = exits[closed] + 1
+        active = np.sort(np.concatenate([active[closed], flat]))
+
+    return profits, capital, trades
+
+def window_trade_arrays(trades, start=0):
+    """(entry index, exit index, amount, entry cost) arrays of run_batch trades, indices counted from start
+
+    Positions still open keep their -1 exit index.
+    """
+    columns = np.array(trades, dtype=np.float64).reshape(-1, 4)
+    entries = columns[:, 0].astype(np.int64) - start
+    exits = columns[:, 1].astype(np.int64)
+    exits = np.where(exits >= 0, exits - start, -1)
+    return entries, exits, columns[:, 2], columns[:, 3]
@@ -0,0 +1,98 @@
+"""Check the vectorized backtest engine against the bar-by-bar loop and time both.
+
+Runs on sample_data.csv and on a synthetic series (1M bars by default). The loop is
+only timed on the first --loop-bars bars of the synthetic series and extrapolated
+linearly, pass --loop-bars 0 to run it on the whole series.
+
+Usage: python benchmarks/benchmark_backtest_engine.py [--bars N] [--loop-bars N]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+import scratch  # Before enhanced_backtester, which logs to the working directory
+from enhanced_backtester import EnhancedBackTester
+
+PARAMETER_SETS = [
+    {'stop_loss': 0.02, 'take_profit': 0.03, 'ma_short': 20, 'ma_long': 50},
+    {'stop_loss': 0.01, 'take_profit': 0.015, 'ma_short': 10, 'ma_long': 55},
+    {'stop_loss': 0.005, 'take_profit': 0.005, 'ma_short': 5, 'ma_long': 20},
+]
+
+
+def make_series(n_bars, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 300000 * np.exp(np.cumsum(rng.normal(0, 0.002, n_bars)))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n_bars, freq='1min'),
+        'open': close,
+        'high': close * (1 + rng.uniform(0, 0.002, n_bars)),
+        'low': close * (1 - rng.uniform(0, 0.002, n_bars)),
+        'close': close,
+        'volume': rng.lognormal(0, 1, n_bars),
+    })
+
+
+def run(tester, params, engine):
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        start = time.perf_counter()
+        result = tester.run_backtest(params, engine=engine)
+        elapsed = time.perf_counter() - start
+    return result, elapsed
+
+
+def check_parity(data_file, label, loop_bars=0):
+    tester = EnhancedBackTester(data_file)
+    if loop_bars:
+        tester.data = tester.data.iloc[:loop_bars].copy()
+    for params in PARAMETER_SETS:
+        loop_result, loop_time = run(tester, params, 'loop')
+        vector_result, vector_time = run(tester, params, 'vectorized')
+        assert loop_result['trades'] == vector_result['trades'], f"trade mismatch on {label} with {params}"
+        assert loop_result['metrics'] == vector_result['metrics'], f"metric mismatch on {label} with {params}"
+        yield params, len(tester.data), loop_result['metrics']['total_trades'], loop_time, vector_time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bars', type=int, default=1_000_000)
+    parser.add_argument('--loop-bars', type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic_file = os.path.join(tmp, 'synthetic.csv')
+        make_series(args.bars).to_csv(synthetic_file, index=False)
+
+        print(f"{'dataset':<22} {'params':<12} {'bars':>9} {'trades':>7} {'loop s':>9} {'vector s':>9} {'speedup':>8}")
+        loop_rates = {}
+        for label, data_file, loop_bars in (('sample_data.csv', os.path.join(ROOT, 'sample_data.csv'), 0),
+                                            ('synthetic (parity)', synthetic_file, args.loop_bars)):
+            for params, bars, trades, loop_time, vector_time in check_parity(data_file, label, loop_bars):
+                name = f"{params['ma_short']}/{params['ma_long']}"
+                loop_rates[name] = loop_time / bars
+                print(f"{label:<22} {name:<12} {bars:>9,} {trades:>7} {loop_time:>9.3f} {vector_time:>9.3f} "
+                      f"{loop_time / vector_time:>7.0f}x")
+
+        # Full-length run of the vectorized engine, the loop is linear in bars so its time is extrapolated
+        tester = EnhancedBackTester(synthetic_file)
+        for params in PARAMETER_SETS:
+            result, vector_time = run(tester, params, 'vectorized')
+            name = f"{params['ma_short']}/{params['ma_long']}"
+            loop_estimate = loop_rates[name] * len(tester.data)
+            print(f"{'synthetic (full)':<22} {name:<12} {len(tester.data):>9,} {result['metrics']['total_trades']:>7} "
+                  f"{loop_estimate:>8.1f}{'*' if args.loop_bars else ' '} {vector_time:>9.3f} {loop_estimate / vector_time:>7.0f}x")
+        if args.loop_bars:
+            print(f"* loop time extrapolated from the first {args.loop_bars:,} bars")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Check fill-simulated backtests and measure what realistic costs do to the optimizer.
+
+Runs the optimizer grid under a synthetic FillSimulator (taker fee, spread and
+depth slippage) and asserts that the batched engine, run_backtest and the bar-by-bar
+loop agree. It then compares the cost-free and cost-aware rankings of the grid and
+the time the batch takes with and without the fill model.
+
+Usage: python benchmarks/benchmark_fill_simulator.py [--bars N]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import scratch  # Before enhanced_backtester, which logs to the working directory
+from enhanced_backtester import EnhancedBackTester
+from fill_simulator import FeeSchedule, FillSimulator
+from benchmark_backtest_engine import make_series
+from benchmark_batch_backtest import GRID
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main(n_bars):
+    fill_model = FillSimulator.synthetic(fees=FeeSchedule(maker=0.0, taker=0.001), spread=0.001)
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, 'synthetic.csv')
+        make_series(n_bars).to_csv(data_file, index=False)
+
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            tester = EnhancedBackTester(data_file)
+            combinations = tester.generate_parameter_combinations(GRID)
+            tester.run_batch(combinations)  # Warm the indicator cache
+            free, free_time = timed(lambda: tester.run_batch(combinations))
+            tester.fill_model = fill_model
+            costed, costed_time = timed(lambda: tester.run_batch(combinations))
+            single = [tester.run_backtest(params)['metrics'] for params in combinations[:9]]
+            loop = tester.run_backtest(combinations[0], engine='loop')['metrics']
+
+    for params, expected, actual in zip(combinations, single, costed):
+        assert expected == actual, f"batch and run_backtest differ with {params}"
+    assert loop == single[0], "loop engine differs under the fill model"
+    print(f"consistency: batch == run_backtest on {len(single)} sets, loop engine matches")
+
+    trades = sum(m['total_trades'] for m in costed)
+    costs = sum(f['total_profit'] - c['total_profit'] for f, c in zip(free, costed))
+    print(f"{len(combinations)} sets, {trades} trades: costs take {costs:,.2f} MYR, "
+          f"{costs / max(trades, 1):.2f} MYR per round trip")
+
+    def ranking(results):
+        return sorted(range(len(results)), key=lambda i: -results[i]['total_profit'])
+    free_rank, costed_rank = ranking(free), ranking(costed)
+    print(f"best without costs: {combinations[free_rank[0]]} -> {free[free_rank[0]]['total_profit']:.2f} MYR, "
+          f"{costed[free_rank[0]]['total_profit']:.2f} MYR after costs")
+    print(f"best after costs:   {combinations[costed_rank[0]]} -> {costed[costed_rank[0]]['total_profit']:.2f} MYR")
+    print(f"top 10 overlap: {len(set(free_rank[:10]) & set(costed_rank[:10]))}/10")
+    print(f"batch time: {free_time:.3f}s without fill model, {costed_time:.3f}s with "
+          f"({costed_time / free_time:.2f}x)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bars', type=int, default=200_000)
+    args = parser.parse_args()
+    main(args.bars)
@@ -0,0 +1,120 @@
+"""Measure what console output costs the backtester, and check quiet mode changes nothing else.
+
+Runs the optimizer grid one run_backtest per parameter set, the bar-by-bar loop
+engine and optimize_strategy, each with the default console output and with
+quiet=True plus a progress callback. The console output goes to a pseudo-terminal
+drained by a background thread (os.devnull where ptys are unavailable, which
+understates the cost). Metrics and trade logs must be identical in both modes.
+
+Usage: python benchmarks/benchmark_headless.py [--bars N] [--loop-bars N]
+"""
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import scratch  # Before enhanced_backtester, which logs to the working directory
+from enhanced_backtester import EnhancedBackTester
+from benchmark_backtest_engine import make_series
+from benchmark_batch_backtest import GRID
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+@contextlib.contextmanager
+def console():
+    """Send stdout and stderr to a terminal nobody looks at"""
+    try:
+        import pty
+        master, slave = pty.openpty()
+    except (ImportError, OSError):
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), \
+                contextlib.redirect_stderr(devnull):
+            yield
+        return
+
+    def drain():
+        try:
+            while os.read(master, 65536):
+                pass
+        except OSError:
+            pass
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+    with open(slave, 'w', closefd=True) as terminal, contextlib.redirect_stdout(terminal), \
+            contextlib.redirect_stderr(terminal):
+        yield
+    os.close(master)
+
+
+def compare(label, verbose_fn, quiet_fn):
+    with console():
+        verbose, verbose_time = timed(verbose_fn)
+    quiet, quiet_time = timed(quiet_fn)
+    assert verbose == quiet, f"{label}: quiet mode changed the results"
+    print(f"{label:<32} {verbose_time:>10.3f} {quiet_time:>10.3f} {verbose_time / quiet_time:>8.1f}x")
+
+
+def main(n_bars, loop_bars):
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, 'synthetic.csv')
+        make_series(n_bars).to_csv(data_file, index=False)
+        loop_file = os.path.join(tmp, 'loop.csv')
+        make_series(loop_bars).to_csv(loop_file, index=False)
+
+        updates = []
+        progress = lambda done, total: updates.append((time.monotonic(), done, total))
+        with console():
+            verbose = EnhancedBackTester(data_file)
+            loop_verbose = EnhancedBackTester(loop_file)
+        quiet = EnhancedBackTester(data_file, quiet=True, progress=progress)
+        loop_quiet = EnhancedBackTester(loop_file, quiet=True, progress=progress)
+        combinations = verbose.generate_parameter_combinations(GRID)
+
+        def per_set(tester):
+            return lambda: [(tester.run_backtest(params)['metrics'], list(tester.trade_log)) for params in combinations]
+
+        def loop(tester):
+            return lambda: (tester.run_backtest(combinations[0], engine='loop')['metrics'], list(tester.trade_log))
+
+        def optimize(tester):
+            def run():
+                tester.optimal_strategy = None
+                return tester.optimize_strategy(GRID)
+            return run
+
+        print(f"{'':<32} {'verbose s':>10} {'quiet s':>10} {'speedup':>9}")
+        per_set(quiet)()  # Warm the indicator caches of both testers alike
+        with console():
+            per_set(verbose)()
+        updates.clear()
+        compare(f"run_backtest x {len(combinations)} ({n_bars:,} bars)", per_set(verbose), per_set(quiet))
+        finished = sum(done == total for _, done, total in updates)
+        assert finished == len(combinations), f"{finished} of {len(combinations)} vectorized runs reported their end"
+        set_updates = len(updates)
+        updates.clear()
+        compare(f"loop engine ({loop_bars:,} bars)", loop(loop_verbose), loop(loop_quiet))
+        loop_updates = len(updates)
+        compare(f"optimize_strategy ({len(combinations)} sets)", optimize(verbose), optimize(quiet))
+
+    print(f"progress callback: {set_updates} updates over {len(combinations)} vectorized runs, "
+          f"{loop_updates} during the loop run, last {updates[-1][1]}/{updates[-1][2]} "
+          f"of the optimizer run")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bars', type=int, default=100_000)
+    parser.add_argument('--loop-bars', type=int, default=20_000)
+    args = parser.parse_args()
+    main(args.bars, args.loop_bars)
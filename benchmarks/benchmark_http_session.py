@@ -0,0 +1,95 @@
+"""Benchmark pooled vs unpooled LunoAPIClient requests against a local stand-in server.
+
+Also checks that prewarm(n) opens n connections to the server.
+
+Usage: python benchmarks/benchmark_http_session.py [--requests N]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from luno_api_client import LunoAPIClient
+
+TICKER = json.dumps({
+    "pair": "XBTMYR",
+    "timestamp": 1700000000000,
+    "bid": "374000.00",
+    "ask": "374100.00",
+    "last_trade": "374050.00",
+    "rolling_24_hour_volume": "12.5",
+    "status": "ACTIVE"
+}).encode()
+
+
+class TickerHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive capable
+    disable_nagle_algorithm = True
+    wbufsize = -1  # Send headers and body in one segment
+    connections = 0  # Accepted so far, one handler instance per connection
+
+    def setup(self):
+        TickerHandler.connections += 1
+        super().setup()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(TICKER)))
+        self.end_headers()
+        self.wfile.write(TICKER)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run(client, n_requests):
+    latencies = np.empty(n_requests)
+    start = time.perf_counter()
+    for i in range(n_requests):
+        t0 = time.perf_counter()
+        client.get_ticker("XBTMYR")
+        latencies[i] = time.perf_counter() - t0
+    elapsed = time.perf_counter() - start
+    return n_requests / elapsed, np.percentile(latencies, 50) * 1000, np.percentile(latencies, 99) * 1000
+
+
+def main(n_requests):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TickerHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"{'mode':<10} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for mode, pooled in (("unpooled", False), ("pooled", True)):
+        # No rate limiter, the benchmark measures connection reuse rather than the request budget
+        with LunoAPIClient("key", "secret", base_url=base_url, pooled=pooled, prewarm=pooled,
+                           rate_limiter=False) as client:
+            rate, p50, p99 = run(client, n_requests)
+        print(f"{mode:<10} {rate:>10.0f} {p50:>10.3f} {p99:>10.3f}")
+
+    with LunoAPIClient("key", "secret", base_url=base_url, rate_limiter=False) as client:
+        before = TickerHandler.connections
+        client.prewarm(4)
+        opened = TickerHandler.connections - before
+    assert opened == 4, f"prewarm(4) opened {opened} connections"
+    print(f"prewarm(4) opened {opened} connections")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+    main(args.requests)
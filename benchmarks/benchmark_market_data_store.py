@@ -0,0 +1,80 @@
+"""Benchmark loading a year of minute candles from CSV vs the columnar MarketDataStore.
+
+Usage: python benchmarks/benchmark_market_data_store.py [--bars N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from market_data_store import MarketDataStore
+
+
+def make_candles(n_bars):
+    rng = np.random.default_rng(42)
+    close = 300000 * np.exp(np.cumsum(rng.normal(0, 0.001, n_bars)))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n_bars, freq='1min'),
+        'open': close * (1 + rng.normal(0, 0.0005, n_bars)),
+        'high': close * 1.001,
+        'low': close * 0.999,
+        'close': close,
+        'volume': rng.lognormal(0, 1, n_bars),
+    })
+
+
+def best_of(fn, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(n_bars):
+    candles = make_candles(n_bars)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = os.path.join(tmp, 'historical_data_XBTMYR.csv')
+        candles.to_csv(csv_file, index=False)
+        store = MarketDataStore(os.path.join(tmp, 'market_data'))
+        store.append_candles('XBTMYR', candles, duration=60)
+
+        # The CSV path as used by EnhancedBackTester: read_csv, then timestamp parsing in run_backtest
+        def load_csv():
+            df = pd.read_csv(csv_file)
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            return df
+
+        def load_store():
+            return MarketDataStore(store.root).load_candles('XBTMYR', duration=60)
+
+        def load_store_month():
+            return MarketDataStore(store.root).load_candles('XBTMYR', start=pd.Timestamp('2024-06-01'),
+                                                            end=pd.Timestamp('2024-07-01'), duration=60)
+
+        csv_time, csv_df = best_of(load_csv)
+        store_time, store_df = best_of(load_store)
+        month_time, month_df = best_of(load_store_month)
+
+    assert len(csv_df) == len(store_df) == n_bars
+    # CSV text round-trips can lose the last bit of a float
+    assert np.allclose(csv_df['close'].to_numpy(), store_df['close'].to_numpy(), rtol=1e-14)
+
+    print(f"{n_bars:,} minute bars")
+    print(f"{'CSV (read_csv + to_datetime)':<32} {csv_time:8.3f} s")
+    print(f"{'MarketDataStore (all)':<32} {store_time:8.3f} s  ({csv_time / store_time:.0f}x faster)")
+    print(f"{'MarketDataStore (one month)':<32} {month_time:8.3f} s  ({len(month_df):,} bars)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bars', type=int, default=525_600)  # One year of minute bars
+    args = parser.parse_args()
+    main(args.bars)
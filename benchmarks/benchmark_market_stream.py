@@ -0,0 +1,90 @@
+"""Replay a trade tape through the local ReplayServer and measure the streaming client.
+
+1. Throughput: a synthetic tape is sent as fast as possible; every trade must arrive.
+2. Reaction time: trades are replayed at their real spacing and the delay between a
+   trade's scheduled time and its callback is measured (polling reacts in 5-10 s).
+3. Gap recovery: a few sequences are dropped by the server; the client must notice,
+   resync from a fresh snapshot and keep streaming to the end of the tape.
+
+Usage: python benchmarks/benchmark_market_stream.py [--trades N]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from luno_api_client import Trade
+from market_stream import MarketStream, ReplayServer, trades_to_messages
+
+PAIR = 'XBTMYR'
+
+
+def make_trades(n, spacing_ms=1, seed=5):
+    rng = np.random.default_rng(seed)
+    prices = 300000 * np.exp(np.cumsum(rng.normal(0, 0.0005, n)))
+    volumes = rng.lognormal(-5, 1, n)
+    sides = rng.random(n) < 0.5
+    start = int(time.time() * 1000)
+    return [Trade(i + 1, start + i * spacing_ms, float(p), float(v), bool(b))
+            for i, (p, v, b) in enumerate(zip(prices, volumes, sides))]
+
+
+async def replay(trades, speed=None, drop_sequences=()):
+    messages = trades_to_messages(trades)
+    received = []
+    async with ReplayServer(messages, speed=speed, drop_sequences=drop_sequences) as server:
+        stream = MarketStream(PAIR, 'replay', 'replay', url=server.stream_url(PAIR), reconnect_delay=0.05)
+        stream.on('trade', lambda trade: received.append((time.perf_counter(), trade)))
+        task = asyncio.ensure_future(stream.run())
+        started = time.perf_counter()
+        await server.finished.wait()
+        # Let the client drain what is still in flight
+        while stream.sequence != int(messages[-1]['sequence']):
+            await asyncio.sleep(0.001)
+        elapsed = time.perf_counter() - started
+        await stream.stop()
+        await task
+    return received, elapsed, started, stream, server
+
+
+async def main(n_trades):
+    trades = make_trades(n_trades)
+    received, elapsed, _, stream, _ = await replay(trades)
+    got = [trade for _, trade in received]
+    assert len(got) == len(trades), f"{len(got)} of {len(trades)} trades arrived"
+    # Prices travel as 8 decimal strings like on the live API
+    assert [t.is_buy for t in got] == [t.is_buy for t in trades], "trade sides differ from the tape"
+    assert np.allclose([t.price for t in got], [t.price for t in trades], rtol=1e-9), "prices differ from the tape"
+    print(f"throughput: {len(received):,} trades ({stream.stats['messages']:,} messages) in {elapsed:.2f}s, "
+          f"{stream.stats['messages'] / elapsed:,.0f} messages/s")
+
+    paced = make_trades(300, spacing_ms=10)
+    received, _, started, _, _ = await replay(paced, speed=1.0)
+    # The first trade goes out with the snapshot's connection, later ones at their tape offset
+    lags = np.array([(at - started) * 1000 - (trade.timestamp - paced[0].timestamp) for at, trade in received])
+    lags -= lags.min()
+    print(f"reaction time: median {np.median(lags):.2f} ms, p99 {np.percentile(lags, 99):.2f} ms "
+          f"over {len(lags)} paced trades")
+
+    # Trade i is sent as sequences 2i + 2 and 2i + 3, drop three trade_updates spread over the tape
+    count = min(n_trades, 6000)
+    drop = {2 * (count * k // 12) + 1 for k in (1, 5, 9)}
+    last_sequence = 2 * count + 1
+    received, _, _, stream, server = await replay(trades[:count], drop_sequences=drop)
+    assert stream.stats['gaps'] == len(drop), stream.stats
+    assert stream.sequence == last_sequence, f"stream at {stream.sequence}, tape ends at {last_sequence}"
+    print(f"gap recovery: {stream.stats['gaps']} gaps detected, {stream.stats['connects']} connections, "
+          f"{len(received):,} of {count:,} trades delivered, stream in sync at sequence {stream.sequence}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--trades', type=int, default=20_000)
+    args = parser.parse_args()
+    if args.trades < 12:
+        parser.error("--trades must be at least 12, the gap recovery check drops three of them")
+    asyncio.run(main(args.trades))
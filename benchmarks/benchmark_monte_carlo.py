@@ -0,0 +1,98 @@
+"""Check the Monte Carlo robustness analysis and time 100k resampled paths.
+
+Backtests one parameter set on a synthetic series, then resamples its closed trades
+with each method. The vectorized path statistics are checked against a loop over
+paths, reshuffled paths must all end at the backtest's final capital (the order of
+trades does not change their product), and the same seed must give the same paths.
+Finally the strategy is rerun on block-bootstrapped price paths.
+
+Usage: python benchmarks/benchmark_monte_carlo.py [--bars N] [--paths N] [--price-paths N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import scratch  # Before enhanced_backtester, which logs to the working directory
+from enhanced_backtester import EnhancedBackTester
+from monte_carlo import (DEFAULT_MAX_BYTES, trade_returns, resample_indices, path_statistics, trade_monte_carlo,
+                         percentiles)
+from benchmark_backtest_engine import make_series
+
+PARAMS = {'ma_short': 10, 'ma_long': 40, 'stop_loss': 0.01, 'take_profit': 0.04}
+
+
+def reference(returns, indices, initial_capital, ruin_level):
+    """path_statistics one path and one trade at a time"""
+    results = []
+    for row in indices:
+        equity = peak = low = initial_capital
+        drawdown = 0.0
+        for r in returns[row]:
+            equity *= 1 + r
+            peak = max(peak, equity)
+            low = min(low, equity)
+            drawdown = max(drawdown, 1 - equity / peak)
+        results.append((equity, drawdown * 100, low <= ruin_level * initial_capital))
+    return [np.array(column) for column in zip(*results)]
+
+
+def main(n_bars, n_paths, price_paths):
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, 'synthetic.csv')
+        make_series(n_bars).to_csv(data_file, index=False)
+        tester = EnhancedBackTester(data_file, quiet=True)
+        tester.run_backtest(PARAMS)
+
+        profits = [t['profit'] for t in tester.trades if 'exit_index' in t]
+        final = tester.initial_capital + sum(profits)
+        returns = trade_returns(profits, tester.initial_capital)
+        rng = np.random.default_rng(0)
+        for method in ('bootstrap', 'shuffle', 'block'):
+            indices = resample_indices(rng, 200, len(returns), method)
+            expected = reference(returns, indices, tester.initial_capital, 0.9)
+            actual = path_statistics(returns[indices], tester.initial_capital, 0.9)
+            for e, a in zip(expected, actual):
+                assert np.allclose(e, a), f"{method}: vectorized path statistics differ from the loop"
+        shuffled = trade_monte_carlo(profits, tester.initial_capital, 1000, 'shuffle', seed=1)
+        assert np.allclose(shuffled['final_capital'], final), "reshuffled paths must end at the same capital"
+        again = trade_monte_carlo(profits, tester.initial_capital, 1000, 'bootstrap', seed=1)
+        assert np.array_equal(again['final_capital'],
+                              trade_monte_carlo(profits, tester.initial_capital, 1000, 'bootstrap', seed=1)['final_capital'])
+        print(f"consistency: {len(profits)} trades, final capital {final:.2f}; loop reference, shuffle "
+              f"invariance and seeding hold")
+
+        chunk = DEFAULT_MAX_BYTES // (len(returns) * 8 * 4)
+        print(f"\n{'method':<10} {'paths':>8} {'seconds':>8} {'p5 capital':>11} {'p50 capital':>12} "
+              f"{'p95 drawdown %':>15} {'ruin':>7} {'loss':>7}")
+        for method in ('bootstrap', 'shuffle', 'block'):
+            start = time.perf_counter()
+            result = trade_monte_carlo(profits, tester.initial_capital, n_paths, method, seed=42)
+            elapsed = time.perf_counter() - start
+            capital, drawdown = percentiles(result['final_capital']), percentiles(result['max_drawdown'])
+            print(f"{method:<10} {n_paths:>8,} {elapsed:>8.2f} {capital[5]:>11.2f} {capital[50]:>12.2f} "
+                  f"{drawdown[95]:>15.2f} {result['risk_of_ruin']:>7.2%} {result['probability_of_loss']:>7.2%}")
+        print(f"chunks of {chunk:,} paths (~{DEFAULT_MAX_BYTES // 2 ** 20} MB)")
+
+        start = time.perf_counter()
+        result = tester.price_path_monte_carlo(PARAMS, n_paths=price_paths, seed=42)
+        elapsed = time.perf_counter() - start
+        capital, drawdown = percentiles(result['final_capital']), percentiles(result['max_drawdown'])
+        print(f"\nprice paths: {price_paths} block-bootstrapped series of {n_bars:,} bars in {elapsed:.2f}s, "
+              f"final capital p5 {capital[5]:.2f} / p50 {capital[50]:.2f}, p95 drawdown {drawdown[95]:.2f}%, "
+              f"probability of loss {result['probability_of_loss']:.2%}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bars', type=int, default=200_000)
+    parser.add_argument('--paths', type=int, default=100_000)
+    parser.add_argument('--price-paths', type=int, default=50)
+    args = parser.parse_args()
+    main(args.bars, args.paths, args.price_paths)
@@ -0,0 +1,131 @@
+"""Check OrderBook against a brute-force book and time incremental updates.
+
+A random stream of order creates, deletes and partial fills is applied through
+OrderBook.apply_update and mirrored in a plain dict of orders. After every batch the
+best prices, depth, VWAP-to-fill and checksum are compared with the values rebuilt
+from scratch. The update rate is then compared with re-parsing a full snapshot per
+update, which is what polling get_order_book amounts to.
+
+Usage: python benchmarks/benchmark_order_book.py [--updates N] [--orders N]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from order_book import OrderBook
+
+
+def make_updates(n_updates, n_orders, seed=3):
+    """A snapshot of n_orders resting orders and n_updates order-level messages"""
+    rng = np.random.default_rng(seed)
+    live = {}
+    snapshot = {'sequence': '0', 'bids': [], 'asks': []}
+    for i in range(n_orders):
+        side = 'BID' if i % 2 else 'ASK'
+        price = 300000 + (-1 if side == 'BID' else 1) * int(rng.integers(1, 500))
+        volume = round(float(rng.lognormal(-4, 1)), 6)
+        order_id = f"o{i}"
+        live[order_id] = (side, price, volume)
+        snapshot['bids' if side == 'BID' else 'asks'].append(
+            {'id': order_id, 'price': f"{price:.2f}", 'volume': f"{volume:.6f}"})
+
+    updates = []
+    next_id = n_orders
+    for sequence in range(1, n_updates + 1):
+        message = {'sequence': str(sequence), 'trade_updates': None, 'create_update': None,
+                   'delete_update': None, 'timestamp': sequence}
+        action = rng.random()
+        if action < 0.45 or len(live) < 10:
+            side = 'BID' if rng.random() < 0.5 else 'ASK'
+            price = 300000 + (-1 if side == 'BID' else 1) * int(rng.integers(1, 500))
+            volume = round(float(rng.lognormal(-4, 1)), 6)
+            order_id = f"o{next_id}"
+            next_id += 1
+            live[order_id] = (side, price, volume)
+            message['create_update'] = {'order_id': order_id, 'type': side, 'price': f"{price:.2f}",
+                                        'volume': f"{volume:.6f}"}
+        else:
+            order_id = list(live)[int(rng.integers(len(live)))]
+            side, price, volume = live[order_id]
+            if action < 0.8:
+                del live[order_id]
+                message['delete_update'] = {'order_id': order_id}
+            else:
+                base = round(volume * float(rng.choice([0.5, 1.0])), 6)
+                remaining = round(volume - base, 6)
+                if remaining > 0:
+                    live[order_id] = (side, price, remaining)
+                else:
+                    del live[order_id]
+                message['trade_updates'] = [{'base': f"{base:.6f}", 'counter': f"{base * price:.8f}",
+                                             'maker_order_id': order_id, 'taker_order_id': 't'}]
+        updates.append((message, dict(live)))
+    return snapshot, updates
+
+
+def brute_force(live):
+    levels = {'BID': {}, 'ASK': {}}
+    for side, price, volume in live.values():
+        levels[side][price] = round(levels[side].get(price, 0.0) + volume, 8)
+    book = {'sequence': '0',
+            'bids': [{'price': p, 'volume': v} for p, v in levels['BID'].items() if v > 0],
+            'asks': [{'price': p, 'volume': v} for p, v in levels['ASK'].items() if v > 0]}
+    return levels, book
+
+
+def check(book, live):
+    levels, snapshot = brute_force(live)
+    assert book.best_bid == max(levels['BID']), (book.best_bid, max(levels['BID']))
+    assert book.best_ask == min(levels['ASK']), (book.best_ask, min(levels['ASK']))
+    for side in ('BID', 'ASK'):
+        price = next(iter(levels[side]))
+        assert abs(book.depth(side, price) - levels[side][price]) < 1e-9
+    asks = sorted(levels['ASK'].items())
+    size = sum(v for _, v in asks[:5]) * 0.9
+    remaining, cost = size, 0.0
+    for price, volume in asks:
+        take = min(remaining, volume)
+        cost += take * price
+        remaining -= take
+        if remaining <= 0:
+            break
+    assert abs(book.vwap_to_fill(size, is_buy=True) - cost / size) < 1e-6
+    assert book.verify(snapshot), "checksum differs from the rebuilt book"
+
+
+def main(n_updates, n_orders):
+    snapshot, updates = make_updates(n_updates, n_orders)
+    book = OrderBook.from_snapshot(snapshot)
+    for i, (message, live) in enumerate(updates):
+        book.apply_update(message)
+        if i % 500 == 0 or i == len(updates) - 1:
+            check(book, live)
+    print(f"consistency: {len(updates):,} updates checked against the brute-force book, "
+          f"{len(book.bids)} bid / {len(book.asks)} ask levels at the end")
+
+    book = OrderBook.from_snapshot(snapshot)
+    start = time.perf_counter()
+    for message, _ in updates:
+        book.apply_update(message)
+        book.best_bid, book.best_ask
+    incremental = (time.perf_counter() - start) / len(updates)
+
+    samples = [brute_force(live)[1] for _, live in updates[:200]]
+    start = time.perf_counter()
+    for sample in samples:
+        OrderBook.from_snapshot(sample)
+    rebuild = (time.perf_counter() - start) / len(samples)
+    print(f"incremental update + best prices: {incremental * 1e6:.2f} us, "
+          f"rebuild from snapshot: {rebuild * 1e6:.0f} us ({rebuild / incremental:,.0f}x)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--updates', type=int, default=50_000)
+    parser.add_argument('--orders', type=int, default=5_000)
+    args = parser.parse_args()
+    main(args.updates, args.orders)
@@ -0,0 +1,69 @@
+"""Check that the ResultStore resumes an optimization and keys results by the backtester settings.
+
+Optimizes the grid of benchmark_batch_backtest on a synthetic series into a fresh
+store, then repeats the run: the second pass must skip every set and return the
+same best result. Runs with another initial capital or position size must evaluate
+every set again, and without a fill model the profits scale with the capital.
+
+Usage: python benchmarks/benchmark_result_store.py [--bars N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import scratch  # Before enhanced_backtester, which logs to the working directory
+from enhanced_backtester import EnhancedBackTester
+from result_store import ResultStore
+from benchmark_backtest_engine import make_series
+from benchmark_batch_backtest import GRID
+
+
+def optimize(data_file, store, **settings):
+    tester = EnhancedBackTester(data_file, quiet=True, **settings)
+    tester.optimal_strategy = None  # Rank the grid alone, not against the previous run's optimum
+    start = time.perf_counter()
+    params, metrics = tester.optimize_strategy(GRID, store=store)
+    return tester, params, metrics, time.perf_counter() - start
+
+
+def main(n_bars):
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, 'synthetic.csv')
+        make_series(n_bars).to_csv(data_file, index=False)
+        n_sets = len(EnhancedBackTester(data_file, quiet=True).generate_parameter_combinations(GRID))
+
+        with ResultStore(os.path.join(tmp, 'results.db')) as store:
+            print(f"{'run':<24} {'stored':>7} {'skipped':>8} {'seconds':>8} {'best profit':>12}")
+            runs = {}
+            for label, settings in (('capital 1000', {}), ('capital 1000 resumed', {}),
+                                    ('capital 5000', {'initial_capital': 5000}),
+                                    ('position size 0.5', {'position_size': 0.5})):
+                tester, params, metrics, elapsed = optimize(data_file, store, **settings)
+                runs[label] = (tester.store_stats, params, metrics)
+                print(f"{label:<24} {tester.store_stats['stored']:>7} {tester.store_stats['skipped']:>8} "
+                      f"{elapsed:>8.2f} {metrics['total_profit']:>12.2f}")
+
+        first, resumed = runs['capital 1000'], runs['capital 1000 resumed']
+        assert first[0] == {'stored': n_sets, 'skipped': 0}, first[0]
+        assert resumed[0] == {'stored': 0, 'skipped': n_sets}, "the resumed run evaluated stored sets again"
+        assert resumed[1:] == first[1:], "the resumed run found another best result"
+        for label in ('capital 5000', 'position size 0.5'):
+            assert runs[label][0] == {'stored': n_sets, 'skipped': 0}, f"{label} was served stored results"
+        # Positions are a fraction of capital and fills are at the close, so profits scale with it
+        assert runs['capital 5000'][1] == first[1]
+        assert np.isclose(runs['capital 5000'][2]['total_profit'], 5 * first[2]['total_profit'])
+        print(f"\n{n_sets} sets per run; changed settings are evaluated again, profits scale with the capital")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bars', type=int, default=50_000)
+    args = parser.parse_args()
+    main(args.bars)
@@ -0,0 +1,116 @@
+"""Check the risk metrics against a pandas reference and measure what they cost the optimizer.
+
+Runs the optimizer grid with run_batch and, for every set, rebuilds the per-bar
+equity curve bar by bar with pandas from the trades of run_backtest, asserting the
+Sharpe, Sortino, Calmar, drawdown, exposure and turnover figures agree. It then
+times trade_risk_metrics per candidate, compares the drawdown seen by the
+closed-trade metric with the mark-to-market one, and the profit and Sharpe rankings.
+
+Usage: python benchmarks/benchmark_risk_metrics.py [--bars N]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import scratch  # Before enhanced_backtester, which logs to the working directory
+from enhanced_backtester import EnhancedBackTester
+from risk_metrics import PEAK_TOLERANCE, trade_risk_metrics
+from benchmark_backtest_engine import make_series
+from benchmark_batch_backtest import GRID
+
+
+def reference(close, trades, initial_capital, periods_per_year):
+    """The same metrics from an equity curve marked to market one bar at a time"""
+    capital, amount, cost = initial_capital, 0.0, 0.0
+    entries = {t['entry_index']: t for t in trades}
+    exits = {t['exit_index']: t for t in trades if 'exit_index' in t}
+    equity = []
+    traded = 0.0
+    for i, price in enumerate(close):
+        if i in exits:
+            capital += exits[i]['profit']
+            amount, cost = 0.0, 0.0
+            traded += exits[i]['amount'] * price
+        if i in entries:
+            amount, cost = entries[i]['amount'], entries[i]['entry_cost']
+            traded += amount * price
+        equity.append(capital + amount * price - cost)
+    equity = pd.Series(equity)
+    returns = equity.pct_change().dropna()
+    peak = equity.cummax()
+    drawdown = (peak - equity) / peak
+    under_water = (drawdown > PEAK_TOLERANCE).astype(int)
+    # Length of each run of bars under water
+    duration = under_water.groupby((under_water == 0).cumsum()).cumsum().max()
+    annual_return = (equity.iloc[-1] / equity.iloc[0]) ** (periods_per_year / (len(equity) - 1)) - 1
+    volatility = returns.std(ddof=0)
+    downside = np.sqrt((returns.clip(upper=0) ** 2).mean())
+    return {
+        'sharpe_ratio': returns.mean() / volatility * np.sqrt(periods_per_year) if volatility > 0 else 0.0,
+        'sortino_ratio': returns.mean() / downside * np.sqrt(periods_per_year) if downside > 0 else 0.0,
+        'calmar_ratio': annual_return / drawdown.max() if drawdown.max() > 0 else 0.0,
+        'annual_return': annual_return,
+        'equity_max_drawdown': drawdown.max() * 100,
+        'max_drawdown_duration': duration,
+        'exposure': sum((t.get('exit_index', len(close)) - t['entry_index']) for t in trades) / len(close),
+        'turnover': traded / equity.mean(),
+    }
+
+
+def main(n_bars):
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, 'synthetic.csv')
+        make_series(n_bars).to_csv(data_file, index=False)
+
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            tester = EnhancedBackTester(data_file)
+            combinations = tester.generate_parameter_combinations(GRID)
+            batch = tester.run_batch(combinations)
+            close = tester.data['close'].to_numpy(dtype=np.float64)
+            checked = 0
+            for params, metrics in zip(combinations, batch):
+                tester.run_backtest(params)
+                expected = reference(close, tester.trades, tester.initial_capital, tester.periods_per_year)
+                for name, value in expected.items():
+                    assert np.isclose(metrics[name], value, rtol=1e-6, atol=1e-9), \
+                        f"{name} differs with {params}: {metrics[name]} != {value}"
+                checked += 1
+                arrays = tester._trade_arrays()
+
+    print(f"consistency: run_batch matches the pandas equity curve on {checked} sets ({n_bars:,} bars)")
+
+    repeat = 200
+    start = time.perf_counter()
+    for _ in range(repeat):
+        trade_risk_metrics(close, *arrays, tester.initial_capital, tester.periods_per_year)
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"trade_risk_metrics: {elapsed * 1e3:.3f} ms per candidate ({len(arrays[0])} trades, "
+          f"{batch[-1]['exposure']:.1%} exposure)")
+
+    hidden = [m['equity_max_drawdown'] - m['max_drawdown'] for m in batch]
+    print(f"drawdown inside trades: mark-to-market exceeds the closed-trade figure by up to "
+          f"{max(hidden):.2f} points ({sum(h > 1e-9 for h in hidden)}/{len(batch)} sets)")
+
+    by_profit = max(range(len(batch)), key=lambda i: batch[i]['total_profit'])
+    by_sharpe = max(range(len(batch)), key=lambda i: batch[i]['sharpe_ratio'])
+    for label, i in (('profit', by_profit), ('sharpe', by_sharpe)):
+        m = batch[i]
+        print(f"best by {label}: {combinations[i]} -> {m['total_profit']:.2f} MYR, sharpe {m['sharpe_ratio']:.2f}, "
+              f"sortino {m['sortino_ratio']:.2f}, max drawdown {m['equity_max_drawdown']:.2f}%")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bars', type=int, default=20_000)
+    args = parser.parse_args()
+    main(args.bars)
@@ -0,0 +1,74 @@
+"""Compare the optimizer's search strategies against the exhaustive grid.
+
+Searches a ma_short/ma_long/stop_loss/take_profit grid on a synthetic series and
+reports the best profit each strategy finds, the evaluations it spent (in full-data
+backtest equivalents) and its run time.
+
+Usage: python benchmarks/benchmark_search_strategies.py [--bars N] [--budget N] [--seed N]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import scratch  # Before enhanced_backtester, which logs to the working directory
+from enhanced_backtester import EnhancedBackTester
+from search_strategies import GridSearch, RandomSearch, SuccessiveHalving, TPESearch
+from benchmark_backtest_engine import make_series
+
+GRID = {
+    'ma_short': range(5, 41, 5),
+    'ma_long': range(30, 121, 10),
+    'stop_loss': [0.005, 0.01, 0.015, 0.02, 0.03],
+    'take_profit': [0.005, 0.01, 0.02, 0.03, 0.04, 0.06],
+}
+
+
+def search(tester, strategy):
+    tester.optimal_strategy = None
+    evaluated = []
+    original = tester.run_batch
+
+    def counting_run_batch(param_sets, batch_size=32, end=None):
+        evaluated.append(len(param_sets) * (end or len(tester.data)) / len(tester.data))
+        return original(param_sets, batch_size=batch_size, end=end)
+
+    tester.run_batch = counting_run_batch
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        start = time.perf_counter()
+        params, metrics = tester.optimize_strategy(GRID, search=strategy)
+        elapsed = time.perf_counter() - start
+    del tester.run_batch
+    return params, metrics['total_profit'], sum(evaluated), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bars', type=int, default=200_000)
+    parser.add_argument('--budget', type=int, default=120)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, 'synthetic.csv')
+        make_series(args.bars).to_csv(data_file, index=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            tester = EnhancedBackTester(data_file)
+
+        print(f"{'search':<20} {'best profit':>12} {'evaluations':>12} {'seconds':>8}  parameters")
+        for label, strategy in (('grid', GridSearch()),
+                                ('random', RandomSearch(args.budget, seed=args.seed)),
+                                ('successive halving', SuccessiveHalving(args.budget, seed=args.seed)),
+                                ('tpe', TPESearch(args.budget, seed=args.seed))):
+            params, profit, evaluations, elapsed = search(tester, strategy)
+            print(f"{label:<20} {profit:>12.2f} {evaluations:>12.0f} {elapsed:>8.2f}  {params}")
+
+
+if __name__ == '__main__':
+    main()
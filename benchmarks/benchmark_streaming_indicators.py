@@ -0,0 +1,91 @@
+"""Check the streaming indicators against their pandas references and time a tick update.
+
+Feeds a synthetic tick series through every indicator in streaming_indicators.py,
+asserts the values match the pandas computation, then measures the update latency
+for short and long windows to show it does not grow with the window length.
+
+Usage: python benchmarks/benchmark_streaming_indicators.py [--ticks N]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from streaming_indicators import SMA, EMA, RSI, WilderRSI, ATR, VWAP, RollingStd, VolumeMA
+
+
+def make_ticks(n, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 300000 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    high = close * (1 + rng.uniform(0, 0.001, n))
+    low = close * (1 - rng.uniform(0, 0.001, n))
+    volume = rng.lognormal(0, 1, n)
+    return pd.Series(close), pd.Series(high), pd.Series(low), pd.Series(volume)
+
+
+def references(close, high, low, volume, period):
+    change = close.diff()
+    up, down = change.clip(lower=0), -change.clip(upper=0)
+    ma_up, ma_down = up.rolling(period).mean(), down.rolling(period).mean()
+    wilder_up = up.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    wilder_down = down.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    true_range = pd.concat([high - low, (high - close.shift()).abs(), (low - close.shift()).abs()], axis=1).max(axis=1)
+    return {
+        'SMA': close.rolling(period).mean(),
+        'EMA': close.ewm(span=period, adjust=False).mean(),
+        'RSI': ma_up / (ma_up + ma_down) * 100,
+        'WilderRSI': 100 - 100 / (1 + wilder_up / wilder_down),
+        'ATR': true_range.rolling(period).mean(),
+        'VWAP': (volume * close).cumsum() / volume.cumsum(),
+        'RollingStd': close.rolling(period).std(),
+        'VolumeMA': volume.rolling(period).mean(),
+    }
+
+
+def streams(period):
+    return {
+        'SMA': (SMA(period), lambda ind, c, h, l, v: ind.update(c)),
+        'EMA': (EMA(period), lambda ind, c, h, l, v: ind.update(c)),
+        'RSI': (RSI(period), lambda ind, c, h, l, v: ind.update(c)),
+        'WilderRSI': (WilderRSI(period), lambda ind, c, h, l, v: ind.update(c)),
+        'ATR': (ATR(period), lambda ind, c, h, l, v: ind.update(h, l, c)),
+        'VWAP': (VWAP(), lambda ind, c, h, l, v: ind.update(c, v)),
+        'RollingStd': (RollingStd(period), lambda ind, c, h, l, v: ind.update(c)),
+        'VolumeMA': (VolumeMA(period), lambda ind, c, h, l, v: ind.update(v)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ticks', type=int, default=200_000)
+    args = parser.parse_args()
+
+    close, high, low, volume = make_ticks(args.ticks)
+    ticks = list(zip(close.tolist(), high.tolist(), low.tolist(), volume.tolist()))
+
+    print(f"{'indicator':<12} {'period':>6} {'max rel err':>12} {'us/tick':>8}")
+    for period in (14, 2000):
+        expected = references(close, high, low, volume, period)
+        for name, (indicator, update) in streams(period).items():
+            values = np.empty(len(ticks))
+            start = time.perf_counter()
+            for i, (c, h, l, v) in enumerate(ticks):
+                values[i] = update(indicator, c, h, l, v)
+            per_tick = (time.perf_counter() - start) / len(ticks) * 1e6
+
+            reference = expected[name].to_numpy()
+            assert np.array_equal(np.isnan(values), np.isnan(reference)), f"{name}({period}) NaN positions differ"
+            mask = ~np.isnan(reference)
+            error = np.max(np.abs(values[mask] - reference[mask]) / np.maximum(np.abs(reference[mask]), 1e-12))
+            # pandas' own rolling std loses ~1e-7 relative accuracy on prices this far from zero
+            tolerance = 1e-6 if name == 'RollingStd' else 1e-8
+            assert error < tolerance, f"{name}({period}) differs from pandas by {error:.2e}"
+            print(f"{name:<12} {period:>6} {error:>12.2e} {per_tick:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Time the synthetic market generator and check the properties it promises.
+
+Generates --bars candles (10M by default), checks that the seed reproduces the same
+prices, that the series shows volatility clustering, jumps and volume correlated with
+moves, and that correlated pairs come out near the requested correlation. The series
+is then written as memory-mapped arrays and stress-tested with a batch backtest.
+
+Usage: python benchmarks/benchmark_synthetic_market.py [--bars N]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import scratch  # Before enhanced_backtester, which logs to the working directory
+from synthetic_market import SyntheticMarket
+from market_data_store import write_ohlcv_arrays
+from enhanced_backtester import EnhancedBackTester
+from benchmark_batch_backtest import GRID
+
+
+def autocorrelation(x, lag=1):
+    x = x - x.mean()
+    return float(np.dot(x[:-lag], x[lag:]) / np.dot(x, x))
+
+
+def main(n_bars):
+    market = SyntheticMarket(seed=42)
+    start = time.perf_counter()
+    candles = market.generate(n_bars, start='2024-01-01')
+    elapsed = time.perf_counter() - start
+    print(f"generate: {n_bars:,} bars in {elapsed:.2f}s ({n_bars / elapsed / 1e6:.1f}M bars/s)")
+
+    again = SyntheticMarket(seed=42).generate(100_000)['close'].to_numpy()
+    assert np.array_equal(again, SyntheticMarket(seed=42).generate(100_000)['close'].to_numpy()), "same seed, other prices"
+    assert not np.array_equal(again, SyntheticMarket(seed=43).generate(100_000)['close'].to_numpy())
+    assert (candles['high'] >= candles[['open', 'close']].max(axis=1)).all()
+    assert (candles['low'] <= candles[['open', 'close']].min(axis=1)).all()
+
+    returns = np.diff(np.log(candles['close'].to_numpy()))
+    kurtosis = float(np.mean((returns - returns.mean()) ** 4) / returns.var() ** 2)
+    volume_link = float(np.corrcoef(np.abs(returns), candles['volume'].to_numpy()[1:])[0, 1])
+    print(f"returns: |r| autocorrelation {autocorrelation(np.abs(returns)):.3f} (clustering), "
+          f"kurtosis {kurtosis:.1f} (normal = 3), corr(|r|, volume) {volume_link:.2f}")
+
+    start = time.perf_counter()
+    pairs = market.generate_pairs({'XBTMYR': 300000, 'ETHMYR': 12000, 'XRPMYR': 2.5}, 1_000_000,
+                                  correlation=0.7, start='2024-01-01')
+    elapsed = time.perf_counter() - start
+    matrix = np.corrcoef([np.diff(np.log(frame['close'].to_numpy())) for frame in pairs.values()])
+    print(f"generate_pairs: 3 pairs x 1,000,000 bars in {elapsed:.2f}s, return correlations "
+          f"{matrix[0, 1]:.2f} / {matrix[0, 2]:.2f} / {matrix[1, 2]:.2f} (target 0.7 on the diffusion part)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_ohlcv_arrays(candles, os.path.join(tmp, 'synthetic'))
+        with contextlib.redirect_stdout(io.StringIO()):
+            tester = EnhancedBackTester(path)
+            combinations = tester.generate_parameter_combinations(GRID)
+            start = time.perf_counter()
+            results = tester.run_batch(combinations)
+            elapsed = time.perf_counter() - start
+    trades = sum(m['total_trades'] for m in results)
+    print(f"stress test: {len(combinations)} parameter sets on {n_bars:,} bars, {trades:,} trades in {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bars', type=int, default=10_000_000)
+    args = parser.parse_args()
+    main(args.bars)
@@ -0,0 +1,106 @@
+"""Check the walk-forward engine and time it serially and on a process pool.
+
+Runs rolling and anchored walk-forward validation of the optimizer grid on a
+synthetic series, asserting that the parallel run returns exactly the serial folds,
+that every window trades only inside its bars and that the stitched out-of-sample
+profit is the compounded profit of the windows. A window rerun on a series whose
+volumes after its test bars are scrambled must give the same fold, so no window looks
+ahead. The serial run's indicator cache shows each indicator computed once for the
+whole series and reused by every window.
+
+Usage: python benchmarks/benchmark_walk_forward.py [--bars N] [--windows N] [--workers N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import scratch  # Before enhanced_backtester, which logs to the working directory
+from enhanced_backtester import EnhancedBackTester
+from walk_forward import optimize_window
+from benchmark_backtest_engine import make_series
+from benchmark_batch_backtest import GRID
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def check(summary, initial_capital):
+    capital = initial_capital
+    for fold in summary['folds']:
+        _, _, test_start, test_end = fold['window']
+        for entry, exit_index, _, _ in fold['trades']:
+            assert test_start <= entry < test_end and (exit_index == -1 or entry < exit_index < test_end), \
+                f"trade outside its window {fold['window']}"
+        # Closed trades compound exactly, an open one ends the window at its last close
+        if all(exit_index >= 0 for _, exit_index, _, _ in fold['trades']):
+            capital *= 1 + fold['test_metrics']['total_profit'] / initial_capital
+        else:
+            capital = None
+            break
+    if capital is not None:
+        assert np.isclose(summary['metrics']['total_profit'], capital - initial_capital), "stitched profit"
+
+
+def check_lookahead(data, window, tmp):
+    """Run a window on data and on data with every volume after its test bars scrambled"""
+    folds = []
+    for scramble in (False, True):
+        series = data.copy()
+        if scramble:
+            future = series.index >= window[3]
+            series.loc[future, 'volume'] *= np.random.default_rng(0).uniform(10, 100, future.sum())
+        # Both go through a CSV file, so they see the same float rounding
+        series_file = os.path.join(tmp, 'lookahead.csv')
+        series.to_csv(series_file, index=False)
+        tester = EnhancedBackTester(series_file, quiet=True)
+        folds.append(optimize_window(tester, tester.generate_parameter_combinations(GRID), window, 'sharpe_ratio'))
+    assert folds[0]['parameters'] == folds[1]['parameters'], "a window's optimum depends on later volumes"
+    assert folds[0]['test_metrics'] == folds[1]['test_metrics'], "a window's test result depends on later volumes"
+
+
+def main(n_bars, n_windows, workers):
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, 'synthetic.csv')
+        make_series(n_bars).to_csv(data_file, index=False)
+        test_size = n_bars // (n_windows + 2)
+
+        print(f"{'':<10} {'windows':>8} {'serial s':>9} {'parallel s':>11} {'oos profit':>11} {'sharpe':>7} "
+              f"{'efficiency':>11} {'overfit':>8} {'sets':>5} {'indicators computed/reused':>27}")
+        for anchored in (False, True):
+            tester = EnhancedBackTester(data_file, quiet=True)
+            run = lambda workers: tester.walk_forward(GRID, train_size=2 * test_size, test_size=test_size,
+                                                       anchored=anchored, workers=workers)
+            serial, serial_time = timed(lambda: run(1))
+            stats = tester.indicators.snapshot()
+            parallel, parallel_time = timed(lambda: run(workers))
+
+            assert [f['parameters'] for f in serial['folds']] == [f['parameters'] for f in parallel['folds']]
+            assert [f['test_metrics'] for f in serial['folds']] == [f['test_metrics'] for f in parallel['folds']]
+            assert serial['metrics'] == parallel['metrics'], "parallel walk-forward differs from serial"
+            check(serial, tester.initial_capital)
+            check_lookahead(tester.data[['timestamp', 'open', 'high', 'low', 'close', 'volume']],
+                            serial['folds'][0]['window'], tmp)
+            metrics = serial['metrics']
+            print(f"{'anchored' if anchored else 'rolling':<10} {len(serial['folds']):>8} {serial_time:>9.2f} "
+                  f"{parallel_time:>11.2f} {metrics['total_profit']:>11.2f} {metrics['sharpe_ratio']:>7.2f} "
+                  f"{serial['efficiency']:>11.2f} {serial['overfit_folds']:>8} {serial['parameter_sets']:>5} "
+                  f"{stats['misses']:>14}/{stats['hits']}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bars', type=int, default=200_000)
+    parser.add_argument('--windows', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=max(os.cpu_count(), 2))
+    args = parser.parse_args()
+    main(args.bars, args.windows, args.workers)
@@ -0,0 +1,15 @@
+"""Run the benchmarks from a temporary directory, import this before enhanced_backtester.
+
+enhanced_backtester points logging at backtest.log in the working directory when it
+is imported, and the backtester writes optimal_strategy.json there. Importing this
+module first moves the process into a scratch directory, removed on exit, so neither
+ends up in the directory the benchmark was launched from.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+SCRATCH_DIR = tempfile.mkdtemp(prefix='benchmarks-')
+atexit.register(shutil.rmtree, SCRATCH_DIR, ignore_errors=True)
+os.chdir(SCRATCH_DIR)
@@ -0,0 +1,128 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from market_data_store import candle_dataset, to_millis
+
+# The candles endpoint returns at most this many candles per call
+CANDLES_PER_REQUEST = 1000
+VALID_DURATIONS = (60, 300, 900, 1800, 3600, 10800, 14400, 28800, 86400, 259200, 604800)
+CANDLE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+class CandleBackfill:
+    """Download a long range of candles as concurrent, candle-sized chunks
+
+    The range is split into chunks of CANDLES_PER_REQUEST candles and the chunks are
+    fetched in parallel (the client's rate limiter keeps the pace legal). Results are
+    stitched and de-duplicated on timestamp, missing candles are re-fetched, and new
+    candles are appended to a MarketDataStore (or output_file CSV) so a re-run resumes
+    after the last stored one.
+    """
+
+    def __init__(self, client, pair="XBTMYR", duration=300, output_file=None, workers=4, max_gap_retries=2,
+                 store=None):
+        if duration not in VALID_DURATIONS:
+            raise ValueError(f"duration must be one of {VALID_DURATIONS}")
+        self.client = client
+        self.pair = pair
+        self.duration = duration
+        self.step = duration * 1000
+        self.output_file = output_file
+        self.store = store
+        self.workers = workers
+        self.max_gap_retries = max_gap_retries
+        self.stats = {'requests': 0, 'candles': 0, 'gap_refetches': 0, 'unfilled_gaps': 0}
+
+    def plan_chunks(self, start_ms, end_ms):
+        """Split [start_ms, end_ms) into (since, until) ranges of one request each"""
+        span = CANDLES_PER_REQUEST * self.step
+        return [(since, min(since + span, end_ms)) for since in range(start_ms, end_ms, span)]
+
+    def fetch_chunk(self, chunk):
+        since, until = chunk
+        try:
+            res = self.client.get_candles(self.pair, since, self.duration)
+        except Exception as e:
+            # A failed chunk shows up as a gap and is fetched again
+            logging.error(f"Candle chunk {since}-{until} for {self.pair} failed: {e}")
+            return []
+        rows = []
+        for candle in res.get('candles') or []:
+            timestamp = int(candle['timestamp'])
+            if since <= timestamp < until:
+                rows.append((timestamp, float(candle['open']), float(candle['high']), float(candle['low']),
+                             float(candle['close']), float(candle['volume'])))
+        return rows
+
+    def fetch_range(self, chunks):
+        self.stats['requests'] += len(chunks)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pages = list(executor.map(self.fetch_chunk, chunks))
+        return [row for page in pages for row in page]
+
+    def find_gaps(self, timestamps, start_ms, end_ms):
+        """Return (since, until) ranges of the expected candle grid that have no candle"""
+        expected = np.arange(start_ms, end_ms, self.step, dtype=np.int64)
+        missing = expected[~np.isin(expected, timestamps)]
+        if len(missing) == 0:
+            return []
+        # Merge consecutive missing candles into ranges
+        breaks = np.flatnonzero(np.diff(missing) != self.step) + 1
+        return [(int(run[0]), int(run[-1]) + self.step) for run in np.split(missing, breaks)]
+
+    def last_stored_timestamp(self):
+        if self.store is not None:
+            return self.store.last_timestamp(candle_dataset(self.duration), self.pair)
+        if not self.output_file or not os.path.exists(self.output_file):
+            return None
+        stored = pd.read_csv(self.output_file, usecols=['timestamp'])
+        if stored.empty:
+            return None
+        return to_millis(pd.to_datetime(stored['timestamp']).max())
+
+    def run(self, start, end=None):
+        """Backfill candles from start (or the last stored candle) up to end, returns the new candles"""
+        if end is None:
+            # Stop at the last closed candle, the forming one would be stored partial and never refetched
+            end_ms = to_millis(datetime.now())
+            end_ms -= end_ms % self.step
+        else:
+            end_ms = to_millis(end)
+        start_ms = to_millis(start)
+        # Align to the candle grid so gap detection compares like with like
+        start_ms -= start_ms % self.step
+
+        last_stored = self.last_stored_timestamp()
+        if last_stored is not None:
+            start_ms = max(start_ms, last_stored + self.step)
+        if start_ms >= end_ms:
+            logging.info(f"Candle backfill for {self.pair} already up to date")
+            return pd.DataFrame(columns=CANDLE_COLUMNS)
+
+        candles = {}
+        chunks = self.plan_chunks(start_ms, end_ms)
+        for attempt in range(self.max_gap_retries + 1):
+            for row in self.fetch_range(chunks):
+                candles[row[0]] = row
+            gaps = self.find_gaps(np.fromiter(candles.keys(), dtype=np.int64), start_ms, end_ms)
+            if not gaps or attempt == self.max_gap_retries:
+                break
+            # Only the chunks overlapping a gap are fetched again
+            chunks = [chunk for gap in gaps for chunk in self.plan_chunks(*gap)]
+            self.stats['gap_refetches'] += len(chunks)
+
+        # Gaps still left after the retries are periods without trades rather than failed requests
+        self.stats['unfilled_gaps'] = len(gaps)
+        if gaps:
+            logging.info(f"{len(gaps)} candle gaps remain for {self.pair} after {self.max_gap_retries} re-fetches")
+
+        df = pd.DataFrame(sorted(candles.values()), columns=CANDLE_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        self.stats['candles'] += len(df)
+        if self.store is not None and not df.empty:
+            self.store.append_candles(self.pair, df, duration=self.duration)
+        elif self.output_file and not df.empty:
+            df.to_csv(self.output_file, mode='a', header=not os.path.exists(self.output_file), index=False)
+        return df
@@ -1,10 +1,26 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from luno_api_client import LunoAPIClient
+from luno_api_client import LunoAPIClient, Trade
+from candle_backfill import CandleBackfill
+from market_data_store import MarketDataStore, is_ohlcv_arrays, load_ohlcv_arrays, ohlcv_frame
+from backtest_engine import (ThrottledProgress, shifted_sma, entry_exit_signals, run_state_machine, run_batch,
+                             trade_metrics, trade_profit, entry_cost, window_trade_arrays,
+                             max_drawdown_pct)
+from parallel_optimizer import ParallelOptimizer
+from indicator_cache import IndicatorCache, dataset_fingerprint
+from search_strategies import GridSearch
+from result_store import ResultStore, params_key
+from fill_simulator import FeeSchedule, FillSimulator
+from risk_metrics import periods_per_year, equity_curve, drawdown_series, trade_risk_metrics
+from walk_forward import WalkForward
+from monte_carlo import trade_monte_carlo, bootstrap_candles, summarize, percentiles
+from order_book import OrderBook
+from synthetic_market import SyntheticMarket
 import json
 import os
 import logging
+import contextlib
 from tqdm import tqdm
 import matplotlib.pyplot as plt
 from termcolor import colored
@@ -37,6 +53,8 @@ def get_default_timestamp():
 
 # Add constant for strategy file
 STRATEGY_FILE = 'optimal_strategy.json'
+RESULTS_DB = 'optimization_results.db'
+MARKET_DATA_DIR = 'market_data'
 
 class CustomJSONEncoder(json.JSONEncoder):
     """Custom JSON encoder to handle special values"""
@@ -77,13 +95,14 @@ class HistoricalDataCollector:
             print(f"Collecting data from: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
             print(f"                  to: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
             
-            trades = self.client.list_trades(self.pair, since=timestamp)
+            # Follow the since cursor page by page so the whole 12 hours is collected, not just one page
+            trades = list(self.client.iter_trades(self.pair, since=timestamp, prefetch=True))
             
-            if not trades or 'trades' not in trades:
+            if not trades:
                 print(colored("No trade data available", "red"))
                 return None
                 
-            df = pd.DataFrame(trades['trades'])
+            df = pd.DataFrame(trades, columns=Trade._fields)
             df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
             
             print(colored("\nData Summary:", "green"))
@@ -100,7 +119,6 @@ class HistoricalDataCollector:
                 return None
                 
             # Convert and process data
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
             df['price'] = df['price'].astype(float)
             df['volume'] = df['volume'].astype(float)
             
@@ -116,10 +134,18 @@ class HistoricalDataCollector:
                 'close': df_grouped['price'].resample('5min').last(),
                 'volume': df_grouped['volume'].resample('5min').sum()
             }).dropna()
+            # The first bucket starts before the 12 hours and the last is still forming, both are partial.
+            # The store never rewrites candles at or before its last one, so keep only complete buckets
+            # (compared in UTC milliseconds like the trade timestamps)
+            first = pd.to_datetime(timestamp, unit='ms')
+            last = pd.to_datetime(int(end_time.timestamp() * 1000), unit='ms')
+            ohlcv = ohlcv[(ohlcv.index >= first) & (ohlcv.index + pd.Timedelta(minutes=5) <= last)]
             
-            # Save to CSV with index to preserve timestamps
-            ohlcv.to_csv('historical_data_XBTMYR.csv')
-            print(colored(f"Saved {len(ohlcv)} candles to historical_data_XBTMYR.csv", "green"))
+            # Append to the local market data store instead of overwriting a CSV file
+            store = MarketDataStore(MARKET_DATA_DIR)
+            store.append_trades(self.pair, trades)
+            new_candles = store.append_candles(self.pair, ohlcv.reset_index(), duration=300)
+            print(colored(f"Stored {new_candles} new candles in {MARKET_DATA_DIR}", "green"))
             return ohlcv
             
         except Exception as e:
@@ -127,15 +153,46 @@ class HistoricalDataCollector:
             logging.error(f"Trade data collection error: {str(e)}")
             return None
 
-    def get_sample_data(self, hours=12):
-        """Generate sample data with realistic patterns"""
+    def backfill_candles(self, days=30, duration=300, store_dir=MARKET_DATA_DIR):
+        """Backfill candles for the last N days, resuming after the last stored candle"""
+        try:
+            start_time = datetime.now() - timedelta(days=days)
+            print(colored(f"Backfilling {duration}s candles since {start_time.strftime('%Y-%m-%d %H:%M:%S')}...", "cyan"))
+            backfill = CandleBackfill(self.client, pair=self.pair, duration=duration, store=MarketDataStore(store_dir))
+            new_candles = backfill.run(start_time)
+            print(colored(f"Stored {len(new_candles)} new candles in {store_dir} "
+                          f"({backfill.stats['requests']} requests, {backfill.stats['unfilled_gaps']} gaps without trades)", "green"))
+            return store_dir
+        except Exception as e:
+            print(colored(f"FAILED to backfill candles: {str(e)}", "red"))
+            logging.error(f"Candle backfill error: {str(e)}")
+            return None
+
+    def collect_fill_model(self):
+        """FillSimulator from the account's fees and the live order book, synthetic where unavailable"""
+        try:
+            fees = FeeSchedule.from_fee_info(self.client.get_fee_info(self.pair))
+        except Exception as e:
+            logging.error(f"Fee info unavailable, using default fees: {e}")
+            fees = FeeSchedule()
+        try:
+            book = OrderBook.from_snapshot(self.client.get_order_book(self.pair))
+            fill_model = FillSimulator.from_order_book(book, fees=fees)
+            print(colored(f"Fill model: taker fee {fees.taker:.2%}, spread {fill_model.spread:.3%}, "
+                          f"{len(book.bids)} bid / {len(book.asks)} ask levels", "cyan"))
+            return fill_model
+        except Exception as e:
+            logging.error(f"Order book unavailable, using a synthetic one: {e}")
+            print(colored(f"Fill model: taker fee {fees.taker:.2%}, synthetic order book", "cyan"))
+            return FillSimulator.synthetic(fees=fees)
+
+    def get_sample_data(self, hours=12, seed=None):
+        """Generate sample data with realistic patterns, the same seed gives the same prices"""
         print(colored("\nWARNING: Using SIMULATED market data!", "yellow", attrs=["bold"]))
         print("Real market data collection failed, generating dummy data instead")
         
-        # Generate 1-minute intervals for last 24 hours
+        # Generate 1-minute intervals for the last `hours` hours
         end_time = datetime.now()
-        start_time = end_time - timedelta(hours=hours)
-        dates = pd.date_range(start=start_time, end=end_time, freq='1min')
         
         # Get current price as base
         try:
@@ -143,50 +200,8 @@ class HistoricalDataCollector:
         except:
             current_price = 100000  # Default base price if API fails
             
-        # Generate more realistic price series with trends
-        price = current_price
-        prices = []
-        trend = 0
-        trend_duration = 0
-        
-        for _ in range(len(dates)):
-            # Change trend randomly
-            if trend_duration <= 0:
-                trend = np.random.choice([-1, 0, 1], p=[0.3, 0.4, 0.3])  # Market trend bias
-                trend_duration = np.random.randint(30, 120)  # Trend lasts 30-120 minutes
-            
-            # Generate price movement
-            base_volatility = 0.001  # 0.1% base volatility
-            trend_factor = trend * 0.0005  # Additional trend-based movement
-            volatility = np.random.normal(trend_factor, base_volatility)
-            
-            # Add some random spikes
-            if np.random.random() < 0.02:  # 2% chance of spike
-                volatility *= np.random.choice([2, -2])
-                
-            price *= (1 + volatility)
-            prices.append(price)
-            trend_duration -= 1
-        
-        prices = np.array(prices)
-        
-        # Generate volume with some correlation to price changes
-        volume_base = np.random.lognormal(0, 1, len(dates)) * 0.1
-        price_changes = np.abs(np.diff(prices, prepend=prices[0])) / prices * 100
-        volume = volume_base * (1 + price_changes)
-        
-        df = pd.DataFrame({
-            'timestamp': dates,
-            'open': prices,
-            'high': prices * (1 + np.random.uniform(0, 0.002, len(dates))),
-            'low': prices * (1 - np.random.uniform(0, 0.002, len(dates))),
-            'close': prices * (1 + np.random.normal(0, 0.001, len(dates))),
-            'volume': volume
-        })
-        
-        # Ensure OHLC relationship is maintained
-        df['high'] = df[['open', 'close', 'high']].max(axis=1)
-        df['low'] = df[['open', 'close', 'low']].min(axis=1)
+        # Trend regimes, volatility clustering, spikes and volume correlated with price moves
+        df = SyntheticMarket(seed=seed).generate(hours * 60 + 1, start_price=current_price, end=end_time)
         
         # Add technical indicators
         df['vwap'] = (df['volume'] * df['close']).cumsum() / df['volume'].cumsum()
@@ -211,35 +226,71 @@ class HistoricalDataCollector:
         return tr.rolling(window=period).mean()
 
 class EnhancedBackTester:
-    def __init__(self, data_file, initial_capital=1000):
-        self.data = pd.read_csv(data_file)
+    def __init__(self, data_file, initial_capital=1000, pair="XBTMYR", start=None, end=None, duration=300,
+                 fill_model=None, quiet=False, progress=None, position_size=0.95):
+        # quiet runs headless: no console output or progress bars, trades only go to trade_log and
+        # progress(done, total) is called a few times per second at most
+        self.quiet = quiet
+        self.progress = progress
+        self.arrays = None
+        if os.path.isdir(data_file) and is_ohlcv_arrays(data_file):
+            # Pre-converted arrays are memory-mapped and wrapped without copying, so optimizer
+            # processes loading the same files share one physical copy
+            self.arrays = load_ohlcv_arrays(data_file)
+            self.data = ohlcv_frame(self.arrays)
+        elif os.path.isdir(data_file):
+            # A MarketDataStore directory, only the day partitions in [start, end) are read
+            self.data = MarketDataStore(data_file).load_candles(pair, start, end, duration=duration)
+        else:
+            self.data = pd.read_csv(data_file)
         self.initial_capital = initial_capital
         self.current_capital = initial_capital
+        self.position_size = position_size  # Fraction of capital put into each trade
         self.position = 0
         self.trades = []
+        self.trade_log = []
         self.current_index = 0
         self.results = {'trades': [], 'metrics': {}}  # Add results dictionary
+        self.indicators = IndicatorCache()
+        self._fingerprint = None
+        # A FillSimulator prices trades with fees, spread and slippage, None fills at the bar close
+        self.fill_model = fill_model
         self.load_optimal_strategy()
         self.output_file = 'backtest_results.txt'
         
+    def log(self, message, color=None):
+        """Console output of the backtester, silenced in quiet mode"""
+        if not self.quiet:
+            print(colored(message, color) if color else message)
+
+    def record_event(self, action, index, price, **details):
+        """Append a BUY or SELL to the in-memory trade log and echo it unless quiet"""
+        self.trade_log.append({'action': action, 'index': index, 'price': price, **details})
+        if self.quiet:
+            return
+        if action == 'BUY':
+            print(f"BUY at {price} (Volume ratio: {details['volume_ratio']:.2f})")
+        else:
+            print(f"SELL at {price} (Change: {details['change']:.2%})")
+
     def load_optimal_strategy(self):
         """Load previously saved optimal strategy"""
         try:
             if os.path.exists(STRATEGY_FILE):
                 with open(STRATEGY_FILE, 'r') as f:
                     self.optimal_strategy = json.load(f)
-                print(colored("\nLoaded previous optimal strategy:", "cyan"))
+                self.log("\nLoaded previous optimal strategy:", "cyan")
                 for param, value in self.optimal_strategy['parameters'].items():
-                    print(f"{param}: {value}")
-                print(f"Previous Performance: {self.optimal_strategy['metrics']['total_profit']:.2f} MYR")
+                    self.log(f"{param}: {value}")
+                self.log(f"Previous Performance: {self.optimal_strategy['metrics']['total_profit']:.2f} MYR")
             else:
                 self.optimal_strategy = None
         except Exception as e:
             logging.error(f"Error loading optimal strategy: {e}")
             self.optimal_strategy = None
 
-    def save_optimal_strategy(self, parameters, metrics):
-        """Save current optimal strategy if better than previous"""
+    def save_optimal_strategy(self, parameters, metrics, metric='total_profit'):
+        """Save current optimal strategy if better than previous by metric"""
         try:
             current_strategy = {
                 'parameters': parameters,
@@ -252,20 +303,21 @@ class EnhancedBackTester:
                 should_save = True
             else:
                 # Compare with previous best
-                prev_profit = self.optimal_strategy['metrics']['total_profit']
-                curr_profit = metrics['total_profit']
+                # Strategies saved before a metric existed are replaced by any result that has it
+                prev_score = self.optimal_strategy['metrics'].get(metric, float('-inf'))
+                curr_score = metrics[metric]
                 prev_drawdown = self.optimal_strategy['metrics']['max_drawdown']
                 curr_drawdown = metrics['max_drawdown']
                 
-                should_save = (curr_profit > prev_profit and 
+                should_save = (curr_score > prev_score and 
                              curr_drawdown <= prev_drawdown * 1.2)
 
             if should_save:
                 with open(STRATEGY_FILE, 'w') as f:
                     json.dump(current_strategy, f, indent=4, cls=CustomJSONEncoder)
                 self.optimal_strategy = current_strategy
-                print(colored("\nNew optimal strategy saved!", "green"))
-                print(f"Profit Improvement: {metrics['total_profit'] - (self.optimal_strategy.get('metrics', {}).get('total_profit', 0)):.2f} MYR")
+                self.log("\nNew optimal strategy saved!", "green")
+                self.log(f"Profit Improvement: {metrics['total_profit'] - (self.optimal_strategy.get('metrics', {}).get('total_profit', 0)):.2f} MYR")
 
         except Exception as e:
             logging.error(f"Error saving optimal strategy: {e}")
@@ -278,25 +330,91 @@ class EnhancedBackTester:
         combinations = list(itertools.product(*values))
         return [dict(zip(keys, combo)) for combo in combinations]
         
+    def _trade_arrays(self):
+        """(entry index, exit index or -1, amount, entry cost, profit) arrays of self.trades"""
+        return (np.array([t['entry_index'] for t in self.trades], dtype=np.int64),
+                np.array([t.get('exit_index', -1) for t in self.trades], dtype=np.int64),
+                np.array([t['amount'] for t in self.trades], dtype=np.float64),
+                np.array([t['entry_cost'] for t in self.trades], dtype=np.float64),
+                np.array([t['profit'] for t in self.trades], dtype=np.float64))
+
     def calculate_equity_curve(self):
-        """Calculate equity curve from trades"""
-        equity = [self.initial_capital]
-        current = self.initial_capital
-        for trade in self.trades:
-            current += trade['profit']
-            equity.append(current)
-        return equity
+        """Mark-to-market equity at every bar, open positions valued at the close"""
+        close = self.data['close'].to_numpy(dtype=np.float64)
+        return equity_curve(close, *self._trade_arrays(), self.initial_capital)[0]
 
     def calculate_drawdown_series(self):
-        """Calculate drawdown series"""
-        equity_curve = self.calculate_equity_curve()
-        peak = pd.Series(equity_curve).expanding(min_periods=1).max()
-        drawdown = (pd.Series(equity_curve) - peak) / peak * 100
-        return drawdown.values
+        """Calculate drawdown series, in percent below the running peak at every bar"""
+        return -drawdown_series(self.calculate_equity_curve()) * 100
+
+    @property
+    def periods_per_year(self):
+        """Bars per year of the loaded dataset, used to annualize the risk metrics"""
+        return self.indicator('timestamp', 'periods_per_year', None,
+                              lambda: periods_per_year(pd.to_datetime(self.data['timestamp'])))
+
+    @property
+    def fingerprint(self):
+        """Fingerprint of the loaded dataset, recomputed only when self.data is replaced"""
+        if self._fingerprint is None or self._fingerprint[0] is not self.data:
+            self._fingerprint = (self.data, dataset_fingerprint(self.data))
+        return self._fingerprint[1]
+
+    @property
+    def results_fingerprint(self):
+        """Key of this dataset's results in a ResultStore
+
+        Besides the data it includes every setting the metrics depend on: the initial
+        capital and position size scale the profits, the fill model's costs change them all.
+        """
+        fingerprint = f"{self.fingerprint}:capital={self.initial_capital!r}:size={self.position_size!r}"
+        if self.fill_model is None:
+            return fingerprint
+        return f"{fingerprint}:{self.fill_model.fingerprint}"
+
+    def indicator(self, series, indicator, period, compute):
+        """Cached indicator for the current dataset, see IndicatorCache"""
+        self.indicators.bind(self.fingerprint)
+        return self.indicators.get(series, indicator, period, compute)
+
+    def calculate_indicators(self):
+        """Calculate the parameter independent indicators on self.data
 
-    def run_backtest(self, strategy_params):
-        """Run backtest with strategy parameters"""
+        Each one is computed once per dataset and reused by every later backtest.
+        """
+        self.log("Calculating indicators...")
+        data = self.data
+        vwap = self.indicator('close', 'vwap', None,
+                              lambda: (data['volume'] * data['close']).cumsum() / data['volume'].cumsum())
+        self.data['vwap'] = vwap
+        self.data['atr'] = self.indicator('ohlc', 'atr', 14, lambda: self.calculate_atr(data))
+        self.data['volume_ma'] = self.indicator('volume', 'sma', 20, lambda: data['volume'].rolling(window=20).mean())
+        
+        # Calculate additional volume indicators
+        self.data['volume_std'] = self.indicator('volume', 'std', 20, lambda: data['volume'].rolling(window=20).std())
+        self.data['volume_vwap'] = vwap
+        
+        # Volume zones
+        self.data['volume_zone'] = self.indicator(
+            'volume', 'qcut', 3, lambda: pd.qcut(data['volume'], q=3, labels=['Low', 'Medium', 'High']))
+        
+        # Volume momentum
+        self.data['volume_momentum'] = self.indicator('volume', 'momentum', 1,
+                                                      lambda: data['volume'] / data['volume'].shift(1))
+        
+        # Debug print
+        if not self.quiet:
+            self.log(f"Indicators calculated. Sample ATR: {self.data['atr'].head().tolist()}")
+
+    def run_backtest(self, strategy_params, engine='vectorized'):
+        """Run backtest with strategy parameters
+
+        engine='vectorized' computes every signal once for the whole series and only
+        steps through the trades; engine='loop' is the original bar-by-bar loop, kept
+        as the reference the vectorized engine must match trade for trade.
+        """
         self.trades = []
+        self.trade_log = []
         self.current_capital = self.initial_capital
         self.position = 0
         
@@ -305,85 +423,162 @@ class EnhancedBackTester:
             self.data['timestamp'] = pd.to_datetime(self.data['timestamp'])
         
         try:
-            # Calculate additional indicators
-            print("Calculating indicators...")
-            self.data['vwap'] = (self.data['volume'] * self.data['close']).cumsum() / self.data['volume'].cumsum()
-            self.data['atr'] = self.calculate_atr(self.data)
-            self.data['volume_ma'] = self.data['volume'].rolling(window=20).mean()
-            
-            # Calculate additional volume indicators
-            self.data['volume_ma'] = self.data['volume'].rolling(window=20).mean()
-            self.data['volume_std'] = self.data['volume'].rolling(window=20).std()
-            self.data['volume_vwap'] = (self.data['volume'] * self.data['close']).cumsum() / self.data['volume'].cumsum()
-            
-            # Volume zones
-            self.data['volume_zone'] = pd.qcut(self.data['volume'], q=3, labels=['Low', 'Medium', 'High'])
-            
-            # Volume momentum
-            self.data['volume_momentum'] = self.data['volume'] / self.data['volume'].shift(1)
-            
-            # Debug print
-            print(f"Indicators calculated. Sample ATR: {self.data['atr'].head().tolist()}")
-            
-            # Rest of the method remains the same
+            self.calculate_indicators()
             min_periods = max(strategy_params['ma_short'], strategy_params['ma_long'])
             
-            for i in tqdm(range(min_periods, len(self.data)), desc="Backtesting"):
-                window = self.data.iloc[i-min_periods:i]
-                current_bar = self.data.iloc[i]
-                
-                # Calculate indicators
-                ma_short = window['close'].rolling(strategy_params['ma_short']).mean().iloc[-1]
-                ma_long = window['close'].rolling(strategy_params['ma_long']).mean().iloc[-1]
-                vwap = current_bar['vwap']
-                atr = current_bar['atr']
-                volume_ratio = current_bar['volume'] / current_bar['volume_ma']
-                
-                if pd.isna(ma_short) or pd.isna(ma_long):
-                    continue
-                    
-                current_price = float(current_bar['close'])
-                
-                # Enhanced trading logic
-                if self.position == 0:  # No position
-                    # Buy conditions:
-                    # 1. Short MA crosses above Long MA
-                    # 2. Price is near VWAP (within 0.5%)
-                    # 3. Volume is above average
-                    volume_conditions = (
-                        volume_ratio > 1.2 and  # Above average volume
-                        self.data['volume_zone'].iloc[i] != 'Low' and  # Not in low volume zone
-                        self.data['volume_momentum'].iloc[i] > 1.1  # Increasing volume
-                    )
-                    if (ma_short > ma_long and 
-                        abs(current_price - vwap) / vwap < 0.005 and
-                        volume_conditions):
-                        self.current_index = i
-                        self.execute_buy(current_price)
-                        print(f"BUY at {current_price} (Volume ratio: {volume_ratio:.2f})")
-                else:  # Have position
-                    entry_price = self.trades[-1]['entry_price']
-                    price_change = (current_price - entry_price) / entry_price
-                    
-                    # Enhanced exit conditions:
-                    # 1. Stop loss hit (adjusted by ATR)
-                    # 2. Take profit hit
-                    # 3. MA crossover in opposite direction
-                    stop_loss = max(strategy_params['stop_loss'], 2 * atr / current_price)
-                    if (price_change <= -stop_loss or
-                        price_change >= strategy_params['take_profit'] or
-                        (ma_short < ma_long and volume_ratio > 1)):
-                        self.execute_sell(current_price)
-                        print(f"SELL at {current_price} (Change: {price_change:.2%})")
+            if engine == 'loop':
+                self._run_backtest_loop(strategy_params, min_periods)
+            else:
+                self._run_backtest_vectorized(strategy_params, min_periods)
             
             metrics = self.calculate_metrics()
             return {'trades': self.trades, 'metrics': metrics}
             
         except Exception as e:
-            print(colored(f"Error in run_backtest: {str(e)}", "red"))
+            self.log(f"Error in run_backtest: {str(e)}", "red")
             logging.error(f"Backtest error: {str(e)}")
             return {'trades': [], 'metrics': self.calculate_metrics()}
 
+    def run_batch(self, param_sets, batch_size=32, end=None, start=0, low_volume=None):
+        """Backtest many parameter sets in one sweep, returns their metrics in the same order
+
+        Each result has the shape of calculate_metrics and equals run_backtest's for the
+        same parameters. Sets sharing ma_short/ma_long share one signal row; batch_size
+        bounds how many sets (and so signal rows) are held in memory at once. start and
+        end limit the backtest to bars [start, end) with fresh capital, reusing the
+        full-series indicators; the risk metrics then cover that window only. low_volume
+        overrides the volume zones, see entry_exit_signals.
+        """
+        return [self.window_metrics(set_profits, final_capital, set_trades, start, end)
+                for set_profits, final_capital, set_trades in self.batch_trades(param_sets, batch_size, end, start,
+                                                                                low_volume)]
+
+    def window_metrics(self, profits, final_capital, trades, start=0, end=None):
+        """calculate_metrics of one batch_trades result traded on bars [start, end)"""
+        close = self.data['close'].to_numpy(dtype=np.float64)[start:end]
+        metrics = trade_metrics(profits, self.initial_capital, float(final_capital))
+        metrics.update(trade_risk_metrics(close, *window_trade_arrays(trades, start), profits,
+                                          self.initial_capital, self.periods_per_year))
+        return metrics
+
+    def batch_trades(self, param_sets, batch_size=32, end=None, start=0, low_volume=None):
+        """Yield (profits, final capital, trades) of every parameter set, see run_batch
+
+        trades are the engine's (entry index, exit index or -1, amount, entry cost)
+        tuples, with bar indices into the whole dataset.
+        """
+        if not param_sets:
+            return
+        if isinstance(self.data['timestamp'].iloc[0], str):
+            self.data['timestamp'] = pd.to_datetime(self.data['timestamp'])
+        self.calculate_indicators()
+        close = self.data['close'].to_numpy(dtype=np.float64)[:end]
+        atr = self.data['atr'].to_numpy(dtype=np.float64)[:end]
+
+        for offset in range(0, len(param_sets), batch_size):
+            batch = param_sets[offset:offset + batch_size]
+            signal_rows = {}
+            rows = [signal_rows.setdefault((p['ma_short'], p['ma_long']), len(signal_rows)) for p in batch]
+            valid = np.empty((len(signal_rows), len(self.data)), dtype=bool)
+            entry = np.empty_like(valid)
+            signal_exit = np.empty_like(valid)
+            for (short, long), row in signal_rows.items():
+                ma_short = self.indicator('close', 'shifted_sma', short, lambda: shifted_sma(self.data['close'], short))
+                ma_long = self.indicator('close', 'shifted_sma', long, lambda: shifted_sma(self.data['close'], long))
+                valid[row], entry[row], signal_exit[row] = entry_exit_signals(self.data, ma_short, ma_long,
+                                                                              max(short, long), low_volume)
+
+            yield from zip(*run_batch(close, atr, valid[:, :end], entry[:, :end], signal_exit[:, :end], rows,
+                                      [max(p['ma_short'], p['ma_long'], start) for p in batch],
+                                      [p['stop_loss'] for p in batch], [p['take_profit'] for p in batch],
+                                      self.initial_capital, self.position_size, fill_model=self.fill_model))
+
+    def _run_backtest_vectorized(self, strategy_params, min_periods):
+        """Resolve entries and exits from whole-series signal arrays"""
+        close = self.data['close'].to_numpy(dtype=np.float64)
+        atr = self.data['atr'].to_numpy(dtype=np.float64)
+        volume_ratio = self.data['volume'].to_numpy(dtype=np.float64) / self.data['volume_ma'].to_numpy(dtype=np.float64)
+        ma_short = self.indicator('close', 'shifted_sma', strategy_params['ma_short'],
+                                  lambda: shifted_sma(self.data['close'], strategy_params['ma_short']))
+        ma_long = self.indicator('close', 'shifted_sma', strategy_params['ma_long'],
+                                 lambda: shifted_sma(self.data['close'], strategy_params['ma_long']))
+        valid, entry, signal_exit = entry_exit_signals(self.data, ma_short, ma_long, min_periods)
+
+        def buy(i):
+            current_price = float(close[i])
+            self.current_index = i
+            self.execute_buy(current_price)
+            self.record_event('BUY', i, current_price, volume_ratio=float(volume_ratio[i]))
+            return self.position != 0
+
+        def sell(i):
+            current_price = float(close[i])
+            entry_price = self.trades[-1]['entry_price']
+            price_change = (current_price - entry_price) / entry_price
+            self.current_index = i
+            self.execute_sell(current_price)
+            self.record_event('SELL', i, current_price, change=price_change)
+
+        bars = max(len(close) - min_periods, 0)
+        progress = ThrottledProgress(self.progress, bars) if self.progress else None
+        run_state_machine(close, atr, valid, entry, signal_exit, strategy_params['stop_loss'],
+                          strategy_params['take_profit'], buy, sell, start=min_periods, progress=progress)
+
+    def _run_backtest_loop(self, strategy_params, min_periods):
+        """Reference bar-by-bar implementation of the strategy"""
+        bars = range(min_periods, len(self.data))
+        progress = ThrottledProgress(self.progress, len(bars)) if self.progress else None
+        for i in (bars if self.quiet else tqdm(bars, desc="Backtesting")):
+            if progress:
+                progress.update(i - min_periods + 1)
+            window = self.data.iloc[i-min_periods:i]
+            current_bar = self.data.iloc[i]
+            
+            # Calculate indicators
+            ma_short = window['close'].rolling(strategy_params['ma_short']).mean().iloc[-1]
+            ma_long = window['close'].rolling(strategy_params['ma_long']).mean().iloc[-1]
+            vwap = current_bar['vwap']
+            atr = current_bar['atr']
+            volume_ratio = current_bar['volume'] / current_bar['volume_ma']
+            
+            if pd.isna(ma_short) or pd.isna(ma_long):
+                continue
+                
+            current_price = float(current_bar['close'])
+            
+            # Enhanced trading logic
+            if self.position == 0:  # No position
+                # Buy conditions:
+                # 1. Short MA crosses above Long MA
+                # 2. Price is near VWAP (within 0.5%)
+                # 3. Volume is above average
+                volume_conditions = (
+                    volume_ratio > 1.2 and  # Above average volume
+                    self.data['volume_zone'].iloc[i] != 'Low' and  # Not in low volume zone
+                    self.data['volume_momentum'].iloc[i] > 1.1  # Increasing volume
+                )
+                if (ma_short > ma_long and 
+                    abs(current_price - vwap) / vwap < 0.005 and
+                    volume_conditions):
+                    self.current_index = i
+                    self.execute_buy(current_price)
+                    self.record_event('BUY', i, current_price, volume_ratio=float(volume_ratio))
+            else:  # Have position
+                entry_price = self.trades[-1]['entry_price']
+                price_change = (current_price - entry_price) / entry_price
+                
+                # Enhanced exit conditions:
+                # 1. Stop loss hit (adjusted by ATR)
+                # 2. Take profit hit
+                # 3. MA crossover in opposite direction
+                stop_loss = max(strategy_params['stop_loss'], 2 * atr / current_price)
+                if (price_change <= -stop_loss or
+                    price_change >= strategy_params['take_profit'] or
+                    (ma_short < ma_long and volume_ratio > 1)):
+                    self.current_index = i
+                    self.execute_sell(current_price)
+                    self.record_event('SELL', i, current_price, change=price_change)
+
     def calculate_atr(self, df, period=14):
         """Calculate Average True Range"""
         high = df['high']
@@ -398,88 +593,42 @@ class EnhancedBackTester:
 
     def execute_buy(self, price):
         """Execute buy order in backtest"""
-        amount = self.current_capital * 0.95 / price  # Use 95% of capital
+        amount = self.current_capital * self.position_size / price
         self.position = amount
         self.trades.append({
             'entry_price': price,
             'amount': amount,
+            'entry_index': self.current_index,
+            'entry_cost': float(entry_cost(self.fill_model, self.current_index, price, amount)),
             'entry_time': self.data.iloc[self.current_index]['timestamp'],
             'profit': 0  # Initialize profit
         })
         
     def execute_sell(self, price):
-        """Execute sell order in backtest"""
+        """Execute sell order in backtest, priced by fill_model when one is set"""
         if not self.trades:
             return
             
         last_trade = self.trades[-1]
-        profit = (price - last_trade['entry_price']) * last_trade['amount']
+        profit = float(trade_profit(self.fill_model, last_trade['entry_index'], last_trade['entry_price'],
+                                    self.current_index, price, last_trade['amount']))
         last_trade['exit_price'] = price
+        last_trade['exit_index'] = self.current_index
         last_trade['profit'] = profit
         self.current_capital += profit
         self.position = 0
     
     def calculate_metrics(self):
-        """Calculate comprehensive trading metrics"""
-        if not self.trades:
-            return {
-                'total_trades': 0,
-                'winning_trades': 0,
-                'losing_trades': 0,
-                'win_rate': 0,
-                'total_profit': 0,
-                'average_profit': 0,
-                'largest_win': 0,
-                'largest_loss': 0,
-                'max_drawdown': 0,
-                'profit_factor': 0,
-                'final_capital': self.initial_capital
-            }
-            
+        """Calculate comprehensive trading metrics, including the per-bar risk metrics"""
         profits = [t['profit'] for t in self.trades if 'profit' in t]
-        winning_trades = [p for p in profits if p > 0]
-        losing_trades = [p for p in profits if p < 0]  # Changed from <= to < to handle zero properly
-        
-        # Calculate total wins and losses safely
-        total_wins = sum(winning_trades) if winning_trades else 0
-        total_losses = abs(sum(losing_trades)) if losing_trades else 0
-        
-        # Calculate profit factor safely
-        if total_losses > 0:
-            profit_factor = total_wins / total_losses
-        elif total_wins > 0:
-            profit_factor = float('inf')
-        else:
-            profit_factor = 0
-            
-        return {
-            'total_trades': len(self.trades),
-            'winning_trades': len(winning_trades),
-            'losing_trades': len(losing_trades),
-            'win_rate': len(winning_trades) / len(self.trades) if self.trades else 0,
-            'total_profit': sum(profits),
-            'average_profit': sum(profits) / len(profits) if profits else 0,
-            'largest_win': max(profits) if profits else 0,
-            'largest_loss': min(profits) if profits else 0,
-            'max_drawdown': self.calculate_max_drawdown(),
-            'profit_factor': profit_factor,
-            'final_capital': self.current_capital
-        }
+        metrics = trade_metrics(profits, self.initial_capital, self.current_capital)
+        close = self.data['close'].to_numpy(dtype=np.float64)
+        metrics.update(trade_risk_metrics(close, *self._trade_arrays(), self.initial_capital, self.periods_per_year))
+        return metrics
 
     def calculate_max_drawdown(self):
         """Calculate maximum drawdown"""
-        capital = self.initial_capital
-        peak = capital
-        max_drawdown = 0
-        
-        for trade in self.trades:
-            if 'profit' in trade:
-                capital += trade['profit']
-                peak = max(peak, capital)
-                drawdown = (peak - capital) / peak * 100
-                max_drawdown = max(max_drawdown, drawdown)
-        
-        return max_drawdown
+        return max_drawdown_pct([t['profit'] for t in self.trades if 'profit' in t], self.initial_capital)
 
     def calculate_risk_reward_ratio(self, trades):
         """Calculate risk/reward ratio"""
@@ -490,14 +639,27 @@ class EnhancedBackTester:
         avg_loss = abs(np.mean([t['profit'] for t in trades if t['profit'] < 0])) if any(t['profit'] < 0 for t in trades) else 1
         return avg_win / avg_loss if avg_loss != 0 else float('inf')
 
-    def optimize_strategy(self, parameter_ranges):
-        """Optimize strategy parameters with persistence"""
+    def optimize_strategy(self, parameter_ranges, workers=1, search=None, store=None, metric='total_profit'):
+        """Optimize strategy parameters with persistence
+
+        Candidates are ranked by metric, any key of calculate_metrics where higher is
+        better, e.g. 'sharpe_ratio' or 'calmar_ratio' for risk-adjusted return.
+
+        search is a SearchStrategy from search_strategies (exhaustive GridSearch by
+        default); RandomSearch, SuccessiveHalving and TPESearch evaluate a fixed budget
+        of combinations with a reproducible seed. With workers > 1 the combinations are
+        evaluated on a process pool that shares one copy of the OHLCV data; results
+        stream back and the best is kept live. With a ResultStore every result is
+        saved as it arrives and combinations already stored for this dataset are
+        not evaluated again, so an interrupted run resumes where it stopped.
+        """
         best_result = None
         best_metrics = None
+        best_index = -1
+        search = search or GridSearch()
+        optimizer = None
         
         try:
-            combinations = self.generate_parameter_combinations(parameter_ranges)
-            
             # Start with previous optimal parameters if available
             if self.optimal_strategy:
                 prev_params = self.optimal_strategy['parameters']
@@ -505,21 +667,56 @@ class EnhancedBackTester:
                     results = self.run_backtest(prev_params)
                     best_metrics = results['metrics']
                     best_result = prev_params
-                    print(colored("\nTesting previous optimal strategy...", "cyan"))
-                    print(f"Previous strategy profit: {best_metrics['total_profit']:.2f} MYR")
+                    self.log("\nTesting previous optimal strategy...", "cyan")
+                    self.log(f"Previous strategy profit: {best_metrics['total_profit']:.2f} MYR")
 
             # Test new combinations
-            for params in tqdm(combinations, desc="Optimizing Strategy"):
-                results = self.run_backtest(params)
-                metrics = results['metrics']
-                
-                if best_metrics is None or metrics['total_profit'] > best_metrics['total_profit']:
-                    best_metrics = metrics
-                    best_result = params
+            if workers > 1:
+                if isinstance(self.data['timestamp'].iloc[0], str):
+                    self.data['timestamp'] = pd.to_datetime(self.data['timestamp'])
+                optimizer = ParallelOptimizer(self, workers=workers)
+
+            def evaluate(param_sets, end=None):
+                if optimizer:
+                    return optimizer.iter_results(param_sets, end=end)
+                # Serial evaluation goes through the batched engine, see run_batch
+                return ((i, params, metrics)
+                        for i, (params, metrics) in enumerate(zip(param_sets, self.run_batch(param_sets, end=end))))
+
+            if store is not None:
+                evaluate = self._stored_evaluate(evaluate, store, metric)
+
+            total = (len(self.generate_parameter_combinations(parameter_ranges))
+                     if isinstance(search, GridSearch) else None)
+            # Keep the worker pool up for the whole search, adaptive searches evaluate batch by batch
+            with optimizer or contextlib.nullcontext():
+                results = search.run(evaluate, parameter_ranges, lambda metrics: metrics[metric],
+                                     len(self.data))
+                progress = ThrottledProgress(self.progress, total) if self.progress else None
+                bar = results if self.quiet else tqdm(results, total=total, desc="Optimizing Strategy")
+                for count, (index, params, metrics) in enumerate(bar, 1):
+                    if progress:
+                        progress.update(count)
+                    # Results may arrive out of order, ties go to the earlier combination like the serial scan
+                    if (best_metrics is None or metrics[metric] > best_metrics[metric] or
+                            (metrics[metric] == best_metrics[metric] and 0 <= index < best_index)):
+                        best_metrics = metrics
+                        best_result = params
+                        best_index = index
+                        if not self.quiet:
+                            bar.set_postfix({f"best_{metric}": f"{best_metrics[metric]:.2f}"})
+                if progress:
+                    progress.close()
+
+            indicator_stats = optimizer.indicator_stats() if optimizer else None
+            self.log(self.indicators.report(indicator_stats), "cyan")
+            if store is not None:
+                self.log(f"Results: {self.store_stats['stored']} stored, {self.store_stats['skipped']} "
+                         f"skipped as already evaluated ({store.path})", "cyan")
             
             # Save if better than previous
             if best_result and best_metrics:
-                self.save_optimal_strategy(best_result, best_metrics)
+                self.save_optimal_strategy(best_result, best_metrics, metric)
                 
         except Exception as e:
             logging.error(f"Error during optimization: {e}")
@@ -527,6 +724,45 @@ class EnhancedBackTester:
             
         return best_result, best_metrics
 
+    def _stored_evaluate(self, evaluate, store, metric='total_profit', commit_every=64):
+        """Wrap an optimizer evaluate function with a ResultStore
+
+        Stored results are yielded without running them, new ones are written in
+        batches of commit_every as they arrive. Results stored before `metric` existed
+        are run again and replaced.
+        """
+        fingerprint = self.results_fingerprint
+        self.store_stats = {'stored': 0, 'skipped': 0}
+
+        def stored_evaluate(param_sets, end=None):
+            bars = len(self.data) if end is None else min(end, len(self.data))
+            cached = store.get(fingerprint, param_sets, bars)
+            missing = []
+            for i, params in enumerate(param_sets):
+                metrics = cached.get(params_key(params))
+                if metrics is None or metric not in metrics:
+                    missing.append(i)
+                else:
+                    self.store_stats['skipped'] += 1
+                    yield i, params, metrics
+
+            pending = []
+            try:
+                for j, params, metrics in evaluate([param_sets[i] for i in missing], end=end):
+                    pending.append((params, metrics))
+                    if len(pending) >= commit_every:
+                        store.put(fingerprint, pending, bars, complete=bars == len(self.data))
+                        self.store_stats['stored'] += len(pending)
+                        pending = []
+                    yield missing[j], params, metrics
+            finally:
+                # Also reached when the run is interrupted, so finished results are never lost
+                if pending:
+                    store.put(fingerprint, pending, bars, complete=bars == len(self.data))
+                    self.store_stats['stored'] += len(pending)
+
+        return stored_evaluate
+
     def plot_results(self):
         """Plot backtest results"""
         if not self.results['trades']:
@@ -580,6 +816,116 @@ class EnhancedBackTester:
         except Exception as e:
             logging.error(f"Error saving results to file: {e}")
 
+    def show_top_results(self, store, n=10, metric='total_profit'):
+        """Print the best stored optimization results for the loaded dataset"""
+        results = store.top(n, metric=metric, fingerprint=self.results_fingerprint)
+        if not results:
+            print(colored("No stored optimization results for this dataset", "yellow"))
+            return
+        print(colored(f"\nTop {len(results)} results by {metric.replace('_', ' ')}:", "cyan"))
+        for rank, result in enumerate(results, 1):
+            metrics = result['metrics']
+            params = ", ".join(f"{key}={value}" for key, value in result['parameters'].items())
+            print(f"{rank:>2}. {metrics[metric]:>10.2f}  trades={metrics['total_trades']:<4} "
+                  f"win rate={metrics['win_rate']:.2%}  {params}")
+
+    def walk_forward(self, parameter_ranges, train_size, test_size, step=None, anchored=False,
+                     metric='sharpe_ratio', workers=1):
+        """Walk-forward validation of the optimizer, returns the WalkForward.stitch summary
+
+        Parameters are refit on every train window and judged only on the bars after it,
+        so a set that merely fits the history shows up as out-of-sample losses, low
+        efficiency and overfit folds. See walk_forward.WalkForward.
+        """
+        if isinstance(self.data['timestamp'].iloc[0], str):
+            self.data['timestamp'] = pd.to_datetime(self.data['timestamp'])
+        validation = WalkForward(self, parameter_ranges, train_size, test_size, step=step, anchored=anchored,
+                                 metric=metric, workers=workers)
+        progress = ThrottledProgress(self.progress, len(validation.windows)) if self.progress else None
+        bar = None if self.quiet else tqdm(total=len(validation.windows), desc="Walk-forward")
+
+        def update(done, total):
+            if progress:
+                progress.update(done)
+            if bar:
+                bar.update(1)
+        try:
+            summary = validation.run(update)
+        finally:
+            if progress:
+                progress.close()
+            if bar:
+                bar.close()
+        self.show_walk_forward(summary, metric)
+        return summary
+
+    def show_walk_forward(self, summary, metric='sharpe_ratio'):
+        """Print the folds and out-of-sample result of a walk-forward run"""
+        if self.quiet:
+            return
+        print(colored(f"\nWalk-forward: {len(summary['folds'])} windows ranked by {metric.replace('_', ' ')}", "cyan"))
+        for fold in summary['folds']:
+            train_start, train_end, test_start, test_end = fold['window']
+            params = ", ".join(f"{key}={value}" for key, value in fold['parameters'].items())
+            print(f"train {train_start:>7}-{train_end:<7} test {test_start:>7}-{test_end:<7} "
+                  f"in {fold['train_metrics'][metric]:>7.2f}  out {fold['test_metrics'][metric]:>7.2f}  "
+                  f"out profit {fold['test_metrics']['total_profit']:>9.2f}  {params}")
+        metrics = summary['metrics']
+        print(f"Out of sample: {metrics['total_profit']:.2f} MYR over {metrics['total_trades']} trades, "
+              f"sharpe {metrics['sharpe_ratio']:.2f}, max drawdown {metrics['equity_max_drawdown']:.2f}%")
+        print(f"Efficiency {summary['efficiency']:.2f}, {summary['parameter_sets']} distinct parameter sets, "
+              f"{summary['overfit_folds']} overfit windows")
+        if summary['folds'] and (summary['overfit_folds'] * 2 > len(summary['folds']) or summary['efficiency'] < 0.5):
+            print(colored("Warning: parameters do not hold up out of sample, the optimizer is likely overfitting",
+                          "yellow"))
+
+    def monte_carlo(self, n_paths=100_000, method='bootstrap', block_size=5, ruin_level=0.5, seed=None):
+        """Resample the closed trades of the last backtest into n_paths equity paths
+
+        method is 'bootstrap', 'shuffle' or 'block', see monte_carlo.resample_indices.
+        Returns the monte_carlo.summarize dict: final capital and max drawdown of every
+        path, risk of ruin (equity down to ruin_level of the initial capital) and
+        probability of loss.
+        """
+        profits = [t['profit'] for t in self.trades if 'exit_index' in t]
+        result = trade_monte_carlo(profits, self.initial_capital, n_paths, method, block_size, ruin_level, seed)
+        self.show_monte_carlo(result)
+        return result
+
+    def price_path_monte_carlo(self, strategy_params, n_paths=200, block_size=60, ruin_level=0.5, seed=None):
+        """Backtest strategy_params on n_paths block-bootstrapped versions of the loaded data
+
+        Unlike monte_carlo, the strategy trades every path itself, so its signals are
+        tested on price histories it was not tuned on. See monte_carlo.bootstrap_candles.
+        """
+        original, quiet = self.data, self.quiet
+        final_capital, max_drawdown, ruined = [], [], []
+        self.quiet = True
+        try:
+            for frame in bootstrap_candles(original, n_paths, block_size, seed):
+                self.data = frame
+                profits, capital, trades = next(self.batch_trades([strategy_params]))
+                close = frame['close'].to_numpy(dtype=np.float64)
+                equity = equity_curve(close, *window_trade_arrays(trades), profits, self.initial_capital)[0]
+                final_capital.append(float(capital))
+                max_drawdown.append(float(drawdown_series(equity).max()) * 100)
+                ruined.append(equity.min() <= ruin_level * self.initial_capital)
+        finally:
+            self.data, self.quiet = original, quiet
+        result = summarize(np.array(final_capital), np.array(max_drawdown), np.array(ruined, dtype=bool),
+                           self.initial_capital, method='price paths', block_size=block_size)
+        self.show_monte_carlo(result)
+        return result
+
+    def show_monte_carlo(self, result):
+        """Print the distributions of a Monte Carlo run"""
+        if self.quiet:
+            return
+        print(colored(f"\nMonte Carlo: {result['paths']:,} paths ({result['method']})", "cyan"))
+        for label, values in (('Final capital', result['final_capital']), ('Max drawdown %', result['max_drawdown'])):
+            print(f"{label:<15} " + "  ".join(f"p{q}={value:.2f}" for q, value in percentiles(values).items()))
+        print(f"Risk of ruin: {result['risk_of_ruin']:.2%}  Probability of loss: {result['probability_of_loss']:.2%}")
+
     def monitor_indicators(self):
         """Monitor current market indicators"""
         try:
@@ -642,6 +988,10 @@ def menu():
     print("4. Optimize Strategy")
     print("5. Show Results")
     print("6. Monitor Market Indicators")
+    print("7. Run Backtest (Backfilled candles)")
+    print("8. Show Top Optimization Results")
+    print("9. Walk-Forward Validation")
+    print("10. Monte Carlo Robustness")
     print("0. Exit")
     return input("Enter your choice: ")
 
@@ -654,22 +1004,29 @@ def main():
     while True:
         choice = menu()
         
-        if choice in ['1', '2', '3']:
-            if choice == '1':
+        if choice in ['1', '2', '3', '7']:
+            data_file = 'historical_data_XBTMYR.csv'
+            if choice == '7':
+                data_file = data = collector.backfill_candles()
+            elif choice == '1':
                 data = collector.collect_recent_trades()  # Auto-detect
                 if data is None:
                     data = collector.get_sample_data()
+                else:
+                    data_file = MARKET_DATA_DIR
             elif choice == '2':
                 data = collector.collect_recent_trades()  # Force real data
                 if data is None:
                     print(colored("Failed to get real data. Please try again.", "red"))
                     continue
+                data_file = MARKET_DATA_DIR
             else:
                 data = collector.get_sample_data()  # Force sample data
             
             if data is not None:
                 # Initialize backtester
-                tester = EnhancedBackTester('historical_data_XBTMYR.csv', initial_capital=1000)
+                tester = EnhancedBackTester(data_file, initial_capital=1000,
+                                            fill_model=collector.collect_fill_model())
                 
                 # Run initial backtest with optimal strategy if available
                 initial_params = (tester.optimal_strategy['parameters'] 
@@ -713,7 +1070,9 @@ def main():
                     'take_profit': [0.02, 0.03, 0.04]
                 }
                 
-                best_params, best_metrics = tester.optimize_strategy(parameter_ranges)
+                with ResultStore(RESULTS_DB) as store:
+                    best_params, best_metrics = tester.optimize_strategy(parameter_ranges, workers=os.cpu_count(),
+                                                                         store=store, metric='sharpe_ratio')
                 
                 if best_params and best_metrics:
                     optimal_results = {
@@ -738,6 +1097,35 @@ def main():
             else:
                 print(colored("Please run backtest first (Option 1)", "red"))
         
+        elif choice == '8':
+            if tester:
+                with ResultStore(RESULTS_DB) as store:
+                    tester.show_top_results(store, metric='sharpe_ratio')
+            else:
+                print(colored("Please run backtest first (Option 1)", "red"))
+        
+        elif choice == '9':
+            if tester:
+                parameter_ranges = {
+                    'ma_short': range(10, 31, 5),
+                    'ma_long': range(40, 61, 5),
+                    'stop_loss': [0.01, 0.02, 0.03],
+                    'take_profit': [0.02, 0.03, 0.04]
+                }
+                # Six test windows, each after a train window twice its size
+                test_size = max(len(tester.data) // 8, 1)
+                tester.walk_forward(parameter_ranges, train_size=2 * test_size, test_size=test_size,
+                                    workers=os.cpu_count())
+            else:
+                print(colored("Please run backtest first (Option 1)", "red"))
+        
+        elif choice == '10':
+            if tester and tester.trades:
+                tester.monte_carlo(method='bootstrap')
+                tester.monte_carlo(method='block')
+            else:
+                print(colored("Please run backtest first (Option 1)", "red"))
+        
         elif choice == '0':
             print(colored("Exiting...", "red"))
             break
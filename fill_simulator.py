@@ -0,0 +1,122 @@
+import hashlib
+import numpy as np
+
+# Used when the account's fee_info cannot be fetched
+DEFAULT_MAKER_FEE = 0.0
+DEFAULT_TAKER_FEE = 0.001
+
+class FeeSchedule:
+    """Maker and taker fee rates as fractions of the traded value"""
+
+    def __init__(self, maker=DEFAULT_MAKER_FEE, taker=DEFAULT_TAKER_FEE):
+        self.maker = maker
+        self.taker = taker
+
+    @classmethod
+    def from_fee_info(cls, fee_info):
+        """From a LunoAPIClient.get_fee_info response"""
+        return cls(maker=float(fee_info['maker_fee']), taker=float(fee_info['taker_fee']))
+
+class DepthProfile:
+    """Liquidity on one side of a book as (distance from the touch, volume) levels
+
+    offsets are fractions of the best price, ascending from 0, and volumes are the
+    base volume resting at each level. slippage() walks the profile for many order
+    sizes at once; volume beyond the last level is assumed to fill at the last level.
+    """
+
+    def __init__(self, offsets, volumes):
+        self.offsets = np.asarray(offsets, dtype=np.float64)
+        self.volumes = np.asarray(volumes, dtype=np.float64)
+        if len(self.offsets) == 0 or len(self.offsets) != len(self.volumes):
+            raise ValueError("offsets and volumes must be non-empty and of equal length")
+        self.cumulative_volume = np.cumsum(self.volumes)
+        self.cumulative_cost = np.cumsum(self.volumes * self.offsets)
+
+    @classmethod
+    def from_order_book(cls, book, side, levels=None):
+        """From the levels of a recorded OrderBook, 'ASK' for buys and 'BID' for sells"""
+        book_levels = book.levels(side, levels)
+        if not book_levels:
+            raise ValueError(f"order book has no {side} levels")
+        best = book_levels[0][0]
+        return cls([abs(price - best) / best for price, _ in book_levels],
+                   [volume for _, volume in book_levels])
+
+    @classmethod
+    def synthetic(cls, levels=50, step=0.0002, volume=0.05, growth=0.05):
+        """A book with a level every `step` and `volume` at the touch, growing by `growth` per level"""
+        return cls(np.arange(levels) * step, volume * (1 + growth) ** np.arange(levels))
+
+    def slippage(self, amount):
+        """Average distance from the touch, as a fraction, of taking `amount` (array) from this side"""
+        amount = np.asarray(amount, dtype=np.float64)
+        k = np.minimum(np.searchsorted(self.cumulative_volume, amount), len(self.offsets) - 1)
+        previous_volume = np.where(k > 0, self.cumulative_volume[k - 1], 0.0)
+        previous_cost = np.where(k > 0, self.cumulative_cost[k - 1], 0.0)
+        cost = previous_cost + (amount - previous_volume) * self.offsets[k]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(amount > 0, cost / amount, 0.0)
+
+class FillSimulator:
+    """Turns a backtest's reference prices into fill prices and fees
+
+    The bar price is treated as the mid. A taker order crosses half the spread and
+    then walks the depth profile of the opposite side for its size; a maker order
+    rests on its own side of the spread and pays the maker fee, assuming it is filled
+    within the bar. spread is the full relative spread, a scalar or one value per bar
+    (e.g. recorded (ask - bid) / mid). Everything works on arrays, so a batch of
+    simulated orders is priced in one call.
+    """
+
+    def __init__(self, fees=None, spread=0.0, bid_depth=None, ask_depth=None, maker=False):
+        self.fees = fees or FeeSchedule()
+        self.spread = spread if np.isscalar(spread) else np.asarray(spread, dtype=np.float64)
+        self.bid_depth = bid_depth
+        self.ask_depth = ask_depth
+        self.maker = maker
+
+    @classmethod
+    def from_order_book(cls, book, fees=None, levels=None, maker=False):
+        """Spread and depth taken from a recorded OrderBook"""
+        return cls(fees=fees, spread=book.spread / book.mid, bid_depth=DepthProfile.from_order_book(book, 'BID', levels),
+                   ask_depth=DepthProfile.from_order_book(book, 'ASK', levels), maker=maker)
+
+    @classmethod
+    def synthetic(cls, fees=None, spread=0.001, maker=False, **depth):
+        """Symmetric synthetic book, depth keywords go to DepthProfile.synthetic"""
+        profile = DepthProfile.synthetic(**depth)
+        return cls(fees=fees, spread=spread, bid_depth=profile, ask_depth=profile, maker=maker)
+
+    def fill(self, index, price, amount, is_buy):
+        """Fill prices and fees for orders at bars `index` with reference `price` and base `amount`
+
+        index, price and amount are arrays of equal length (or scalars), is_buy applies to
+        all of them. Returns (fill_price, fee) arrays, fee in the counter currency.
+        """
+        price = np.asarray(price, dtype=np.float64)
+        amount = np.asarray(amount, dtype=np.float64)
+        half_spread = (self.spread if np.isscalar(self.spread) else self.spread[index]) / 2
+        sign = 1.0 if is_buy else -1.0
+        if self.maker:
+            fill_price = price * (1 - sign * half_spread)
+            rate = self.fees.maker
+        else:
+            depth = self.ask_depth if is_buy else self.bid_depth
+            slippage = depth.slippage(amount) if depth is not None else 0.0
+            fill_price = price * (1 + sign * (half_spread + slippage))
+            rate = self.fees.taker
+        return fill_price, fill_price * amount * rate
+
+    @property
+    def fingerprint(self):
+        """Digest of the model, results under different fill models must not be mixed"""
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(repr((self.fees.maker, self.fees.taker, self.maker)).encode())
+        digest.update(np.ascontiguousarray(self.spread, dtype=np.float64).tobytes())
+        for depth in (self.bid_depth, self.ask_depth):
+            if depth is not None:
+                digest.update(depth.offsets.tobytes())
+                digest.update(depth.volumes.tobytes())
+            digest.update(b'|')
+        return digest.hexdigest()
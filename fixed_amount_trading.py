@@ -35,7 +35,6 @@ def get_ticker(pair=DEFAULT_PAIR):
     except Exception as e:
         print(f"Error getting ticker: {e}")
         return None
-    time.sleep(0.5)
 
 def start_fixed_amount_trading(initial_fund):
     """
@@ -0,0 +1,86 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+def dataset_fingerprint(data):
+    """Stable hex digest of a dataset's timestamp and OHLCV columns
+
+    Two datasets with the same fingerprint produce the same indicators and backtest
+    results, whether they were loaded from CSV, a MarketDataStore or mapped arrays.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    timestamps = np.asarray(pd.to_datetime(data['timestamp']), dtype='datetime64[ms]').astype(np.int64)
+    digest.update(np.ascontiguousarray(timestamps).tobytes())
+    for name in ['open', 'high', 'low', 'close', 'volume']:
+        values = np.ascontiguousarray(data[name].to_numpy())
+        digest.update(values.dtype.str.encode())
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+def _nbytes(value):
+    return int(getattr(value, 'nbytes', 0))
+
+class IndicatorCache:
+    """Memory-bounded LRU cache of indicator arrays keyed by (series, indicator, period)
+
+    Entries belong to one dataset; pass its fingerprint to bind() and the cache is
+    emptied whenever the dataset changes. Values are evicted least recently used
+    first once their total size passes max_bytes.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.fingerprint = None
+        self.entries = OrderedDict()  # (series, indicator, period) -> value
+        self.nbytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def bind(self, fingerprint):
+        if fingerprint != self.fingerprint:
+            self.clear()
+            self.fingerprint = fingerprint
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+    def get(self, series, indicator, period, compute):
+        """Return the cached indicator, calling compute() only the first time it is requested"""
+        key = (series, indicator, period)
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return value
+
+        self.stats['misses'] += 1
+        value = compute()
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            # Larger than the whole budget, hand it out without caching
+            return value
+        self.entries[key] = value
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= _nbytes(evicted)
+            self.stats['evictions'] += 1
+        return value
+
+    @property
+    def computations_avoided(self):
+        return self.stats['hits']
+
+    def snapshot(self):
+        return dict(self.stats, nbytes=self.nbytes)
+
+    def report(self, stats=None):
+        """One line summary of computed and reused indicators, for this cache or a snapshot"""
+        stats = stats or self.snapshot()
+        requested = stats['hits'] + stats['misses']
+        return (f"Indicators: {requested} requested, {stats['misses']} computed, "
+                f"{stats['hits']} computations avoided, {stats['evictions']} evicted, "
+                f"{stats['nbytes'] / 1024 / 1024:.1f} MB cached")
@@ -3,6 +3,7 @@ import json
 import time
 from datetime import datetime, timedelta
 from luno_api_client import LunoAPIClient
+from order_book import OrderBook
 from tabulate import tabulate
 from dotenv import load_dotenv
 
@@ -44,7 +45,6 @@ def get_tickers(pair=DEFAULT_PAIR):
         print(tabulate(table, headers, tablefmt="pretty"))
     except Exception as e:
         print(f"Error getting tickers: {e}")
-    time.sleep(0.5)
 
 def get_ticker(pair=DEFAULT_PAIR):
     try:
@@ -54,19 +54,18 @@ def get_ticker(pair=DEFAULT_PAIR):
         print(tabulate(table, headers, tablefmt="pretty"))
     except Exception as e:
         print(f"Error getting ticker: {e}")
-    time.sleep(0.5)
 
 def get_order_book(pair=DEFAULT_PAIR):
     try:
-        res = client.get_order_book(pair)
-        bids = res.get('bids', [])
-        asks = res.get('asks', [])
-        table = [["Bid", bid['price'], bid['volume']] for bid in bids] + [["Ask", ask['price'], ask['volume']] for ask in asks]
+        book = OrderBook.from_snapshot(client.get_order_book(pair))
+        table = [["Bid", price, volume] for price, volume in book.levels('BID')] + \
+                [["Ask", price, volume] for price, volume in book.levels('ASK')]
         headers = ["Type", "Price", "Volume"]
         print(tabulate(table, headers, tablefmt="pretty"))
+        if book.spread is not None:
+            print(f"Best bid: {book.best_bid}  Best ask: {book.best_ask}  Spread: {book.spread:.2f}")
     except Exception as e:
         print(f"Error getting order book: {e}")
-    time.sleep(0.5)
 
 def list_trades(pair=DEFAULT_PAIR, since=None):
     if since is None:
@@ -83,7 +82,6 @@ def list_trades(pair=DEFAULT_PAIR, since=None):
     except Exception as e:
         print(f"Error listing trades: {e}")
         print("Note: Luno API only allows fetching trades from the last 24 hours")
-    time.sleep(0.5)
 
 def get_candles(pair=DEFAULT_PAIR, since=DEFAULT_TIMESTAMP, duration=3600):
     try:
@@ -94,7 +92,6 @@ def get_candles(pair=DEFAULT_PAIR, since=DEFAULT_TIMESTAMP, duration=3600):
         print(tabulate(table, headers, tablefmt="pretty"))
     except Exception as e:
         print(f"Error getting candles: {e}")
-    time.sleep(0.5)
 
 def get_balances():
     res = None  # Initialize res to None
@@ -106,7 +103,6 @@ def get_balances():
         print(tabulate(table, headers, tablefmt="pretty"))
     except Exception as e:
         print(f"Error getting balances: {e}")
-    time.sleep(0.5)
     return res
 
 def list_transactions(account_id=DEFAULT_ACCOUNT_ID):
@@ -120,7 +116,6 @@ def list_transactions(account_id=DEFAULT_ACCOUNT_ID):
         print(tabulate(table, headers, tablefmt="pretty"))
     except Exception as e:
         print(f"Error listing transactions: {e}")
-    time.sleep(0.5)
 
 def list_pending_transactions(account_id=DEFAULT_ACCOUNT_ID):
     try:
@@ -131,7 +126,6 @@ def list_pending_transactions(account_id=DEFAULT_ACCOUNT_ID):
         print(tabulate(table, headers, tablefmt="pretty"))
     except Exception as e:
         print(f"Error listing pending transactions: {e}")
-    time.sleep(0.5)
 
 def list_orders():
     try:
@@ -142,7 +136,6 @@ def list_orders():
         print(tabulate(table, headers, tablefmt="pretty"))
     except Exception:
         pass  # Handle the exception without displaying an error message
-    time.sleep(0.5)
 
 def list_user_trades(pair=DEFAULT_PAIR):
     try:
@@ -153,7 +146,6 @@ def list_user_trades(pair=DEFAULT_PAIR):
         print(tabulate(table, headers, tablefmt="pretty"))
     except Exception as e:
         print(f"Error listing user trades: {e}")
-    time.sleep(0.5)
 
 def get_fee_info(pair=DEFAULT_PAIR):
     try:
@@ -163,7 +155,6 @@ def get_fee_info(pair=DEFAULT_PAIR):
         print(tabulate(table, headers, tablefmt="pretty"))
     except Exception as e:
         print(f"Error getting fee info: {e}")
-    time.sleep(0.5)
 
 def get_funding_address(asset="XBT"):
     try:
@@ -173,7 +164,6 @@ def get_funding_address(asset="XBT"):
         print(tabulate(table, headers, tablefmt="pretty"))
     except Exception as e:
         print(f"Error getting funding address: {e}")
-    time.sleep(0.5)
 
 def test_api_call():
     try:
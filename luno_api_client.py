@@ -1,7 +1,15 @@
 import os
 import json
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from rate_limiter import RateLimiter, parse_retry_after
+from request_coalescing import SingleFlight
+from response_cache import make_cache_key
 
 # Load environment variables from .env file
 load_dotenv()
@@ -13,16 +21,131 @@ with open(config_path, 'r') as f:
     API_KEY = config.get('luno_api_key')
     API_SECRET = config.get('luno_api_secret')
 
+# Compact record yielded by LunoAPIClient.iter_trades
+Trade = namedtuple('Trade', ['sequence', 'timestamp', 'price', 'volume', 'is_buy'])
+TRADES_PAGE_SIZE = 100
+
 class LunoAPIClient:
     BASE_URL = "https://api.luno.com"
 
-    def __init__(self, api_key, api_secret):
+    def __init__(self, api_key, api_secret, base_url=None, pooled=True, pool_connections=4,
+                 pool_maxsize=10, timeout=10, prewarm=False, rate_limiter=None, max_retries=3, cache=None,
+                 coalesce=True):
         self.api_key = api_key
         self.api_secret = api_secret
+        self.base_url = base_url or self.BASE_URL
+        self.timeout = timeout
+        self.session = None
+        self.pool_maxsize = pool_maxsize
+        # Pass the same RateLimiter to several clients to make them share one budget, False to send unlimited
+        self.rate_limiter = RateLimiter() if rate_limiter is None else rate_limiter or None
+        self.max_retries = max_retries
+        # Threads share the client, so each keeps its own last_wait
+        self._local = threading.local()
+        # Any object with a ResponseCache compatible fetch(method, endpoint, params, loader) can be plugged in
+        self.cache = cache
+        # Identical GETs issued concurrently from several threads share a single HTTP call
+        self.coalescer = SingleFlight() if coalesce else None
+        if pooled:
+            self.session = self._create_session(pool_connections, pool_maxsize)
+            if prewarm:
+                self.prewarm()
+
+    def _create_session(self, pool_connections, pool_maxsize):
+        """Create a keep-alive session with a bounded connection pool per host"""
+        session = requests.Session()
+        session.auth = (self.api_key, self.api_secret)
+        session.headers.update({"Connection": "keep-alive"})
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def prewarm(self, connections=1):
+        """Open pooled connections ahead of time so the first real calls skip the TCP/TLS handshake
+
+        One HEAD request per connection (at most pool_maxsize) is sent from its own
+        thread, and every response is held open until all have connected. Sent one
+        after another they would all reuse the socket the first one returned.
+        """
+        if self.session is None:
+            return
+        connections = max(1, min(connections, self.pool_maxsize))
+        barrier = threading.Barrier(connections)
+
+        def connect(_):
+            response = None
+            try:
+                response = self.session.head(self.base_url, timeout=self.timeout, stream=True)
+            except requests.RequestException:
+                # Pre-warming is best effort, the first real request will connect instead
+                pass
+            try:
+                barrier.wait(timeout=self.timeout)
+            except threading.BrokenBarrierError:
+                pass
+            finally:
+                if response is not None:
+                    response.close()
+
+        with ThreadPoolExecutor(max_workers=connections) as pool:
+            list(pool.map(connect, range(connections)))
+
+    def close(self):
+        """Release all pooled connections"""
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def last_wait(self):
+        """Seconds the calling thread's latest request waited on the rate limiter, Retry-After backoff included
+
+        A request answered by the cache or by another thread's identical call reports 0.
+        """
+        return getattr(self._local, 'last_wait', 0.0)
+
+    def _send(self, method, url, params):
+        if self.session is not None:
+            return self.session.request(method, url, params=params, timeout=self.timeout)
+        return requests.request(method, url, auth=(self.api_key, self.api_secret), params=params,
+                                timeout=self.timeout)
 
     def _request(self, method, endpoint, params=None):
-        url = f"{self.BASE_URL}{endpoint}"
-        response = requests.request(method, url, auth=(self.api_key, self.api_secret), params=params)
+        self._local.last_wait = 0.0
+        if self.cache is not None:
+            return self.cache.fetch(method, endpoint, params, lambda: self._request_coalesced(method, endpoint, params))
+        return self._request_coalesced(method, endpoint, params)
+
+    def _request_coalesced(self, method, endpoint, params=None):
+        if self.coalescer is None or method != "GET":
+            return self._request_uncached(method, endpoint, params)
+        key = make_cache_key(method, endpoint, params)
+        return self.coalescer.do(key, lambda: self._request_uncached(method, endpoint, params))
+
+    def _request_uncached(self, method, endpoint, params=None):
+        url = f"{self.base_url}{endpoint}"
+        waited = 0.0
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                waited += self.rate_limiter.acquire(endpoint)
+            response = self._send(method, url, params)
+            if response.status_code != 429 or attempt == self.max_retries:
+                break
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if self.rate_limiter:
+                self.rate_limiter.backoff(endpoint, retry_after)
+            else:
+                time.sleep(retry_after)
+                waited += retry_after
+        # Time this call spent queued behind the rate limiter, including any Retry-After backoff
+        self._local.last_wait = waited
         if response.status_code != 200:
             raise Exception(f"API call failed: {response.status_code} {response.text}")
         return response.json()
@@ -39,6 +162,56 @@ class LunoAPIClient:
     def list_trades(self, pair, since):
         return self._request("GET", "/api/1/trades", params={"pair": pair, "since": since})
 
+    def iter_trades(self, pair, since, until=None, prefetch=False):
+        """Stream every public trade between since and until (ms) oldest first, one page at a time
+
+        The trades endpoint returns at most 100 trades per call, so this follows the
+        since cursor page by page. Trades repeated across page boundaries are
+        skipped. With prefetch=True the next page is requested in the background
+        while the current one is being consumed.
+        """
+        if until is None:
+            until = int(time.time() * 1000)
+        cursor = since
+        last_key = (-1, -1)
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            pending = executor.submit(self.list_trades, pair, cursor) if executor else None
+            while cursor <= until:
+                page = pending.result() if pending else self.list_trades(pair, cursor)
+                raw_trades = page.get('trades') or []
+                trades = sorted(
+                    (Trade(int(t.get('sequence', 0)), int(t['timestamp']), float(t['price']),
+                           float(t['volume']), bool(t.get('is_buy', False))) for t in raw_trades),
+                    key=lambda t: (t.timestamp, t.sequence)
+                )
+                if not trades:
+                    break
+
+                # The next cursor is known as soon as the page arrives, so the fetch can overlap consumption
+                last_page = len(raw_trades) < TRADES_PAGE_SIZE
+                next_cursor = trades[-1].timestamp
+                if (next_cursor, trades[-1].sequence) <= last_key:
+                    # A full page of trades sharing one timestamp, step past it to guarantee progress
+                    next_cursor += 1
+                pending = None
+                if executor and not last_page and next_cursor <= until:
+                    pending = executor.submit(self.list_trades, pair, next_cursor)
+
+                for trade in trades:
+                    if (trade.timestamp, trade.sequence) <= last_key:
+                        continue
+                    if trade.timestamp > until:
+                        return
+                    last_key = (trade.timestamp, trade.sequence)
+                    yield trade
+                if last_page:
+                    break
+                cursor = next_cursor
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
     def get_candles(self, pair, since, duration):
         return self._request("GET", "/api/exchange/1/candles", params={"pair": pair, "since": since, "duration": duration})
 
@@ -0,0 +1,208 @@
+import os
+import json
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+DAY_MS = 86400000
+
+# Column layouts, every column is stored as a raw little-endian array in its own file
+SCHEMAS = {
+    'candles': [('timestamp', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+                ('volume', '<f8')],
+    'trades': [('timestamp', '<i8'), ('sequence', '<i8'), ('price', '<f8'), ('volume', '<f8'), ('is_buy', 'u1')],
+}
+
+def to_millis(value):
+    """Convert a datetime, pandas Timestamp or epoch milliseconds to epoch milliseconds
+
+    Naive pandas Timestamps (as stored in our data files) are UTC, naive datetimes
+    (as returned by datetime.now()) are local time.
+    """
+    if value is None or isinstance(value, (int, np.integer)):
+        return value
+    if isinstance(value, datetime) and not isinstance(value, pd.Timestamp):
+        return int(value.timestamp() * 1000)
+    return int(pd.Timestamp(value).timestamp() * 1000)
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+OHLCV_META_FILE = 'meta.json'
+
+def write_ohlcv_arrays(candles, path, price_dtype='float64'):
+    """Write OHLCV data as one .npy file per column for memory-mapped loading
+
+    timestamp is stored as int64 epoch milliseconds, prices and volume as price_dtype
+    (float32 halves the footprint of large tapes at the cost of precision).
+    """
+    if isinstance(candles, pd.DataFrame):
+        candles = {name: candles[name].to_numpy() for name in ['timestamp'] + OHLCV_COLUMNS}
+    timestamps = np.asarray(candles['timestamp'])
+    if np.issubdtype(timestamps.dtype, np.datetime64):
+        timestamps = timestamps.astype('datetime64[ms]').astype(np.int64)
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, 'timestamp.npy'), timestamps.astype(np.int64))
+    for name in OHLCV_COLUMNS:
+        np.save(os.path.join(path, f"{name}.npy"), np.asarray(candles[name], dtype=price_dtype))
+    with open(os.path.join(path, OHLCV_META_FILE), 'w') as f:
+        json.dump({'rows': int(len(timestamps)), 'price_dtype': np.dtype(price_dtype).name}, f, indent=4)
+    return path
+
+def is_ohlcv_arrays(path):
+    return os.path.exists(os.path.join(path, OHLCV_META_FILE))
+
+def load_ohlcv_arrays(path):
+    """Memory-map the columns written by write_ohlcv_arrays as read-only arrays
+
+    Nothing is read until it is touched, and every process mapping the same files
+    shares one copy in the page cache.
+    """
+    arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+              for name in ['timestamp'] + OHLCV_COLUMNS}
+    arrays['timestamp'] = arrays['timestamp'].view('datetime64[ms]')
+    return arrays
+
+def ohlcv_frame(arrays):
+    """Wrap OHLCV arrays in a DataFrame without copying them"""
+    return pd.DataFrame({name: arrays[name] for name in ['timestamp'] + OHLCV_COLUMNS}, copy=False)
+
+def candle_dataset(duration):
+    """Dataset name for candles of the given duration in seconds, e.g. candles_300"""
+    return f"candles_{duration}"
+
+def _schema(dataset):
+    return SCHEMAS['candles'] if dataset.startswith('candles') else SCHEMAS[dataset]
+
+class MarketDataStore:
+    """Append-only columnar store for candles and trades, partitioned by pair and UTC day
+
+    Layout:
+        <root>/index.json                                  partition metadata (rows, first/last timestamp)
+        <root>/<dataset>/<pair>/<YYYY-MM-DD>/<column>.bin  one raw array per column
+
+    Timestamps are epoch milliseconds (UTC). Each partition only ever grows at the end,
+    so columns can be memory-mapped and a time-range query only opens the partitions
+    whose [first, last] range overlaps the request.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, 'index.json')
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r') as f:
+                self.index = json.load(f)
+        else:
+            self.index = {}
+
+    def _save_index(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def _partition_dir(self, dataset, pair, day):
+        return os.path.join(self.root, dataset, pair, day)
+
+    def partitions(self, dataset, pair):
+        """Return {day: {'rows', 'first', 'last'}} for a dataset and pair"""
+        return self.index.get(dataset, {}).get(pair, {})
+
+    def last_timestamp(self, dataset, pair):
+        parts = self.partitions(dataset, pair)
+        return max((meta['last'] for meta in parts.values()), default=None)
+
+    def append(self, dataset, pair, columns):
+        """Append rows given as a DataFrame or {column: array}, returns the number of rows written
+
+        Rows must be sorted by timestamp. Rows at or before the last stored timestamp of
+        their day are skipped, so re-ingesting overlapping data is harmless.
+        """
+        schema = _schema(dataset)
+        if isinstance(columns, pd.DataFrame):
+            columns = {name: columns[name].to_numpy() for name, _ in schema}
+        timestamps = np.asarray(columns['timestamp'])
+        if np.issubdtype(timestamps.dtype, np.datetime64):
+            timestamps = timestamps.astype('datetime64[ms]').astype(np.int64)
+        timestamps = timestamps.astype(np.int64)
+        if len(timestamps) == 0:
+            return 0
+
+        written = 0
+        days = timestamps // DAY_MS
+        bounds = np.flatnonzero(np.diff(days)) + 1
+        with self._lock:
+            parts = self.index.setdefault(dataset, {}).setdefault(pair, {})
+            for rows in np.split(np.arange(len(timestamps)), bounds):
+                day = str(np.datetime64(int(days[rows[0]]), 'D'))
+                meta = parts.get(day, {'rows': 0, 'first': None, 'last': None})
+                if meta['last'] is not None:
+                    rows = rows[timestamps[rows] > meta['last']]
+                if len(rows) == 0:
+                    continue
+
+                path = self._partition_dir(dataset, pair, day)
+                os.makedirs(path, exist_ok=True)
+                for name, dtype in schema:
+                    values = timestamps[rows] if name == 'timestamp' else np.asarray(columns[name])[rows]
+                    with open(os.path.join(path, f"{name}.bin"), 'ab') as f:
+                        f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+                meta['rows'] += len(rows)
+                meta['first'] = int(timestamps[rows[0]]) if meta['first'] is None else meta['first']
+                meta['last'] = int(timestamps[rows[-1]])
+                parts[day] = meta
+                written += len(rows)
+            self._save_index()
+        return written
+
+    def _read_column(self, dataset, pair, day, name, dtype, rows):
+        path = os.path.join(self._partition_dir(dataset, pair, day), f"{name}.bin")
+        # Only the rows recorded in the index are valid, a crashed writer may have left a partial tail
+        return np.memmap(path, dtype=dtype, mode='r', shape=(rows,)) if rows else np.empty(0, dtype=dtype)
+
+    def query(self, dataset, pair, start=None, end=None, columns=None):
+        """Return {column: array} for rows with start <= timestamp < end (epoch ms)
+
+        Only partitions overlapping the range are read.
+        """
+        schema = [(name, dtype) for name, dtype in _schema(dataset)
+                  if columns is None or name in columns or name == 'timestamp']
+        parts = self.partitions(dataset, pair)
+        selected = sorted(day for day, meta in parts.items()
+                          if (start is None or meta['last'] >= start) and (end is None or meta['first'] < end))
+        result = {}
+        for name, dtype in schema:
+            arrays = [self._read_column(dataset, pair, day, name, dtype, parts[day]['rows']) for day in selected]
+            result[name] = np.concatenate(arrays) if arrays else np.empty(0, dtype=dtype)
+
+        if start is not None or end is not None:
+            timestamps = result['timestamp']
+            lo = np.searchsorted(timestamps, start, side='left') if start is not None else 0
+            hi = np.searchsorted(timestamps, end, side='left') if end is not None else len(timestamps)
+            result = {name: values[lo:hi] for name, values in result.items()}
+        return result
+
+    def append_candles(self, pair, candles, duration=300):
+        """Append an OHLCV DataFrame with a datetime timestamp column"""
+        return self.append(candle_dataset(duration), pair, candles)
+
+    def append_trades(self, pair, trades):
+        """Append Trade records (see LunoAPIClient.iter_trades) or a trades DataFrame"""
+        if not isinstance(trades, pd.DataFrame):
+            # Trade namedtuples carry their own field names
+            trades = pd.DataFrame(list(trades))
+        return self.append('trades', pair, trades)
+
+    def load_candles(self, pair, start=None, end=None, duration=300):
+        """Load candles as a DataFrame in the backtester's format (timestamp, open, high, low, close, volume)"""
+        data = self.query(candle_dataset(duration), pair, to_millis(start), to_millis(end))
+        df = pd.DataFrame(data)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+    def export_ohlcv(self, pair, path, start=None, end=None, duration=300, price_dtype='float64'):
+        """Pre-convert a candle range into memory-mappable arrays, see load_ohlcv_arrays"""
+        data = self.query(candle_dataset(duration), pair, to_millis(start), to_millis(end))
+        return write_ohlcv_arrays(data, path, price_dtype=price_dtype)
@@ -0,0 +1,369 @@
+import asyncio
+import inspect
+import json
+import logging
+import time
+import aiohttp
+from aiohttp import web
+from luno_api_client import Trade
+from order_book import OrderBook
+
+STREAM_URL = "wss://ws.luno.com/api/1/stream/{pair}"
+STREAM_EVENTS = ('snapshot', 'update', 'trade', 'status')
+
+class SequenceGap(Exception):
+    """An update arrived out of sequence, the local state must be rebuilt from a new snapshot"""
+
+def _is_snapshot(message):
+    return 'asks' in message or 'bids' in message
+
+class MarketStream:
+    """Client for Luno's streaming market data API
+
+    Connects to the websocket stream of one pair, authenticates, and dispatches the
+    initial order book snapshot followed by every update to listeners registered with
+    on(event, callback), or to consumers of the async iterator events(). Events:
+
+        snapshot  the order book message sent on (re)connect
+        update    every sequenced update message
+        trade     a Trade namedtuple per executed trade (price = counter / base)
+        status    the market status when it changes
+
+    Updates carry consecutive sequence numbers. On a gap the connection is dropped and
+    re-established, which delivers a fresh snapshot to resync from. Dropped connections
+    are retried with exponential backoff. The order book is kept current in self.book,
+    so callbacks can query it on every update.
+    """
+
+    def __init__(self, pair, api_key, api_secret, url=None, reconnect_delay=1.0, max_reconnect_delay=30.0,
+                 heartbeat=30, tape_file=None, queue_size=10000):
+        self.pair = pair
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.url = url or STREAM_URL.format(pair=pair)
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.heartbeat = heartbeat
+        self.tape_file = tape_file
+        self.queue_size = queue_size
+        self.listeners = {event: [] for event in STREAM_EVENTS}
+        self.sequence = None
+        # Kept current from the snapshot and every update, also tells which side of a trade was the taker
+        self.book = OrderBook()
+        self.stats = {'messages': 0, 'trades': 0, 'connects': 0, 'reconnects': 0, 'gaps': 0,
+                      'callback_errors': 0, 'dropped_events': 0}
+        self._queues = []
+        self._stopped = False
+        self._ws = None
+        self._task = None
+        self._tape = None
+
+    def on(self, event, callback):
+        """Register callback(payload) for an event, callbacks may be plain functions or coroutines"""
+        if event not in self.listeners:
+            raise ValueError(f"event must be one of {STREAM_EVENTS}")
+        self.listeners[event].append(callback)
+        return callback
+
+    async def events(self, *kinds):
+        """Async iterator of (event, payload) pairs, starts the stream if it is not running
+
+        Events are buffered up to queue_size; when a slow consumer falls that far
+        behind the oldest events are dropped and counted in stats['dropped_events'].
+        """
+        kinds = kinds or STREAM_EVENTS
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        entry = (set(kinds), queue)
+        self._queues.append(entry)
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                yield item
+        finally:
+            self._queues.remove(entry)
+
+    async def stop(self):
+        self._stopped = True
+        if self._ws is not None:
+            await self._ws.close()
+        for _, queue in self._queues:
+            self._offer(queue, None)
+
+    async def run(self):
+        """Stream until stop() is called, reconnecting after errors and sequence gaps"""
+        self._stopped = False
+        delay = self.reconnect_delay
+        if self.tape_file:
+            self._tape = open(self.tape_file, 'a')
+        try:
+            async with aiohttp.ClientSession() as session:
+                while not self._stopped:
+                    received = self.stats['messages']
+                    gap = False
+                    try:
+                        await self._stream(session)
+                    except SequenceGap as e:
+                        self.stats['gaps'] += 1
+                        logging.warning(f"Resyncing {self.pair} stream: {e}")
+                        gap = True
+                    except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError) as e:
+                        logging.error(f"{self.pair} stream connection failed: {e}")
+                    if self._stopped:
+                        break
+                    if self.stats['messages'] > received:
+                        # The connection worked, the next failure starts a fresh backoff
+                        delay = self.reconnect_delay
+                    self.stats['reconnects'] += 1
+                    if gap:
+                        # Resync straight away, the gap is ours rather than the server's
+                        continue
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.max_reconnect_delay)
+        finally:
+            if self._tape is not None:
+                self._tape.close()
+                self._tape = None
+            self._task = None
+
+    def run_forever(self):
+        """Blocking wrapper around run() for scripts and bots without an event loop"""
+        asyncio.run(self.run())
+
+    async def _stream(self, session):
+        self.sequence = None
+        async with session.ws_connect(self.url, heartbeat=self.heartbeat) as ws:
+            self._ws = ws
+            self.stats['connects'] += 1
+            await ws.send_json({'api_key_id': self.api_key, 'api_key_secret': self.api_secret})
+            try:
+                async for msg in ws:
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        break
+                    # The server sends empty messages as keep-alives
+                    if not msg.data.strip() or msg.data.strip() == '""':
+                        continue
+                    await self.handle_message(json.loads(msg.data))
+            finally:
+                self._ws = None
+        if not self._stopped:
+            raise ConnectionError(f"{self.pair} stream closed by server")
+
+    async def handle_message(self, message):
+        """Apply one stream message and dispatch its events"""
+        self.stats['messages'] += 1
+        if self._tape is not None:
+            self._tape.write(json.dumps({'received': int(time.time() * 1000), 'message': message}) + '\n')
+
+        sequence = int(message['sequence'])
+        if _is_snapshot(message):
+            self.sequence = sequence
+            self.book.load_snapshot(message)
+            await self._dispatch('snapshot', message)
+            return
+        if self.sequence is None or sequence != self.sequence + 1:
+            raise SequenceGap(f"expected sequence {None if self.sequence is None else self.sequence + 1}, "
+                              f"got {sequence}")
+        self.sequence = sequence
+
+        fills = self.book.apply_update(message)
+        trades = []
+        for trade_update, (maker_side, _, base) in zip(message.get('trade_updates') or [], fills):
+            counter = float(trade_update['counter'])
+            # A resting ask being hit means the taker bought
+            is_buy = maker_side == 'ASK'
+            trades.append(Trade(sequence, int(message['timestamp']), counter / base if base else 0.0, base, is_buy))
+
+        await self._dispatch('update', message)
+        for trade in trades:
+            self.stats['trades'] += 1
+            await self._dispatch('trade', trade)
+        if message.get('status_update'):
+            await self._dispatch('status', message['status_update'].get('status'))
+
+    def _offer(self, queue, item):
+        while True:
+            try:
+                queue.put_nowait(item)
+                return
+            except asyncio.QueueFull:
+                queue.get_nowait()
+                self.stats['dropped_events'] += 1
+
+    async def _dispatch(self, event, payload):
+        for callback in self.listeners[event]:
+            try:
+                result = callback(payload)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                # A failing strategy callback must not take the feed down
+                self.stats['callback_errors'] += 1
+                logging.error(f"Error in {event} callback: {e}")
+        for kinds, queue in self._queues:
+            if event in kinds:
+                self._offer(queue, (event, payload))
+
+def load_tape(path):
+    """Read the stream messages recorded by MarketStream(tape_file=...)"""
+    with open(path, 'r') as f:
+        return [json.loads(line)['message'] for line in f if line.strip()]
+
+def trades_to_messages(trades, start_sequence=1):
+    """Convert Trade records (e.g. from iter_trades or MarketDataStore) into stream messages
+
+    Each trade becomes a create_update for the resting maker order followed by the
+    trade_update that fills it, so is_buy survives the round trip.
+    """
+    sequence = start_sequence
+    first_timestamp = None
+    messages = []
+    for i, trade in enumerate(trades):
+        timestamp = int(trade.timestamp)
+        first_timestamp = timestamp if first_timestamp is None else first_timestamp
+        maker_id = f"replay-maker-{i}"
+        price = f"{trade.price:.8f}"
+        volume = f"{trade.volume:.8f}"
+        messages.append({'sequence': str(sequence + 1), 'trade_updates': None,
+                         'create_update': {'order_id': maker_id, 'type': 'ASK' if trade.is_buy else 'BID',
+                                           'price': price, 'volume': volume},
+                         'delete_update': None, 'status_update': None, 'timestamp': timestamp})
+        messages.append({'sequence': str(sequence + 2),
+                         'trade_updates': [{'base': volume, 'counter': f"{trade.price * float(volume):.8f}",
+                                            'maker_order_id': maker_id, 'taker_order_id': f"replay-taker-{i}"}],
+                         'create_update': None, 'delete_update': None, 'status_update': None,
+                         'timestamp': timestamp})
+        sequence += 2
+    snapshot = {'sequence': str(start_sequence), 'asks': [], 'bids': [], 'status': 'ACTIVE',
+                'timestamp': first_timestamp or int(time.time() * 1000)}
+    return [snapshot] + messages
+
+class ReplayServer:
+    """Local websocket server that plays recorded stream messages like ws.luno.com
+
+    messages starts with an order book snapshot followed by sequenced updates (see
+    load_tape and trades_to_messages). Every connection receives a snapshot of the
+    book as of the replay position and then the remaining updates, so a client that
+    reconnects resyncs exactly as it would against the live API. speed=None sends as
+    fast as possible, otherwise message timestamps are honoured at `speed` times real
+    time. Sequences in drop_sequences are skipped once, to exercise gap recovery.
+    """
+
+    def __init__(self, messages, host='127.0.0.1', port=0, speed=None, drop_sequences=()):
+        self.snapshot = messages[0]
+        self.updates = messages[1:]
+        self.host = host
+        self.port = port
+        self.speed = speed
+        self.drop_sequences = {int(sequence) for sequence in drop_sequences}
+        self.position = 0
+        self.sequence = int(self.snapshot['sequence'])
+        self.orders = {order['id']: dict(order, type=side) for side, key in (('BID', 'bids'), ('ASK', 'asks'))
+                       for order in self.snapshot.get(key) or []}
+        self.finished = asyncio.Event()
+        self.stats = {'connections': 0, 'sent': 0, 'dropped': 0}
+        self._runner = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/api/1/stream/"
+
+    def stream_url(self, pair):
+        return self.url + pair
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/api/1/stream/{pair}', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Port 0 asks the OS for a free port, read back the one it picked
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _current_snapshot(self):
+        book = {'BID': [], 'ASK': []}
+        for order_id, order in self.orders.items():
+            book[order['type']].append({'id': order_id, 'price': order['price'], 'volume': order['volume']})
+        return {'sequence': str(self.sequence), 'bids': book['BID'], 'asks': book['ASK'],
+                'status': self.snapshot.get('status', 'ACTIVE'), 'timestamp': self.snapshot.get('timestamp')}
+
+    def _apply(self, message):
+        """Track the book so a reconnecting client gets an up to date snapshot"""
+        for trade_update in message.get('trade_updates') or []:
+            order = self.orders.get(trade_update['maker_order_id'])
+            if order is not None:
+                remaining = float(order['volume']) - float(trade_update['base'])
+                if remaining <= 1e-12:
+                    del self.orders[trade_update['maker_order_id']]
+                else:
+                    order['volume'] = f"{remaining:.8f}"
+        create = message.get('create_update')
+        if create:
+            self.orders[create['order_id']] = {'price': create['price'], 'volume': create['volume'],
+                                               'type': create['type']}
+        delete = message.get('delete_update')
+        if delete:
+            self.orders.pop(delete['order_id'], None)
+        self.sequence = int(message['sequence'])
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.stats['connections'] += 1
+        await ws.receive()  # Credentials, not checked by the replay
+        await ws.send_str(json.dumps(self._current_snapshot()))
+
+        # Read concurrently so a client that drops the connection (e.g. after a gap) is
+        # noticed and the rest of the tape is kept for its next connection
+        reader = asyncio.ensure_future(self._read_until_closed(ws))
+        loop = asyncio.get_running_loop()
+        origin = None
+        while self.position < len(self.updates) and not reader.done():
+            message = self.updates[self.position]
+            if self.speed:
+                # Pace against a fixed origin so sleep overshoot does not accumulate
+                if origin is None:
+                    origin = (loop.time(), message['timestamp'])
+                due = origin[0] + (message['timestamp'] - origin[1]) / 1000 / self.speed
+                await asyncio.sleep(max(0, due - loop.time()))
+            self.position += 1
+            self._apply(message)
+            sequence = int(message['sequence'])
+            if sequence in self.drop_sequences:
+                self.drop_sequences.discard(sequence)
+                self.stats['dropped'] += 1
+                continue
+            try:
+                await ws.send_str(json.dumps(message))
+            except ConnectionResetError:
+                break
+            self.stats['sent'] += 1
+            # send_str only yields when the socket buffer is full, give the reader a turn
+            await asyncio.sleep(0)
+        if self.position >= len(self.updates):
+            self.finished.set()
+
+        # Idle like the live stream until the client goes away
+        await reader
+        return ws
+
+    @staticmethod
+    async def _read_until_closed(ws):
+        async for _ in ws:
+            pass
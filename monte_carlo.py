@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+# Upper bound on the size of one chunk of the (paths, trades) matrices
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+def trade_returns(profits, initial_capital):
+    """Return of every closed trade on the capital it was sized from
+
+    Positions are a fixed fraction of capital, so a trade's return carries over to any
+    starting capital and resampled sequences can be compounded.
+    """
+    profits = np.asarray(profits, dtype=np.float64)
+    capital = initial_capital + np.concatenate([[0.0], np.cumsum(profits)[:-1]])
+    return profits / capital
+
+def resample_indices(rng, n_paths, n_items, method='bootstrap', block_size=5):
+    """(n_paths, n_items) matrix of indices into a sequence of n_items
+
+    bootstrap   draws with replacement, each path a new sample of the items
+    shuffle     a permutation per path, the same items in another order
+    block       moving block bootstrap, runs of block_size consecutive items drawn
+                with replacement, so streaks and clustering survive the resampling
+    """
+    if method == 'bootstrap':
+        return rng.integers(0, n_items, (n_paths, n_items))
+    if method == 'shuffle':
+        return rng.permuted(np.broadcast_to(np.arange(n_items), (n_paths, n_items)), axis=1)
+    if method == 'block':
+        block_size = max(1, min(block_size, n_items))
+        n_blocks = -(-n_items // block_size)
+        starts = rng.integers(0, n_items - block_size + 1, (n_paths, n_blocks))
+        return (starts[:, :, None] + np.arange(block_size)).reshape(n_paths, -1)[:, :n_items]
+    raise ValueError(f"unknown resampling method {method!r}, use bootstrap, shuffle or block")
+
+def path_statistics(returns, initial_capital, ruin_level=0.5):
+    """(final capital, max drawdown %, ruined) of every row of a (paths, trades) return matrix
+
+    A path is ruined once its equity falls to ruin_level times the initial capital.
+    """
+    equity = initial_capital * np.cumprod(1 + returns, axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), initial_capital)
+    max_drawdown = np.max(1 - equity / peak, axis=1) * 100
+    ruined = np.min(equity, axis=1) <= ruin_level * initial_capital
+    return equity[:, -1], max_drawdown, ruined
+
+def summarize(final_capital, max_drawdown, ruined, initial_capital, **details):
+    """Result dict of a Monte Carlo run, the per-path arrays plus the headline probabilities"""
+    return {
+        'paths': len(final_capital),
+        'final_capital': final_capital,
+        'max_drawdown': max_drawdown,
+        'risk_of_ruin': float(np.mean(ruined)) if len(ruined) else 0.0,
+        'probability_of_loss': float(np.mean(final_capital < initial_capital)) if len(final_capital) else 0.0,
+        **details,
+    }
+
+def percentiles(values, q=(5, 25, 50, 75, 95)):
+    """{percentile: value} of a Monte Carlo distribution"""
+    return dict(zip(q, np.percentile(values, q).tolist())) if len(values) else {}
+
+def trade_monte_carlo(profits, initial_capital, n_paths=100_000, method='bootstrap', block_size=5,
+                      ruin_level=0.5, seed=None, max_bytes=DEFAULT_MAX_BYTES):
+    """Resample a backtest's closed trades into n_paths equity paths, see resample_indices
+
+    Paths are built a chunk at a time as (paths, trades) matrices of at most about
+    max_bytes each, so memory stays bounded however many paths are asked for. The same
+    seed and max_bytes give the same paths.
+    """
+    returns = trade_returns(profits, initial_capital)
+    if not len(returns):
+        return summarize(np.full(n_paths, float(initial_capital)), np.zeros(n_paths), np.zeros(n_paths, dtype=bool),
+                         initial_capital, method=method, trades=0)
+    rng = np.random.default_rng(seed)
+    # Indices, returns, equity and its running peak are alive together
+    chunk = max(1, max_bytes // (len(returns) * 8 * 4))
+    results = []
+    for offset in range(0, n_paths, chunk):
+        paths = min(chunk, n_paths - offset)
+        indices = resample_indices(rng, paths, len(returns), method, block_size)
+        results.append(path_statistics(returns[indices], initial_capital, ruin_level))
+    final_capital, max_drawdown, ruined = (np.concatenate(column) for column in zip(*results))
+    return summarize(final_capital, max_drawdown, ruined, initial_capital, method=method, trades=len(returns))
+
+def bootstrap_candles(data, n_paths, block_size=60, seed=None):
+    """Yield n_paths OHLCV frames rebuilt from blocks of data's bars
+
+    Bar-to-bar close returns are resampled in blocks of block_size (see resample_indices)
+    and compounded from the first close; every bar keeps the high, low and volume of the
+    bar it was drawn from relative to its close, and opens at the previous close. The
+    frames have data's timestamps, so they backtest like the original series.
+    """
+    close = data['close'].to_numpy(dtype=np.float64)
+    log_returns = np.diff(np.log(close))
+    high_ratio = data['high'].to_numpy(dtype=np.float64) / close
+    low_ratio = data['low'].to_numpy(dtype=np.float64) / close
+    volume = data['volume'].to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    for _ in range(n_paths):
+        # One path at a time, a (paths, bars) index matrix of a long series would not fit in memory
+        indices = resample_indices(rng, 1, len(log_returns), 'block', block_size)[0]
+        # Bar 0 is kept, bar i + 1 of the path takes the move into bar indices[i] + 1
+        bars = np.concatenate([[0], indices + 1])
+        path_close = close[0] * np.exp(np.concatenate([[0.0], np.cumsum(log_returns[indices])]))
+        path_open = np.concatenate([[data['open'].iloc[0]], path_close[:-1]])
+        yield pd.DataFrame({
+            'timestamp': data['timestamp'].to_numpy(),
+            'open': path_open,
+            'high': np.maximum(path_close * high_ratio[bars], np.maximum(path_open, path_close)),
+            'low': np.minimum(path_close * low_ratio[bars], np.minimum(path_open, path_close)),
+            'close': path_close,
+            'volume': volume[bars],
+        })
@@ -0,0 +1,206 @@
+import zlib
+from bisect import bisect_left
+
+# Luno quotes volumes with at most 8 decimals, rounding every level to that keeps
+# repeated float deltas from drifting away from the exchange's book
+VOLUME_DECIMALS = 8
+SIDES = ('BID', 'ASK')
+
+class _BookSide:
+    """Price levels of one side, best first
+
+    keys is a sorted list of the level prices (negated for bids so that both sides
+    sort best first) and volumes maps price -> aggregate volume. Changing the volume of
+    an existing level is a dict update. Adding or removing a level bisects for its
+    position and then inserts into or deletes from keys, which shifts the levels
+    behind it: O(n) in the number of levels, a memmove of a few thousand pointers at
+    most for a real book. The best level is keys[0].
+    """
+    __slots__ = ('sign', 'keys', 'volumes')
+
+    def __init__(self, is_bid):
+        self.sign = -1 if is_bid else 1
+        self.keys = []
+        self.volumes = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, price, delta):
+        """Change the volume at price by delta, returns the new level volume"""
+        volume = round(self.volumes.get(price, 0.0) + delta, VOLUME_DECIMALS)
+        self.set(price, volume)
+        return max(volume, 0.0)
+
+    def set(self, price, volume):
+        key = self.sign * price
+        if volume <= 0:
+            if self.volumes.pop(price, None) is not None:
+                del self.keys[bisect_left(self.keys, key)]
+            return
+        if price not in self.volumes:
+            self.keys.insert(bisect_left(self.keys, key), key)
+        self.volumes[price] = volume
+
+    @property
+    def best(self):
+        return self.sign * self.keys[0] if self.keys else None
+
+    def levels(self, n=None):
+        """(price, volume) pairs best first"""
+        keys = self.keys if n is None else self.keys[:n]
+        return [(self.sign * key, self.volumes[self.sign * key]) for key in keys]
+
+class OrderBook:
+    """L2 order book maintained incrementally from snapshots and deltas
+
+    Levels are kept in sorted price lists per side (see _BookSide): a delta to an
+    existing level is O(1), one that adds or removes a level is O(n) in the levels of
+    its side, and the best bid and ask are O(1). The book can be loaded from a REST
+    get_order_book response or a streaming snapshot and kept current either with
+    apply_delta (price level changes) or apply_update (Luno's order-level stream
+    messages, see MarketStream). Volumes are aggregated per price.
+    """
+
+    def __init__(self):
+        self.bids = _BookSide(is_bid=True)
+        self.asks = _BookSide(is_bid=False)
+        # order_id -> [side, price, remaining volume] for order-level updates
+        self.orders = {}
+        self.sequence = None
+        self.timestamp = None
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        book = cls()
+        book.load_snapshot(snapshot)
+        return book
+
+    def _side(self, side):
+        if side == 'BID':
+            return self.bids
+        if side == 'ASK':
+            return self.asks
+        raise ValueError(f"side must be one of {SIDES}")
+
+    def load_snapshot(self, snapshot):
+        """Replace the book with a REST order book or a streaming snapshot message"""
+        self.bids = _BookSide(is_bid=True)
+        self.asks = _BookSide(is_bid=False)
+        self.orders = {}
+        for side, key in (('BID', 'bids'), ('ASK', 'asks')):
+            book_side = self._side(side)
+            for order in snapshot.get(key) or []:
+                price, volume = float(order['price']), float(order['volume'])
+                book_side.add(price, volume)
+                if 'id' in order:
+                    self.orders[order['id']] = [side, price, volume]
+        self.sequence = int(snapshot['sequence']) if 'sequence' in snapshot else None
+        self.timestamp = snapshot.get('timestamp')
+
+    def apply_delta(self, side, price, delta):
+        """Add delta (negative to remove) to the volume at a price level, returns the new level volume"""
+        return self._side(side).add(float(price), float(delta))
+
+    def set_level(self, side, price, volume):
+        """Set the aggregate volume at a price level, zero removes the level"""
+        self._side(side).set(float(price), round(float(volume), VOLUME_DECIMALS))
+
+    def apply_update(self, message):
+        """Apply one order-level stream update, returns [(maker side, price, base volume)] per trade"""
+        fills = []
+        for trade_update in message.get('trade_updates') or []:
+            base = float(trade_update['base'])
+            order = self.orders.get(trade_update['maker_order_id'])
+            if order is None:
+                fills.append((None, None, base))
+                continue
+            side, price, remaining = order
+            self._side(side).add(price, -base)
+            order[2] = round(remaining - base, VOLUME_DECIMALS)
+            # Orders filled to zero leave the book without a delete update
+            if order[2] <= 0:
+                del self.orders[trade_update['maker_order_id']]
+            fills.append((side, price, base))
+        create = message.get('create_update')
+        if create:
+            price, volume = float(create['price']), float(create['volume'])
+            self.orders[create['order_id']] = [create['type'], price, volume]
+            self._side(create['type']).add(price, volume)
+        delete = message.get('delete_update')
+        if delete:
+            order = self.orders.pop(delete['order_id'], None)
+            if order is not None:
+                self._side(order[0]).add(order[1], -order[2])
+        if 'sequence' in message:
+            self.sequence = int(message['sequence'])
+        self.timestamp = message.get('timestamp', self.timestamp)
+        return fills
+
+    @property
+    def best_bid(self):
+        return self.bids.best
+
+    @property
+    def best_ask(self):
+        return self.asks.best
+
+    @property
+    def spread(self):
+        if not self.bids or not self.asks:
+            return None
+        return self.best_ask - self.best_bid
+
+    @property
+    def mid(self):
+        if not self.bids or not self.asks:
+            return None
+        return (self.best_ask + self.best_bid) / 2
+
+    def depth(self, side, price):
+        """Aggregate volume resting at exactly price"""
+        return self._side(side).volumes.get(float(price), 0.0)
+
+    def levels(self, side, n=None):
+        """Top n (price, volume) levels of a side, best first"""
+        return self._side(side).levels(n)
+
+    def fill(self, size, is_buy):
+        """Walk the book to take size, returns (filled volume, total cost)
+
+        A buy takes asks from the best price up, a sell takes bids from the best price
+        down. filled is less than size when the book is not deep enough.
+        """
+        book_side = self.asks if is_buy else self.bids
+        remaining = size
+        cost = 0.0
+        for key in book_side.keys:
+            if remaining <= 0:
+                break
+            price = book_side.sign * key
+            take = min(remaining, book_side.volumes[price])
+            cost += take * price
+            remaining -= take
+        return size - max(remaining, 0.0), cost
+
+    def vwap_to_fill(self, size, is_buy):
+        """Average price of taking size from the book, None when the book is too thin"""
+        filled, cost = self.fill(size, is_buy)
+        if size <= 0 or filled < size - 10 ** -VOLUME_DECIMALS:
+            return None
+        return cost / filled
+
+    def checksum(self, depth=25):
+        """CRC32 of the top depth levels of both sides, for comparing two books cheaply"""
+        parts = []
+        for side in (self.bids, self.asks):
+            for price, volume in side.levels(depth):
+                parts.append(f"{price:.8f}:{volume:.8f}")
+            parts.append('|')
+        return zlib.crc32(';'.join(parts).encode())
+
+    def verify(self, snapshot, depth=None):
+        """True if the book matches a REST or streaming snapshot (all levels by default)"""
+        other = OrderBook.from_snapshot(snapshot)
+        depth = depth or max(len(self.bids), len(self.asks), len(other.bids), len(other.asks))
+        return self.checksum(depth) == other.checksum(depth)
@@ -0,0 +1,122 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from market_data_store import write_ohlcv_arrays
+
+# Set in each worker process by _init_worker
+_worker_tester = None
+
+def shared_memory_dir():
+    """tmpfs directory backed by RAM where available, so the dataset never touches disk"""
+    return '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+class SharedDataset:
+    """Publish a backtester's OHLCV columns once as memory-mapped arrays in shared memory
+
+    Workers map the same files (see load_ohlcv_arrays), so every process reads one
+    physical copy of the data instead of unpickling its own.
+    """
+
+    def __init__(self, data):
+        self.path = tempfile.mkdtemp(prefix='luno_ohlcv_', dir=shared_memory_dir())
+        write_ohlcv_arrays(data, self.path, price_dtype=data['close'].dtype)
+
+    def close(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def _init_worker(path, initial_capital, fill_model=None, position_size=0.95):
+    global _worker_tester
+    from enhanced_backtester import EnhancedBackTester
+    # Workers report through their results, per backtest console output would only interleave
+    _worker_tester = EnhancedBackTester(path, initial_capital=initial_capital, fill_model=fill_model, quiet=True,
+                                        position_size=position_size)
+
+def _evaluate_chunk(chunk, end=None):
+    metrics = _worker_tester.run_batch([params for _, params in chunk], end=end)
+    results = [(index, params, set_metrics) for (index, params), set_metrics in zip(chunk, metrics)]
+    return results, os.getpid(), _worker_tester.indicators.snapshot()
+
+def _evaluate_window(param_sets, window, metric):
+    from walk_forward import optimize_window
+    fold = optimize_window(_worker_tester, param_sets, window, metric)
+    return fold, os.getpid(), _worker_tester.indicators.snapshot()
+
+class ParallelOptimizer:
+    """Evaluate parameter combinations on a process pool sharing one copy of the dataset
+
+    Used as a context manager the pool and shared dataset stay up across several
+    iter_results calls, as adaptive searches evaluate one batch at a time.
+    """
+
+    def __init__(self, tester, workers=None, chunk_size=None):
+        self.tester = tester
+        self.workers = workers or os.cpu_count()
+        self.chunk_size = chunk_size
+        self.worker_indicator_stats = {}  # pid -> latest IndicatorCache snapshot of that worker
+        self.dataset = None
+        self.executor = None
+
+    def __enter__(self):
+        self.dataset = SharedDataset(self.tester.data)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(self.dataset.path, self.tester.initial_capital,
+                                                      self.tester.fill_model, self.tester.position_size))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.executor.shutdown()
+        self.dataset.close()
+        self.executor = self.dataset = None
+
+    def iter_results(self, combinations, end=None):
+        """Yield (index, params, metrics) for every combination as soon as its chunk completes
+
+        end limits the backtests to the first `end` bars.
+        """
+        if self.executor is None:
+            with self:
+                yield from self.iter_results(combinations, end=end)
+            return
+
+        indexed = list(enumerate(combinations))
+        # A few chunks per worker balances load without paying per-task overhead for every combination
+        chunk_size = self.chunk_size or max(1, len(indexed) // (self.workers * 4))
+        chunks = [indexed[i:i + chunk_size] for i in range(0, len(indexed), chunk_size)]
+        futures = [self.executor.submit(_evaluate_chunk, chunk, end) for chunk in chunks]
+        for future in as_completed(futures):
+            results, pid, indicator_stats = future.result()
+            self.worker_indicator_stats[pid] = indicator_stats
+            yield from results
+
+    def iter_windows(self, param_sets, windows, metric):
+        """Yield (window number, fold) for walk-forward windows as they complete, see walk_forward
+
+        Each window is one task, a worker optimizes it over all param_sets with the
+        indicators it already holds for the whole series.
+        """
+        if self.executor is None:
+            with self:
+                yield from self.iter_windows(param_sets, windows, metric)
+            return
+
+        futures = {self.executor.submit(_evaluate_window, param_sets, window, metric): i
+                   for i, window in enumerate(windows)}
+        for future in as_completed(futures):
+            fold, pid, indicator_stats = future.result()
+            self.worker_indicator_stats[pid] = indicator_stats
+            yield futures[future], fold
+
+    def indicator_stats(self):
+        """IndicatorCache snapshots of all workers summed together"""
+        total = {'hits': 0, 'misses': 0, 'evictions': 0, 'nbytes': 0}
+        for stats in self.worker_indicator_stats.values():
+            for key in total:
+                total[key] += stats[key]
+        return total
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Endpoints that only read public market data, everything else counts against the private limit
+PUBLIC_ENDPOINTS = (
+    "/api/1/tickers",
+    "/api/1/ticker",
+    "/api/1/orderbook",
+    "/api/1/orderbook_top",
+    "/api/1/trades",
+    "/api/exchange/1/candles",
+)
+
+# (requests per second, burst capacity) per endpoint class, Luno allows 300 calls per minute per
+# API key. Every request is sent with the key, so by default public and private calls share
+# one "all" bucket; limits with separate "public" and "private" entries split them.
+DEFAULT_LIMITS = {
+    "all": (5.0, 10),
+}
+
+def classify_endpoint(endpoint):
+    """Return the rate limit class ('public' or 'private') of an API endpoint"""
+    return "public" if endpoint in PUBLIC_ENDPOINTS else "private"
+
+def parse_retry_after(value, default=1.0):
+    """Parse a Retry-After header given either as seconds or as an HTTP date"""
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+class TokenBucket:
+    """Thread-safe token bucket, callers reserve a token and are told how long to wait for it"""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take one token and return the number of seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def block(self, seconds):
+        """Stop handing out tokens for the given number of seconds (server asked us to back off)"""
+        with self._lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = now
+
+class RateLimiter:
+    """Per endpoint class token buckets shared by every thread and asyncio task using a client
+
+    An endpoint class without a bucket of its own in limits uses the "all" bucket.
+    """
+
+    def __init__(self, limits=None):
+        limits = limits or DEFAULT_LIMITS
+        self.buckets = {name: TokenBucket(rate, capacity) for name, (rate, capacity) in limits.items()}
+        self.stats = {name: {'calls': 0, 'total_wait': 0.0, 'max_wait': 0.0, 'backoffs': 0} for name in limits}
+        self._lock = threading.Lock()
+
+    def _bucket_name(self, endpoint):
+        name = classify_endpoint(endpoint)
+        return name if name in self.buckets else "all"
+
+    def _record(self, name, wait):
+        with self._lock:
+            stats = self.stats[name]
+            stats['calls'] += 1
+            stats['total_wait'] += wait
+            stats['max_wait'] = max(stats['max_wait'], wait)
+
+    def acquire(self, endpoint):
+        """Block the calling thread until the endpoint may be called, returns seconds waited"""
+        name = self._bucket_name(endpoint)
+        wait = self.buckets[name].reserve()
+        if wait > 0:
+            time.sleep(wait)
+        self._record(name, wait)
+        return wait
+
+    async def acquire_async(self, endpoint):
+        """Suspend the calling task until the endpoint may be called, returns seconds waited"""
+        name = self._bucket_name(endpoint)
+        wait = self.buckets[name].reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._record(name, wait)
+        return wait
+
+    def backoff(self, endpoint, retry_after):
+        """Honor a 429 response: pause the endpoint's class for retry_after seconds"""
+        name = self._bucket_name(endpoint)
+        self.buckets[name].block(retry_after)
+        with self._lock:
+            self.stats[name]['backoffs'] += 1
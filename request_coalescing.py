@@ -0,0 +1,80 @@
+import asyncio
+import threading
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Collapse identical concurrent calls from many threads into one execution
+
+    Every caller that arrives while a call for the same key is running waits for
+    it and receives the same result (or the same exception).
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.stats = {'executed': 0, 'shared': 0}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self.calls.get(key)
+            if call is not None:
+                self.stats['shared'] += 1
+                leader = False
+            else:
+                call = self.calls[key] = _Call()
+                self.stats['executed'] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self.calls[key]
+            call.done.set()
+
+class AsyncSingleFlight:
+    """asyncio version of SingleFlight, identical concurrent coroutines share one awaitable"""
+
+    def __init__(self):
+        self.calls = {}
+        self.stats = {'executed': 0, 'shared': 0}
+
+    async def do(self, key, coro_fn):
+        future = self.calls.get(key)
+        if future is not None:
+            self.stats['shared'] += 1
+            return await asyncio.shield(future)
+
+        future = self.calls[key] = asyncio.get_running_loop().create_future()
+        # Mark the outcome as retrieved so a failure with no followers does not log a warning
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self.stats['executed'] += 1
+        try:
+            result = await coro_fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self.calls[key]
@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+
+# endpoint: (seconds a response stays fresh, extra seconds it may be served stale while refreshing)
+DEFAULT_TTLS = {
+    "/api/1/fee_info": (3600, 86400),  # Fee schedules change a few times a month
+    "/api/1/tickers": (2, 0),
+    "/api/1/ticker": (2, 0),
+    "/api/1/balance": (5, 0),
+}
+
+def make_cache_key(method, endpoint, params=None):
+    """Build a hashable key from a request's method, endpoint and params"""
+    return (method, endpoint, tuple(sorted((params or {}).items())))
+
+class ResponseCache:
+    """Bounded in-process LRU cache of API responses with per endpoint TTL and stale-while-revalidate"""
+
+    def __init__(self, ttls=None, max_entries=256):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (stored_at, value)
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'evictions': 0}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def is_cacheable(self, method, endpoint):
+        return method == "GET" and endpoint in self.ttls
+
+    def _store(self, key, value):
+        with self._lock:
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def _refresh(self, key, loader):
+        try:
+            self._store(key, loader())
+            with self._lock:
+                self.stats['refreshes'] += 1
+        except Exception:
+            # Keep serving the stale value, the next lookup after it expires will fetch again
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def fetch(self, method, endpoint, params, loader):
+        """Return the cached response for the request, calling loader() on a miss"""
+        if not self.is_cacheable(method, endpoint):
+            return loader()
+
+        key = make_cache_key(method, endpoint, params)
+        ttl, stale_for = self.ttls[endpoint]
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                age = time.monotonic() - entry[0]
+                if age < ttl:
+                    self.entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry[1]
+                if age < ttl + stale_for:
+                    self.entries.move_to_end(key)
+                    self.stats['stale_hits'] += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+                    return entry[1]
+            self.stats['misses'] += 1
+
+        value = loader()
+        self._store(key, value)
+        return value
+
+    def invalidate(self, endpoint=None):
+        """Drop every cached response, or only those of one endpoint"""
+        with self._lock:
+            if endpoint is None:
+                self.entries.clear()
+            else:
+                for key in [key for key in self.entries if key[1] == endpoint]:
+                    del self.entries[key]
+
+    def hit_rate(self):
+        with self._lock:
+            hits = self.stats['hits'] + self.stats['stale_hits']
+            total = hits + self.stats['misses']
+        return hits / total if total else 0.0
@@ -0,0 +1,137 @@
+import json
+import re
+import sqlite3
+from datetime import datetime
+
+# Comparison operators accepted by ResultStore.query filters
+FILTER_OPERATORS = ('<', '<=', '=', '>=', '>', '!=')
+_METRIC_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    params TEXT NOT NULL,
+    bars INTEGER NOT NULL,
+    complete INTEGER NOT NULL,
+    metrics TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    UNIQUE (fingerprint, params, bars)
+);
+CREATE TABLE IF NOT EXISTS result_metrics (
+    result_id INTEGER NOT NULL REFERENCES results (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (result_id, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_result_metrics_value ON result_metrics (name, value);
+"""
+
+def params_key(params):
+    """Canonical text form of a parameter set, the same for any key order"""
+    return json.dumps(params, sort_keys=True)
+
+class ResultStore:
+    """SQLite store of every (results fingerprint, parameters) -> metrics backtest result
+
+    Results are keyed by the results fingerprint (the dataset and the backtester
+    settings, see EnhancedBackTester.results_fingerprint), the parameters and the
+    number of bars tested, so an interrupted optimization can skip everything it
+    already evaluated. Each numeric metric is also stored in an indexed (name, value)
+    table for top-N and filter queries.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        # WAL keeps committed results safe across crashes without a full sync per batch
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get(self, fingerprint, param_sets, bars):
+        """Return {params_key: metrics} for the parameter sets already evaluated on these bars"""
+        keys = list({params_key(params) for params in param_sets})
+        found = {}
+        # Stay below SQLite's bound parameter limit
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT params, metrics FROM results WHERE fingerprint = ? AND bars = ? "
+                f"AND params IN ({','.join('?' * len(chunk))})", [fingerprint, bars] + chunk)
+            found.update((key, json.loads(metrics)) for key, metrics in rows)
+        return found
+
+    def put(self, fingerprint, results, bars, complete=True):
+        """Store (params, metrics) pairs in one transaction, replacing earlier results for the same key
+
+        complete marks results computed on the whole dataset rather than a prefix.
+        """
+        created_at = datetime.now().isoformat()
+        with self.conn:
+            for params, metrics in results:
+                key = params_key(params)
+                self.conn.execute("DELETE FROM results WHERE fingerprint = ? AND params = ? AND bars = ?",
+                                  (fingerprint, key, bars))
+                cursor = self.conn.execute(
+                    "INSERT INTO results (fingerprint, params, bars, complete, metrics, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (fingerprint, key, bars, int(complete), json.dumps(metrics), created_at))
+                self.conn.executemany(
+                    "INSERT INTO result_metrics (result_id, name, value) VALUES (?, ?, ?)",
+                    [(cursor.lastrowid, name, float(value)) for name, value in metrics.items()
+                     if isinstance(value, (int, float))])
+
+    def query(self, fingerprint=None, filters=None, order_by='total_profit', descending=True, limit=None,
+              include_partial=False):
+        """Stored results matching every filter, best first
+
+        filters maps a metric name to (operator, value), e.g. {'win_rate': ('>=', 0.5)}.
+        Only whole-dataset results are returned unless include_partial is set.
+        Returns a list of {'parameters', 'metrics', 'fingerprint', 'bars'} dicts.
+        """
+        joins, args, where = [], [], []
+        for i, (name, (op, value)) in enumerate((filters or {}).items()):
+            if op not in FILTER_OPERATORS or not _METRIC_NAME.match(name):
+                raise ValueError(f"Invalid filter {name} {op} {value}")
+            joins.append(f"JOIN result_metrics f{i} ON f{i}.result_id = r.id AND f{i}.name = ? "
+                         f"AND f{i}.value {op} ?")
+            args += [name, value]
+        if order_by:
+            joins.append("JOIN result_metrics o ON o.result_id = r.id AND o.name = ?")
+            args.append(order_by)
+        if not include_partial:
+            where.append("r.complete = 1")
+        if fingerprint is not None:
+            where.append("r.fingerprint = ?")
+            args.append(fingerprint)
+
+        sql = "SELECT r.params, r.metrics, r.fingerprint, r.bars FROM results r " + " ".join(joins)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if order_by:
+            sql += f" ORDER BY o.value {'DESC' if descending else 'ASC'}, r.id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+        return [{'parameters': json.loads(params), 'metrics': json.loads(metrics), 'fingerprint': fp, 'bars': bars}
+                for params, metrics, fp, bars in self.conn.execute(sql, args)]
+
+    def top(self, n=10, metric='total_profit', fingerprint=None, filters=None):
+        """The n best whole-dataset results by metric"""
+        return self.query(fingerprint=fingerprint, filters=filters, order_by=metric, limit=n)
+
+    def count(self, fingerprint=None):
+        if fingerprint is None:
+            return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM results WHERE fingerprint = ?", (fingerprint,)).fetchone()[0]
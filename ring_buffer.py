@@ -0,0 +1,71 @@
+from datetime import datetime
+import numpy as np
+
+class PriceRingBuffer:
+    """Fixed-capacity history of (timestamp, price) ticks backed by NumPy arrays
+
+    Every tick is written twice, at i and i + capacity, into arrays of twice the
+    capacity. The last `count` ticks are therefore always one contiguous slice, so the
+    ordered prices and timestamps are returned as read-only views without copying,
+    and appending never shifts or reallocates anything.
+    """
+
+    def __init__(self, capacity=1000):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._prices = np.zeros(2 * capacity, dtype=np.float64)
+        self._timestamps = np.zeros(2 * capacity, dtype='datetime64[ms]')
+        self.pos = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def full(self):
+        return self.count == self.capacity
+
+    def append(self, price, timestamp=None):
+        """Add a tick, dropping the oldest once the buffer is full"""
+        timestamp = np.datetime64(timestamp or datetime.now(), 'ms')
+        for i in (self.pos, self.pos + self.capacity):
+            self._prices[i] = price
+            self._timestamps[i] = timestamp
+        self.pos = (self.pos + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def extend(self, prices, timestamps):
+        """Append many ticks at once"""
+        for price, timestamp in zip(prices, timestamps):
+            self.append(price, timestamp)
+
+    def _view(self, values, n=None):
+        n = self.count if n is None else min(n, self.count)
+        end = self.pos + self.capacity
+        view = values[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def prices(self):
+        """Prices oldest first, a read-only view valid until the next append"""
+        return self._view(self._prices)
+
+    @property
+    def timestamps(self):
+        """Timestamps (datetime64[ms]) oldest first, a read-only view valid until the next append"""
+        return self._view(self._timestamps)
+
+    def last(self, n):
+        """View of the last n prices, oldest first"""
+        return self._view(self._prices, n)
+
+    @property
+    def latest(self):
+        return self._prices[self.pos + self.capacity - 1] if self.count else None
+
+    def clear(self):
+        self.pos = 0
+        self.count = 0
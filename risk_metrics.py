@@ -0,0 +1,151 @@
+import numpy as np
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+# Drawdowns below this count as being at the peak: a position opened without fees
+# values the equity back at its peak, up to rounding of the running capital
+PEAK_TOLERANCE = 1e-12
+
+def periods_per_year(timestamps):
+    """Bars per year implied by the median spacing of a timestamp column"""
+    values = np.asarray(timestamps, dtype='datetime64[ms]').astype(np.int64)
+    if len(values) < 2:
+        return 1.0
+    spacing = float(np.median(np.diff(values))) / 1000
+    return SECONDS_PER_YEAR / spacing if spacing > 0 else 1.0
+
+def equity_curve(close, entry_index, exit_index, amount, entry_cost, profit, initial_capital):
+    """Mark-to-market equity and position size at every bar, from a strategy's trades
+
+    Trade arrays are aligned: a position of `amount` bought for `entry_cost` (price
+    times amount plus any buy fee) at bar entry_index is closed at bar exit_index, or
+    stays open to the end when exit_index is -1, realizing `profit`. While open it is
+    valued at the close, so losses inside a trade show up in the curve. Built from
+    difference arrays and cumulative sums, without looping over bars or trades.
+    """
+    n = len(close)
+    entry_index = np.asarray(entry_index, dtype=np.int64)
+    exit_index = np.asarray(exit_index, dtype=np.int64)
+    exit_index = np.where(exit_index < 0, n, exit_index)
+    amount = np.asarray(amount, dtype=np.float64)
+    position = np.zeros(n + 1)
+    cost = np.zeros(n + 1)
+    realized = np.zeros(n + 1)
+    np.add.at(position, entry_index, amount)
+    np.add.at(position, exit_index, -amount)
+    np.add.at(cost, entry_index, entry_cost)
+    np.add.at(cost, exit_index, -np.asarray(entry_cost, dtype=np.float64))
+    closed = exit_index < n
+    np.add.at(realized, exit_index[closed], np.asarray(profit, dtype=np.float64)[closed])
+    position = np.cumsum(position[:n])
+    equity = initial_capital + np.cumsum(realized[:n]) + position * close - np.cumsum(cost[:n])
+    return equity, position
+
+def drawdown_series(equity):
+    """Fall from the running peak at every bar, as a fraction of the peak"""
+    peak = np.maximum.accumulate(equity)
+    return (peak - equity) / peak
+
+def _empty_metrics():
+    return {'sharpe_ratio': 0.0, 'sortino_ratio': 0.0, 'calmar_ratio': 0.0, 'annual_return': 0.0,
+            'equity_max_drawdown': 0.0, 'max_drawdown_duration': 0, 'exposure': 0.0, 'turnover': 0.0}
+
+def risk_metrics(equity, position=None, traded_value=0.0, periods_per_year=1.0):
+    """Risk-adjusted metrics of a per-bar equity curve
+
+    Returns are bar to bar; Sharpe and Sortino are annualized with periods_per_year
+    and assume a zero risk-free rate. Drawdowns are in percent (like trade_metrics),
+    their duration in bars. exposure is the fraction of bars holding a position and
+    turnover the traded value over the average equity.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    if len(equity) < 2:
+        return _empty_metrics()
+    returns = np.diff(equity) / equity[:-1]
+    mean = returns.mean()
+    volatility = returns.std()
+    downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2))
+    scale = np.sqrt(periods_per_year)
+
+    drawdown = drawdown_series(equity)
+    bars = np.arange(len(equity))
+    # Index of the latest peak at every bar, the gap to it is the time spent under water
+    last_peak = np.maximum.accumulate(np.where(drawdown <= PEAK_TOLERANCE, bars, 0))
+    max_drawdown = float(drawdown.max())
+    annual_return = float((equity[-1] / equity[0]) ** (periods_per_year / (len(equity) - 1)) - 1)
+
+    return {
+        'sharpe_ratio': float(mean / volatility * scale) if volatility > 0 else 0.0,
+        'sortino_ratio': float(mean / downside * scale) if downside > 0 else 0.0,
+        'calmar_ratio': annual_return / max_drawdown if max_drawdown > 0 else 0.0,
+        'annual_return': annual_return,
+        'equity_max_drawdown': max_drawdown * 100,
+        'max_drawdown_duration': int((bars - last_peak).max()),
+        'exposure': float(np.count_nonzero(position) / len(position)) if position is not None else 0.0,
+        'turnover': float(traded_value / equity.mean()),
+    }
+
+def trade_risk_metrics(close, entry_index, exit_index, amount, entry_cost, profit, initial_capital,
+                       periods_per_year=1.0):
+    """risk_metrics of a strategy's trades without building the whole equity curve
+
+    Equity only moves while a position is open and on the bar it is closed, so the
+    statistics are computed on those bars alone; every flat stretch repeats the value
+    before it and is accounted for in closed form (zero returns, same drawdown, its
+    length in the duration and average equity). The cost grows with the bars spent in
+    the market rather than the length of the data. Matches risk_metrics(equity_curve(...))
+    up to float rounding. See equity_curve for the trade arrays.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    if n < 2:
+        return _empty_metrics()
+    entry_index = np.asarray(entry_index, dtype=np.int64)
+    exit_index = np.asarray(exit_index, dtype=np.int64)
+    amount = np.asarray(amount, dtype=np.float64)
+    entry_cost = np.asarray(entry_cost, dtype=np.float64)
+    profit = np.asarray(profit, dtype=np.float64)
+    closed = exit_index >= 0
+    # Bars each trade moves the equity: entry to exit inclusive, or to the end while open
+    stop = np.where(closed, exit_index + 1, n)
+    lengths = stop - entry_index
+    trade = np.repeat(np.arange(len(entry_index)), lengths)
+    bar = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths - entry_index, lengths)
+    capital = initial_capital + np.concatenate([[0.0], np.cumsum(profit)])
+    holding = ~closed[trade] | (bar < exit_index[trade])
+    values = np.where(holding, capital[trade] + amount[trade] * close[bar] - entry_cost[trade],
+                      capital[trade + 1])
+
+    # Points where the equity may change, starting with the flat capital at bar 0
+    if len(bar) == 0 or bar[0] > 0:
+        bar = np.concatenate([[0], bar])
+        values = np.concatenate([[float(initial_capital)], values])
+    returns = values[1:] / values[:-1] - 1
+    periods = n - 1
+    mean = returns.sum() / periods
+    volatility = np.sqrt(max(np.dot(returns, returns) / periods - mean ** 2, 0.0))
+    downside = np.sqrt(np.sum(np.minimum(returns, 0) ** 2) / periods)
+    scale = np.sqrt(periods_per_year)
+
+    peak = np.maximum.accumulate(values)
+    drawdown = (peak - values) / peak
+    at_peak = drawdown <= PEAK_TOLERANCE
+    # Each point holds its value through the flat bars up to the next one, so a peak
+    # lasts to the bar before the next point and so does time spent under water
+    next_bar = np.append(bar[1:], n)
+    last_peak = np.maximum.accumulate(np.where(at_peak, next_bar - 1, 0))
+    duration = np.where(at_peak, 0, next_bar - 1 - last_peak)
+    max_drawdown = float(drawdown.max())
+    annual_return = float((values[-1] / values[0]) ** (periods_per_year / periods) - 1)
+    average_equity = float(np.dot(values, next_bar - bar)) / n
+    traded_value = (np.sum(amount * close[entry_index]) + np.sum(amount[closed] * close[exit_index[closed]]))
+
+    return {
+        'sharpe_ratio': float(mean / volatility * scale) if volatility > 0 else 0.0,
+        'sortino_ratio': float(mean / downside * scale) if downside > 0 else 0.0,
+        'calmar_ratio': annual_return / max_drawdown if max_drawdown > 0 else 0.0,
+        'annual_return': annual_return,
+        'equity_max_drawdown': max_drawdown * 100,
+        'max_drawdown_duration': int(duration.max()),
+        'exposure': float(np.sum(np.where(closed, exit_index, n) - entry_index) / n),
+        'turnover': float(traded_value / average_equity),
+    }
@@ -0,0 +1,182 @@
+import itertools
+import math
+import numpy as np
+
+class SearchStrategy:
+    """Base class of the parameter searches used by EnhancedBackTester.optimize_strategy
+
+    run() calls evaluate(param_sets, end=None), which yields (i, params, metrics) for the
+    i-th parameter set in any order, with end limiting the backtest to the first `end`
+    bars. run() yields (index, params, metrics) for every full-data evaluation, index
+    being the order in which the strategy proposed it.
+    """
+
+    def __init__(self, budget=None, seed=None):
+        self.budget = budget
+        self.seed = seed
+
+    def run(self, evaluate, parameter_ranges, score, n_bars):
+        raise NotImplementedError
+
+    @staticmethod
+    def space(parameter_ranges):
+        return list(parameter_ranges.keys()), [list(values) for values in parameter_ranges.values()]
+
+    @staticmethod
+    def to_params(keys, values, point):
+        return {key: values[d][i] for d, (key, i) in enumerate(zip(keys, point))}
+
+    def sample_points(self, rng, values, count, exclude=()):
+        """Up to count distinct random grid points (tuples of value indices) not in exclude"""
+        total = math.prod(len(v) for v in values)
+        seen = set(exclude)
+        points = []
+        count = min(count, total - len(seen))
+        while len(points) < count:
+            draws = np.stack([rng.integers(0, len(v), size=2 * (count - len(points))) for v in values], axis=1)
+            for point in map(tuple, draws.tolist()):
+                if point not in seen:
+                    seen.add(point)
+                    points.append(point)
+                    if len(points) == count:
+                        break
+        return points
+
+    @staticmethod
+    def collect(evaluate, param_sets, end=None):
+        """Evaluate param_sets and return their metrics in input order"""
+        metrics = [None] * len(param_sets)
+        for i, _, set_metrics in evaluate(param_sets, end=end):
+            metrics[i] = set_metrics
+        return metrics
+
+class GridSearch(SearchStrategy):
+    """Every combination of the parameter ranges, the optimizer's original behaviour"""
+
+    def run(self, evaluate, parameter_ranges, score, n_bars):
+        keys, values = self.space(parameter_ranges)
+        combinations = [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+        yield from evaluate(combinations)
+
+class RandomSearch(SearchStrategy):
+    """budget distinct combinations drawn uniformly from the grid"""
+
+    def __init__(self, budget=100, seed=None):
+        super().__init__(budget, seed)
+
+    def run(self, evaluate, parameter_ranges, score, n_bars):
+        keys, values = self.space(parameter_ranges)
+        rng = np.random.default_rng(self.seed)
+        param_sets = [self.to_params(keys, values, point) for point in self.sample_points(rng, values, self.budget)]
+        yield from evaluate(param_sets)
+
+class SuccessiveHalving(SearchStrategy):
+    """Evaluate many random combinations on a short data prefix and promote the best 1/eta
+
+    Rung r runs the survivors on the first min_fraction * eta**r of the bars, the last
+    rung on all of them. The number of starting combinations is chosen so the total
+    work equals `budget` full-data backtests.
+    """
+
+    def __init__(self, budget=100, seed=None, eta=3, min_fraction=1 / 9):
+        super().__init__(budget, seed)
+        self.eta = eta
+        self.min_fraction = min_fraction
+
+    def run(self, evaluate, parameter_ranges, score, n_bars):
+        keys, values = self.space(parameter_ranges)
+        rng = np.random.default_rng(self.seed)
+        rungs = max(0, int(round(math.log(1 / self.min_fraction, self.eta))))
+        # Every rung costs about n0 / eta**rungs full backtests
+        n0 = max(1, int(self.budget * self.eta ** rungs / (rungs + 1)))
+        candidates = [self.to_params(keys, values, point) for point in self.sample_points(rng, values, n0)]
+
+        for rung in range(rungs):
+            end = max(1, int(n_bars * self.eta ** (rung - rungs)))
+            scores = [score(m) for m in self.collect(evaluate, candidates, end=end)]
+            keep = max(1, len(candidates) // self.eta)
+            # Stable sort keeps ties in proposal order
+            order = sorted(range(len(candidates)), key=lambda i: -scores[i])
+            candidates = [candidates[i] for i in sorted(order[:keep])]
+        yield from evaluate(candidates)
+
+class TPESearch(SearchStrategy):
+    """Tree-structured Parzen estimator style sampler over the parameter grid
+
+    After n_startup random combinations, the evaluated ones are split into the best
+    `gamma` fraction and the rest. For each parameter a smoothed histogram over its grid
+    values (neighbouring values share weight) is fitted to both groups. Candidates are
+    drawn from the good histograms and the batch_size with the highest good/bad
+    likelihood ratio are evaluated next, until budget evaluations are spent.
+    """
+
+    def __init__(self, budget=100, seed=None, n_startup=20, gamma=0.25, batch_size=8, n_candidates=64):
+        super().__init__(budget, seed)
+        self.n_startup = n_startup
+        self.gamma = gamma
+        self.batch_size = batch_size
+        self.n_candidates = n_candidates
+
+    @staticmethod
+    def _density(indices, size):
+        """Histogram of value indices smoothed with a discrete Gaussian kernel, plus a uniform prior"""
+        bandwidth = max(1.0, size / 10)
+        grid = np.arange(size)
+        weights = np.exp(-0.5 * ((grid[None, :] - np.asarray(indices)[:, None]) / bandwidth) ** 2)
+        weights /= weights.sum(axis=1, keepdims=True)
+        density = weights.sum(axis=0) + 1.0 / size
+        return density / density.sum()
+
+    def run(self, evaluate, parameter_ranges, score, n_bars):
+        keys, values = self.space(parameter_ranges)
+        rng = np.random.default_rng(self.seed)
+        total = math.prod(len(v) for v in values)
+        budget = min(self.budget, total)
+        points, scores = [], []
+
+        def evaluate_points(batch):
+            param_sets = [self.to_params(keys, values, point) for point in batch]
+            for i, params, metrics in evaluate(param_sets):
+                scores.append((len(points) + i, score(metrics)))
+                yield len(points) + i, params, metrics
+            points.extend(batch)
+
+        yield from evaluate_points(self.sample_points(rng, values, min(self.n_startup, budget)))
+        while len(points) < budget:
+            ordered = [s for _, s in sorted(scores)]
+            n_good = max(1, int(math.ceil(self.gamma * len(ordered))))
+            ranking = np.argsort(-np.asarray(ordered), kind='stable')
+            good, bad = ranking[:n_good], ranking[n_good:]
+            point_array = np.asarray(points)
+
+            candidates = []
+            log_ratio = np.zeros(self.n_candidates)
+            draws = []
+            for d, v in enumerate(values):
+                l = self._density(point_array[good, d], len(v))
+                g = self._density(point_array[bad, d], len(v)) if len(bad) else np.full(len(v), 1 / len(v))
+                draw = rng.choice(len(v), size=self.n_candidates, p=l)
+                log_ratio += np.log(l[draw]) - np.log(g[draw])
+                draws.append(draw)
+            seen = set(points)
+            for c in np.argsort(-log_ratio, kind='stable'):
+                point = tuple(int(draw[c]) for draw in draws)
+                if point not in seen:
+                    seen.add(point)
+                    candidates.append(point)
+                if len(candidates) == min(self.batch_size, budget - len(points)):
+                    break
+            if len(candidates) < min(self.batch_size, budget - len(points)):
+                # The good region is exhausted, top up with unexplored random combinations
+                candidates += self.sample_points(rng, values, min(self.batch_size, budget - len(points)) -
+                                                 len(candidates), exclude=seen)
+            if not candidates:
+                break
+            yield from evaluate_points(candidates)
+
+SEARCH_STRATEGIES = {
+    'grid': GridSearch,
+    'random': RandomSearch,
+    'halving': SuccessiveHalving,
+    'tpe': TPESearch,
+}
@@ -0,0 +1,217 @@
+import math
+
+NAN = float('nan')
+
+class CompensatedSum:
+    """Running float sum with Neumaier compensation, so adding and removing values for
+    millions of ticks does not accumulate rounding drift"""
+    __slots__ = ('total', 'compensation')
+
+    def __init__(self):
+        self.total = 0.0
+        self.compensation = 0.0
+
+    def add(self, value):
+        total = self.total + value
+        if abs(self.total) >= abs(value):
+            self.compensation += (self.total - total) + value
+        else:
+            self.compensation += (value - total) + self.total
+        self.total = total
+
+    @property
+    def value(self):
+        return self.total + self.compensation
+
+class _Window:
+    """Fixed-size circular window, push returns the value that dropped out (or None)"""
+    __slots__ = ('values', 'size', 'count', 'pos')
+
+    def __init__(self, size):
+        self.values = [0.0] * size
+        self.size = size
+        self.count = 0
+        self.pos = 0
+
+    def push(self, value):
+        dropped = self.values[self.pos] if self.count == self.size else None
+        self.values[self.pos] = value
+        self.pos = (self.pos + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+        return dropped
+
+    @property
+    def full(self):
+        return self.count == self.size
+
+class SMA:
+    """Simple moving average, matches pd.Series.rolling(period).mean()"""
+    __slots__ = ('period', 'window', 'sum', 'value')
+
+    def __init__(self, period):
+        self.period = period
+        self.window = _Window(period)
+        self.sum = CompensatedSum()
+        self.value = NAN
+
+    def update(self, x):
+        dropped = self.window.push(x)
+        self.sum.add(x)
+        if dropped is not None:
+            self.sum.add(-dropped)
+        self.value = self.sum.value / self.period if self.window.full else NAN
+        return self.value
+
+    @property
+    def ready(self):
+        return self.window.full
+
+class VolumeMA(SMA):
+    """Moving average of traded volume, update with each bar's or tick's volume"""
+    __slots__ = ()
+
+class EMA:
+    """Exponential moving average, matches pd.Series.ewm(span=period, adjust=False).mean()"""
+    __slots__ = ('period', 'alpha', 'value')
+
+    def __init__(self, period, alpha=None):
+        self.period = period
+        self.alpha = 2 / (period + 1) if alpha is None else alpha
+        self.value = NAN
+
+    def update(self, x):
+        if math.isnan(self.value):
+            self.value = x
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+class RollingStd:
+    """Rolling sample standard deviation, matches pd.Series.rolling(period).std()
+
+    Uses Welford's add/remove updates of the mean and squared deviations, which stay
+    accurate where the naive sum of squares cancels catastrophically. Every `period`
+    updates both are recomputed from the window (amortised O(1)) so rounding error
+    cannot build up over a long-running stream.
+    """
+    __slots__ = ('period', 'window', 'mean', 'm2', 'updates', 'value')
+
+    def __init__(self, period):
+        self.period = period
+        self.window = _Window(period)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.updates = 0
+        self.value = NAN
+
+    def update(self, x):
+        dropped = self.window.push(x)
+        if dropped is None:
+            n = self.window.count
+            delta = x - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (x - self.mean)
+        else:
+            # Replace dropped by x in one step, the count stays at period
+            old_mean = self.mean
+            self.mean += (x - dropped) / self.period
+            self.m2 += (x - dropped) * (x - self.mean + dropped - old_mean)
+            self.updates += 1
+            if self.updates == self.period:
+                self.updates = 0
+                values = self.window.values
+                self.mean = math.fsum(values) / self.period
+                self.m2 = math.fsum((v - self.mean) ** 2 for v in values)
+        if self.window.full and self.period > 1:
+            self.value = math.sqrt(max(self.m2, 0.0) / (self.period - 1))
+        else:
+            self.value = NAN
+        return self.value
+
+class RSI:
+    """RSI from simple moving averages of gains and losses
+
+    Same definition as TechnicalAnalysis.calculate_rsi in advanced_trading_bot.py,
+    ma_up / (ma_up + ma_down) * 100 over the last `period` price changes.
+    """
+    __slots__ = ('period', 'previous', 'up', 'down', 'value')
+
+    def __init__(self, period=14):
+        self.period = period
+        self.previous = None
+        self.up = SMA(period)
+        self.down = SMA(period)
+        self.value = NAN
+
+    def update(self, price):
+        if self.previous is not None:
+            change = price - self.previous
+            ma_up = self.up.update(max(change, 0.0))
+            ma_down = self.down.update(max(-change, 0.0))
+            total = ma_up + ma_down
+            self.value = ma_up / total * 100 if total > 0 else NAN
+        self.previous = price
+        return self.value
+
+class WilderRSI:
+    """Wilder's RSI, matches the pandas form
+    100 - 100 / (1 + up.ewm(alpha=1/period, adjust=False).mean() / down.ewm(...).mean())
+    with the first `period` values left NaN"""
+    __slots__ = ('period', 'previous', 'count', 'avg_up', 'avg_down', 'value')
+
+    def __init__(self, period=14):
+        self.period = period
+        self.previous = None
+        self.count = 0
+        self.avg_up = EMA(period, alpha=1 / period)
+        self.avg_down = EMA(period, alpha=1 / period)
+        self.value = NAN
+
+    def update(self, price):
+        if self.previous is not None:
+            change = price - self.previous
+            avg_up = self.avg_up.update(max(change, 0.0))
+            avg_down = self.avg_down.update(max(-change, 0.0))
+            self.count += 1
+            if self.count >= self.period:
+                if avg_down > 0:
+                    self.value = 100 - 100 / (1 + avg_up / avg_down)
+                else:
+                    self.value = 100.0 if avg_up > 0 else NAN
+        self.previous = price
+        return self.value
+
+class ATR:
+    """Average true range over `period` bars, matches EnhancedBackTester.calculate_atr"""
+    __slots__ = ('previous_close', 'tr', 'value')
+
+    def __init__(self, period=14):
+        self.previous_close = None
+        self.tr = SMA(period)
+        self.value = NAN
+
+    def update(self, high, low, close):
+        true_range = high - low
+        if self.previous_close is not None:
+            true_range = max(true_range, abs(high - self.previous_close), abs(low - self.previous_close))
+        self.previous_close = close
+        self.value = self.tr.update(true_range)
+        return self.value
+
+class VWAP:
+    """Cumulative volume weighted average price, matches
+    (volume * price).cumsum() / volume.cumsum()"""
+    __slots__ = ('notional', 'volume', 'value')
+
+    def __init__(self):
+        self.notional = CompensatedSum()
+        self.volume = CompensatedSum()
+        self.value = NAN
+
+    def update(self, price, volume):
+        self.notional.add(price * volume)
+        self.volume.add(volume)
+        total_volume = self.volume.value
+        self.value = self.notional.value / total_volume if total_volume else NAN
+        return self.value
@@ -0,0 +1,111 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+class SyntheticMarket:
+    """Seeded generator of synthetic OHLCV candles, vectorized over all bars
+
+    Returns are built from a handful of whole-array operations:
+
+        regimes     bearish / flat / bullish drift lasting trend_duration bars each,
+                    drawn all at once and expanded with np.repeat
+        clustering  log-volatility follows an AR(1) process (an EWM filter over
+                    Gaussian noise), so calm and turbulent stretches alternate
+        jumps       with probability jump_probability a bar gets an extra N(0, jump_size) move
+        volume      lognormal, scaled up with the size of the bar's move relative to
+                    its volatility
+
+    Several pairs share the regimes, volatility and jumps, and their diffusion noise
+    is correlated (see generate_pairs). The same seed always gives the same prices.
+    Frames have the timestamp/open/high/low/close/volume columns EnhancedBackTester
+    reads; write them with write_ohlcv_arrays to backtest millions of bars.
+    """
+
+    def __init__(self, seed=None, base_volatility=0.001, trend_drift=0.0005, trend_probabilities=(0.3, 0.4, 0.3),
+                 trend_duration=(30, 120), volatility_persistence=0.98, volatility_of_volatility=0.5,
+                 jump_probability=0.02, jump_size=0.005, volume_scale=0.1):
+        self.seed = seed
+        self.base_volatility = base_volatility
+        self.trend_drift = trend_drift
+        self.trend_probabilities = trend_probabilities
+        self.trend_duration = trend_duration
+        self.volatility_persistence = volatility_persistence
+        self.volatility_of_volatility = volatility_of_volatility
+        self.jump_probability = jump_probability
+        self.jump_size = jump_size
+        self.volume_scale = volume_scale
+
+    def _regimes(self, rng, n_bars):
+        """Trend direction (-1, 0, 1) of every bar"""
+        low, high = self.trend_duration
+        # The shortest regime lasts `low` bars, so this many regimes always cover n_bars
+        count = n_bars // low + 1
+        durations = rng.integers(low, high + 1, count)
+        trends = rng.choice([-1, 0, 1], size=count, p=self.trend_probabilities)
+        return np.repeat(trends, durations)[:n_bars]
+
+    def _volatility(self, rng, n_bars):
+        """Per-bar volatility with clustering, averaging base_volatility"""
+        alpha = 1 - self.volatility_persistence
+        noise = pd.Series(rng.standard_normal(n_bars))
+        # An adjust=False EWM is the AR(1) filter y[t] = (1 - alpha) * y[t-1] + alpha * noise[t]
+        log_volatility = noise.ewm(alpha=alpha, adjust=False).mean().to_numpy()
+        log_volatility = log_volatility * (self.volatility_of_volatility / np.sqrt(alpha / (2 - alpha)))
+        return self.base_volatility * np.exp(log_volatility - self.volatility_of_volatility ** 2 / 2)
+
+    def _returns(self, n_bars, correlation):
+        """(rng, log returns, volatility), returns have one column per correlated series"""
+        rng = np.random.default_rng(self.seed)
+        correlation = np.atleast_2d(correlation)
+        trend = self._regimes(rng, n_bars) * self.trend_drift
+        volatility = self._volatility(rng, n_bars)
+        jumps = np.where(rng.random(n_bars) < self.jump_probability, rng.normal(0, self.jump_size, n_bars), 0.0)
+        noise = rng.standard_normal((n_bars, len(correlation)))
+        if len(correlation) > 1:
+            noise = noise @ np.linalg.cholesky(correlation).T
+        returns = noise * volatility[:, None]
+        returns += (trend + jumps)[:, None]
+        return rng, returns, volatility
+
+    @staticmethod
+    def _timestamps(n_bars, start, end, freq):
+        if start is not None:
+            return pd.date_range(start=start, periods=n_bars, freq=freq)
+        end = pd.Timestamp(end or datetime.now()).floor(freq)
+        return pd.date_range(end=end, periods=n_bars, freq=freq)
+
+    def _candles(self, rng, returns, volatility, start_price):
+        """OHLCV columns of one series from its log returns"""
+        close = start_price * np.exp(np.cumsum(returns))
+        open_ = np.empty_like(close)
+        open_[0] = start_price
+        open_[1:] = close[:-1]
+        wick = np.abs(rng.standard_normal((2, len(close)))) * (volatility / 2)
+        high = np.maximum(open_, close) * (1 + wick[0])
+        low = np.minimum(open_, close) * (1 - wick[1])
+        move = np.abs(returns) / volatility
+        volume = rng.lognormal(0, 1, len(close)) * self.volume_scale * (1 + move)
+        return {'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}
+
+    def generate(self, n_bars, start_price=100000, start=None, end=None, freq='1min'):
+        """DataFrame of n_bars candles, ending at end (default now) unless start is given"""
+        rng, returns, volatility = self._returns(n_bars, 1.0)
+        candles = self._candles(rng, returns[:, 0], volatility, start_price)
+        return pd.DataFrame({'timestamp': self._timestamps(n_bars, start, end, freq), **candles})
+
+    def generate_pairs(self, start_prices, n_bars, correlation=0.8, start=None, end=None, freq='1min'):
+        """{pair: DataFrame} for correlated pairs
+
+        start_prices maps pair -> first price. correlation is the correlation of the
+        pairs' diffusion noise, a scalar for every pair of pairs or a full matrix in
+        the order of start_prices.
+        """
+        pairs = list(start_prices)
+        if np.isscalar(correlation):
+            correlation = np.full((len(pairs), len(pairs)), correlation)
+            np.fill_diagonal(correlation, 1.0)
+        rng, returns, volatility = self._returns(n_bars, correlation)
+        timestamps = self._timestamps(n_bars, start, end, freq)
+        return {pair: pd.DataFrame({'timestamp': timestamps,
+                                    **self._candles(rng, returns[:, i], volatility, start_prices[pair])})
+                for i, pair in enumerate(pairs)}
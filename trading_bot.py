@@ -4,6 +4,7 @@ import time
 from datetime import datetime
 import logging
 from luno_api_client import LunoAPIClient
+from response_cache import ResponseCache
 from dotenv import load_dotenv
 from tabulate import tabulate  # Import tabulate
 
@@ -28,7 +29,7 @@ with open(config_path, 'r') as f:
 if not API_KEY or not API_SECRET:
     raise ValueError("LUNO_API_KEY and LUNO_API_SECRET must be set in config.json")
 
-client = LunoAPIClient(API_KEY, API_SECRET)
+client = LunoAPIClient(API_KEY, API_SECRET, cache=ResponseCache())
 
 DEFAULT_PAIR = "XBTMYR"
 
@@ -301,7 +302,6 @@ def get_fee_info(pair=DEFAULT_PAIR):
         print(tabulate(table, headers, tablefmt="pretty"))
     except Exception as e:
         print(f"Error getting fee info: {e}")
-    time.sleep(0.5)
 
 def run_trading_bot():
     global fund, bought_price, btc_bought, total_profit, total_loss, total_buy_amount, taker_fee  # Use global variables to track trading status
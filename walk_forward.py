@@ -0,0 +1,127 @@
+import numpy as np
+from backtest_engine import low_volume_threshold, window_trade_arrays
+from risk_metrics import equity_curve, risk_metrics
+from parallel_optimizer import ParallelOptimizer
+
+def walk_forward_windows(n_bars, train_size, test_size, step=None, anchored=False):
+    """(train start, train end, test start, test end) bar ranges of a walk-forward run
+
+    Rolling train windows keep train_size bars and slide by step (test_size by default);
+    anchored ones all start at bar 0 and grow. Each test window starts where its train
+    window ends; bars after the last full test window are left out.
+    """
+    step = step or test_size
+    if step < test_size:
+        raise ValueError("step must be at least test_size, overlapping test windows would count bars twice")
+    windows = []
+    train_end = train_size
+    while train_end + test_size <= n_bars:
+        windows.append((0 if anchored else train_end - train_size, train_end, train_end, train_end + test_size))
+        train_end += step
+    return windows
+
+def optimize_window(tester, param_sets, window, metric):
+    """Optimize on a window's train bars, then trade the winner on its test bars
+
+    tester is an EnhancedBackTester; both runs reuse its indicators, computed once for
+    the whole series, except the volume zones whose tertiles come from the train bars.
+    Ties go to the earlier parameter set like optimize_strategy.
+    """
+    train_start, train_end, test_start, test_end = window
+    low_volume = low_volume_threshold(tester.data['volume'].to_numpy()[train_start:train_end])
+    scores = tester.run_batch(param_sets, end=train_end, start=train_start, low_volume=low_volume)
+    best = max(range(len(param_sets)), key=lambda i: scores[i][metric])
+    profits, capital, trades = next(tester.batch_trades([param_sets[best]], end=test_end, start=test_start,
+                                                        low_volume=low_volume))
+    return {
+        'window': window,
+        'parameters': param_sets[best],
+        'train_metrics': scores[best],
+        'test_metrics': tester.window_metrics(profits, capital, trades, test_start, test_end),
+        'profits': profits,
+        'trades': trades,
+    }
+
+class WalkForward:
+    """Walk-forward validation of the strategy optimizer on one EnhancedBackTester
+
+    Every window is optimized on its train bars by metric over the whole parameter grid
+    and the winner is traded out of sample on the following test bars. The test
+    windows' equity curves are chained into one out-of-sample curve, each starting from
+    the capital the previous one ended with (positions are sized from capital, so a
+    window's curve scales with it; open positions count at their last close).
+
+    With workers > 1 windows are spread over a ParallelOptimizer pool. Indicators are
+    computed once per process for the whole series and shared by every window, which
+    is causal for the moving averages, VWAP and ATR. The volume zone tertiles are not,
+    so each window draws them from its own train bars and trades its test bars with them.
+    """
+
+    def __init__(self, tester, parameter_ranges, train_size, test_size, step=None, anchored=False,
+                 metric='sharpe_ratio', workers=1):
+        self.tester = tester
+        self.parameter_ranges = parameter_ranges
+        self.windows = walk_forward_windows(len(tester.data), train_size, test_size, step, anchored)
+        self.metric = metric
+        self.workers = workers
+
+    def iter_folds(self):
+        """Yield (window number, fold) as each window completes, see optimize_window"""
+        param_sets = self.tester.generate_parameter_combinations(self.parameter_ranges)
+        if self.workers > 1:
+            with ParallelOptimizer(self.tester, workers=self.workers) as optimizer:
+                yield from optimizer.iter_windows(param_sets, self.windows, self.metric)
+        else:
+            for i, window in enumerate(self.windows):
+                yield i, optimize_window(self.tester, param_sets, window, self.metric)
+
+    def run(self, progress=None):
+        """Run every window and return the summary of stitch(); progress(done, total) follows the windows"""
+        folds = [None] * len(self.windows)
+        for done, (i, fold) in enumerate(self.iter_folds(), 1):
+            folds[i] = fold
+            if progress:
+                progress(done, len(folds))
+        return self.stitch(folds)
+
+    def stitch(self, folds):
+        """Out-of-sample equity and metrics of completed folds, in window order
+
+        efficiency is the out-of-sample annual return over the average in-sample one
+        (0 when the latter is not positive). overfit_folds counts windows whose winner
+        scored above zero on its train bars and at or below zero on its test bars.
+        """
+        tester = self.tester
+        initial = tester.initial_capital
+        close = tester.data['close'].to_numpy(dtype=np.float64)
+        capital = initial
+        equity, position, traded_value, trades = [], [], 0.0, 0
+        for fold in folds:
+            _, _, test_start, test_end = fold['window']
+            window_close = close[test_start:test_end]
+            entries, exits, amounts, costs = window_trade_arrays(fold['trades'], test_start)
+            fold_equity, fold_position = equity_curve(window_close, entries, exits, amounts, costs,
+                                                      fold['profits'], initial)
+            scale = capital / initial
+            equity.append(fold_equity * scale)
+            position.append(fold_position)
+            closed = exits >= 0
+            traded_value += scale * (np.sum(amounts * window_close[entries]) +
+                                     np.sum(amounts[closed] * window_close[exits[closed]]))
+            trades += len(entries)
+            capital = float(equity[-1][-1]) if len(fold_equity) else capital
+
+        equity = np.concatenate(equity) if equity else np.array([float(initial)])
+        position = np.concatenate(position) if position else np.zeros(1)
+        metrics = risk_metrics(equity, position, traded_value, tester.periods_per_year)
+        metrics.update({'total_profit': capital - initial, 'total_trades': trades})
+        train_return = np.mean([fold['train_metrics']['annual_return'] for fold in folds]) if folds else 0.0
+        return {
+            'folds': folds,
+            'equity': equity,
+            'metrics': metrics,
+            'efficiency': float(metrics['annual_return'] / train_return) if train_return > 0 else 0.0,
+            'overfit_folds': sum(fold['train_metrics'][self.metric] > 0 >= fold['test_metrics'][self.metric]
+                                 for fold in folds),
+            'parameter_sets': len({tuple(sorted(fold['parameters'].items())) for fold in folds}),
+        }